@@ -1,20 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from datetime import datetime, timedelta
 import logging
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 import pandas as pd
+from api.hedging import Deadline
+from api.revalidation import ValidatorStore
 from models.analysis_results import AnalysisResult
 from services.analysis import AnalysisService
 from services.api import APIService
 from services.data import DataService
+from services.ingestion import IngestionPipeline
+from services.pipeline import PipelinedIngestion, PipelineResult
+from utils.anomaly_detection import AnomalyDetector
+from utils.forecasting import BaselineForecaster
 from utils.helpers import BMRSError
+from utils.history_store import HistoryStore
+from utils.imbalance_cube import ImbalanceCube
+from utils.price_volume import PriceVolumeAnalysis
+from utils.quality_profiler import QualityProfiler
+from utils.result_cache import ResultCache
+from utils.revisions import IncrementalProcessor, RevisionReport
+
+# Most days fetched from the API for one run, or for its forecast history
+MAX_FETCH_DAYS = 31
 
 class BMRSAnalysis:
     """Main class for BMRS analysis"""
     
-    def __init__(self):
-        self.api_service = APIService("https://data.elexon.co.uk/bmrs/api/v1")
+    def __init__(self, validator_store: ValidatorStore = None, result_cache: ResultCache = None,
+                 time_budget: float = None, revisions: IncrementalProcessor = None,
+                 history_store: HistoryStore = None, fetch_history: bool = False):
+        self.api_service = APIService("https://data.elexon.co.uk/bmrs/api/v1", validator_store)
         self.data_service = DataService()
+        self.ingestion = IngestionPipeline(service=self.api_service)
+        self.pipeline = PipelinedIngestion(self.ingestion)
+        self.forecaster = BaselineForecaster()
+        self.forecast_history_days = 56
+        # Forecast history is read from the history store or the validator store's cached days;
+        # with fetch_history, days missing from both are fetched from the API during the run
+        self.history_store = history_store
+        self.fetch_history = fetch_history
         self.analysis_service = AnalysisService()
+        self.result_cache = result_cache
+        # Seconds allowed for fetching a run; late days fall back to cached data
+        self.time_budget = time_budget
+        # With revision tracking, runs only reprocess the days whose data changed
+        self.revisions = revisions
         self.logger = logging.getLogger(__name__)
         self._raw_data = None
         self._prices_df = None
@@ -26,51 +58,246 @@ class BMRSAnalysis:
             # Validate dates
             self._validate_dates(start_date, end_date)
             
-            # Fetch data
-            raw_data = []
-            current_date = datetime.strptime(start_date, '%Y-%m-%d')
-            end = datetime.strptime(end_date, '%Y-%m-%d')
+            # Fetch, process and analyse each day as it arrives
+            self.api_service.validators.reset_stats()
+            self.api_service.reset_provisional()
+            deadline = Deadline(self.time_budget) if self.time_budget is not None else None
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                # Forecasts of the range are fitted on the days before it too, loaded meanwhile
+                history_days = executor.submit(self._load_history, start_date, deadline)
+                if self.revisions is not None:
+                    staged = None
+                    revisions, failed_dates = self._run_revisions(start_date, end_date, deadline)
+                else:
+                    staged = self.pipeline.run(start_date, end_date, deadline)
+                    self._raw_data, self._prices_df, self._volumes_df = staged.raw_df, staged.prices_df, staged.volumes_df
+                    revisions, failed_dates = None, staged.failed_dates
+                history = self._with_range(history_days.result())
             
-            while current_date <= end:
-                date_str = current_date.strftime('%Y-%m-%d')
-                data = self.api_service.get_imbalance_data(date_str)
-                raw_data.extend(data)
-                current_date += timedelta(days=1)
+            self.logger.info(f"Revalidation: {self.api_service.validators.stats.summary()}")
+            self.logger.info(f"Concurrency: {self.api_service.limiter.summary()}")
+            if deadline is not None:
+                self.logger.info(f"Hedging: {self.api_service.hedger.summary()}")
             
-            # Store raw data
-            self._raw_data = self.data_service.convert_to_dataframe(raw_data)
+            self._flag_anomalies()
             
-            # Process data
-            self._prices_df, self._volumes_df = self.data_service.process_data(self._raw_data)
+            result = self._analyse(start_date, end_date, history, staged)
+            if failed_dates:
+                # Cached results are shared, so the failed days go on a copy
+                result = replace(result, failed_dates=list(failed_dates))
+            if revisions is not None:
+                result = replace(result, revisions=revisions)
+            if self.api_service.provisional_dates:
+                result = self._mark_provisional(result, sorted(self.api_service.provisional_dates))
+            return result
             
-            # Analyse data
-            hourly_stats, peak_hours_report = self.analysis_service.analyse_volumes(self._volumes_df)
+        except Exception as e:
+            self.logger.error(f"Analysis failed: {str(e)}")
+            raise BMRSError(f"Analysis failed: {str(e)}")
+
+    def run_analysis_from_store(self, store: HistoryStore, start_date: str, end_date: str) -> AnalysisResult:
+        """Run the analysis on processed data read from a history store"""
+        try:
+            self._validate_dates(start_date, end_date, max_days=None)
             
-            # Generate daily reports
-            daily_reports = self._generate_daily_reports(self._volumes_df, start_date, end_date)
+            self._raw_data = None
+            self._prices_df, self._volumes_df = store.read_frames(start_date, end_date)
+            if self._prices_df.empty or self._volumes_df.empty:
+                raise BMRSError(f"No stored data for {start_date} to {end_date}")
             
-            # Calculate data quality metrics
-            quality_metrics = self._calculate_quality_metrics(self._prices_df, self._volumes_df)
+            # Forecasts of the range are fitted on the stored days before it too
+            history_start = (
+                datetime.strptime(start_date, '%Y-%m-%d') - timedelta(days=self.forecast_history_days)
+            ).strftime('%Y-%m-%d')
+            history = store.read_frames(history_start, end_date)
+            self._flag_anomalies()
             
-            return AnalysisResult(
-                hourly_stats=hourly_stats,
-                peak_hours_report=peak_hours_report,
-                daily_reports=daily_reports,
-                data_quality=quality_metrics
-            )
+            return self._analyse(start_date, end_date, history)
             
         except Exception as e:
             self.logger.error(f"Analysis failed: {str(e)}")
             raise BMRSError(f"Analysis failed: {str(e)}")
 
+    def _run_revisions(self, start_date: str, end_date: str,
+                       deadline: Deadline = None) -> Tuple[RevisionReport, List[str]]:
+        """
+        Fetch the range into the revision store and take the processed
+        frames from the incremental processor, which only reprocesses the
+        days whose data changed. Returns the revision report and the days
+        that could not be fetched.
+        """
+        raw_df = self.ingestion.fetch_range(start_date, end_date, deadline)
+        if raw_df.empty:
+            raise BMRSError("No data to process")
+        
+        revisions = self.revisions.update(raw_df)
+        self.logger.info(
+            f"Revisions: {len(revisions.changed_days)} days changed, "
+            f"{len(revisions.unchanged_days)} unchanged"
+        )
+        
+        # Stored days either side of the range only serve as gap filling context
+        first, last = raw_df['timestamp'].min(), raw_df['timestamp'].max()
+        prices_df, volumes_df = self.revisions.get_dataframes(first.date(), last.date())
+        in_range = prices_df['timestamp'].between(first, last).to_numpy()
+        self._raw_data = raw_df
+        self._prices_df = prices_df[in_range].reset_index(drop=True)
+        self._volumes_df = volumes_df[in_range].reset_index(drop=True)
+        
+        fetched = set(raw_df['settlementDate'])
+        dates = pd.date_range(start_date, end_date, freq='D').strftime('%Y-%m-%d')
+        failed_dates = [date for date in dates if date not in fetched]
+        if failed_dates:
+            self.logger.warning(f"No data fetched for {', '.join(failed_dates)}")
+        return revisions, failed_dates
+
+    def _load_history(self, start_date: str, deadline: Deadline = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Processed frames of the forecast_history_days before start_date, or
+        None if no earlier day is available. They are read from the history
+        store when it has them, otherwise built from the days cached by the
+        validator store. Only with fetch_history are missing days among the
+        last MAX_FETCH_DAYS fetched from the API. Days missing from the
+        history only shorten the training data.
+        """
+        start = datetime.strptime(start_date, '%Y-%m-%d')
+        days = [(start - timedelta(days=n)).strftime('%Y-%m-%d') for n in range(self.forecast_history_days, 0, -1)]
+        try:
+            if self.history_store is not None:
+                prices_df, volumes_df = self.history_store.read_frames(days[0], days[-1])
+                if not prices_df.empty and not volumes_df.empty:
+                    return prices_df, volumes_df
+            
+            cached = {day: self.api_service.cached_frame(day) for day in days}
+            missing = [day for day in days[-MAX_FETCH_DAYS:] if cached[day] is None]
+            raws = [frame for frame in cached.values() if frame is not None]
+            if self.fetch_history and missing and not (deadline is not None and deadline.expired):
+                # Cached days in the fetched range are only revalidated
+                try:
+                    fetched = self.ingestion.fetch_range(missing[0], days[-1], deadline)
+                    raws = [frame for day, frame in cached.items() if frame is not None and day < missing[0]]
+                    raws.append(fetched)
+                except BMRSError as e:
+                    self.logger.warning(f"Could not fetch history before {start_date}: {str(e)}")
+            if not raws:
+                raise BMRSError("No earlier days cached")
+            return self.ingestion.process(pd.concat(raws, ignore_index=True))
+        except BMRSError as e:
+            self.logger.warning(f"Forecasting without history before {start_date}: {str(e)}")
+            return None
+
+    def _with_range(self, history: Tuple[pd.DataFrame, pd.DataFrame]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """History frames followed by the analysed range, or None without history"""
+        if history is None:
+            return None
+        return tuple(
+            pd.concat([before.reindex(columns=frame.columns), frame], ignore_index=True)
+            for before, frame in zip(history, (self._prices_df, self._volumes_df))
+        )
+
+    def _flag_anomalies(self):
+        """
+        Add AnomalyDetector flags to the processed frames, so they are counted
+        in the quality profile and marked on the dashboard. The rolling
+        baselines span the whole range, so flags are added after ingestion.
+        """
+        self._prices_df, self._volumes_df = AnomalyDetector.apply(self._prices_df, self._volumes_df)
+
+    def _analyse(self, start_date: str, end_date: str,
+                 history: Tuple[pd.DataFrame, pd.DataFrame] = None,
+                 staged: PipelineResult = None) -> AnalysisResult:
+        """
+        Analyse the processed DataFrames. history, if given, holds processed
+        frames reaching back before start_date for fitting the forecasts;
+        staged holds the per-day analyses merged by the pipeline.
+        With a result cache, unchanged inputs return the cached result.
+        """
+        if self.result_cache is None:
+            return self._compute(start_date, end_date, history, staged)
+        
+        frames = [self._prices_df, self._volumes_df, *(history or ())]
+        key = ResultCache.key(frames, {
+            'start_date': start_date,
+            'end_date': end_date,
+            'forecaster': vars(self.forecaster),
+            'forecast_history_days': self.forecast_history_days
+        })
+        result = self.result_cache.get_or_compute(key, lambda: self._compute(start_date, end_date, history, staged))
+        self.logger.info(f"Result cache: {self.result_cache.stats.summary()}")
+        return result
+
+    def _compute(self, start_date: str, end_date: str,
+                 history: Tuple[pd.DataFrame, pd.DataFrame] = None,
+                 staged: PipelineResult = None) -> AnalysisResult:
+        """Run every analysis of the processed DataFrames not already merged by the pipeline"""
+        # Analyse data
+        if staged is not None:
+            hourly_stats = staged.hourly_stats
+            peak_hours_report = self.analysis_service._generate_volume_report(hourly_stats)
+        else:
+            hourly_stats, peak_hours_report = self.analysis_service.analyse_volumes(self._volumes_df)
+        
+        # One-day-ahead forecasts of every day in the range and the day after
+        n_days = (datetime.strptime(end_date, '%Y-%m-%d') - datetime.strptime(start_date, '%Y-%m-%d')).days + 1
+        forecasts = self.forecaster.backtest(*(history or (self._prices_df, self._volumes_df)), n_origins=n_days)
+        
+        # Generate daily reports with forecasts alongside actuals
+        if staged is not None:
+            daily_reports = dict(staged.daily_reports)
+        else:
+            daily_reports = self._generate_daily_reports(self._volumes_df, start_date, end_date)
+        for date_str in daily_reports:
+            forecast_report = forecasts.format_day(datetime.strptime(date_str, '%Y-%m-%d').date())
+            if forecast_report:
+                daily_reports[date_str] += f"\n{forecast_report}"
+        
+        # Calculate data quality metrics, including any anomaly flags
+        quality_profile = QualityProfiler.profile(self._prices_df, self._volumes_df)
+        quality_metrics = self._calculate_quality_metrics(quality_profile)
+        
+        if staged is not None:
+            imbalance_cube = staged.imbalance_cube
+        else:
+            imbalance_cube = ImbalanceCube.build(self._prices_df, self._volumes_df)
+        
+        # Rolling price-volume relationship, overall and per settlement period
+        price_volume = PriceVolumeAnalysis.analyse(self._prices_df, self._volumes_df)
+        by_period = PriceVolumeAnalysis.by_settlement_period(self._prices_df, self._volumes_df)
+        
+        return AnalysisResult(
+            hourly_stats=hourly_stats,
+            peak_hours_report=peak_hours_report,
+            daily_reports=daily_reports,
+            data_quality=quality_metrics,
+            quality_profile=quality_profile,
+            imbalance_cube=imbalance_cube,
+            price_volume=price_volume,
+            price_volume_by_period=PriceVolumeAnalysis.latest_by_settlement_period(by_period),
+            forecasts=forecasts
+        )
+
+    def _mark_provisional(self, result: AnalysisResult, dates) -> AnalysisResult:
+        """Copy of a result flagged as provisional; cached results are shared and not modified"""
+        self.logger.warning(f"Report is provisional, fetch deadline missed for {', '.join(dates)}")
+        note = "PROVISIONAL: fetch deadline missed, figures use cached or missing data\n"
+        return replace(
+            result,
+            provisional=True,
+            provisional_dates=list(dates),
+            daily_reports={
+                date: note + report if date in dates else report
+                for date, report in result.daily_reports.items()
+            }
+        )
+
     def get_dataframes(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """Get the processed price and volume DataFrames"""
         if self._prices_df is None or self._volumes_df is None:
             raise BMRSError("Analysis must be run before accessing DataFrames")
         return self._prices_df, self._volumes_df
     
-    def _validate_dates(self, start_date: str, end_date: str):
-        """Validate input dates"""
+    def _validate_dates(self, start_date: str, end_date: str, max_days: int = MAX_FETCH_DAYS):
+        """Validate input dates; max_days limits ranges fetched from the API"""
         try:
             start = datetime.strptime(start_date, '%Y-%m-%d')
             end = datetime.strptime(end_date, '%Y-%m-%d')
@@ -78,8 +305,8 @@ class BMRSAnalysis:
             if end < start:
                 raise ValueError("End date must be after start date")
                 
-            if (end - start).days > 31:
-                raise ValueError("Date range cannot exceed 31 days")
+            if max_days is not None and (end - start).days > max_days:
+                raise ValueError(f"Date range cannot exceed {max_days} days")
                 
         except ValueError as e:
             raise BMRSError(f"Invalid dates: {str(e)}")
@@ -103,16 +330,19 @@ class BMRSAnalysis:
             
         return reports
     
-    def _calculate_quality_metrics(self, prices_df: pd.DataFrame, 
-                                 volumes_df: pd.DataFrame) -> Dict[str, Dict[str, float]]:
-        """Calculate data quality metrics"""
+    def _calculate_quality_metrics(self, quality_profile: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+        """Calculate range-wide data quality metrics from a quality profile"""
+        totals = QualityProfiler.summarise(quality_profile)
+        prices = totals.loc[['system_sell_price', 'system_buy_price', 'price_spread']]
+        volumes = totals.loc['net_imbalance_volume']
+        
         return {
             'prices': {
-                'missing_rate': prices_df.isnull().mean().mean() * 100,
-                'anomaly_rate': (prices_df['price_spread'] < 0).mean() * 100
+                'missing_rate': prices['missing'].sum() / prices['periods'].sum() * 100,
+                'anomaly_rate': totals.loc['price_spread', 'anomaly_pct']
             },
             'volumes': {
-                'missing_rate': volumes_df.isnull().mean().mean() * 100,
-                'sero_volume_rate': (volumes_df['abs_imbalance_volume'] == 0).mean() * 100
+                'missing_rate': volumes['missing_pct'],
+                'sero_volume_rate': volumes['zero_volume_pct']
             }
         }
\ No newline at end of file
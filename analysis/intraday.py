@@ -0,0 +1,159 @@
+from datetime import datetime
+import logging
+import math
+import threading
+import time
+from typing import Callable, List, Optional
+from api.bmrs import BMRSApi
+from models.intraday_update import IntradayUpdate
+from utils.helpers import BMRSError, periods_in_day, validate_date_format
+from utils.streaming_stats import StreamingStatistics
+
+class IntradayMonitor:
+    """
+    Polls the per-period system prices endpoint for the latest settlement
+    period and keeps a running intraday cost, unit rate and peak hour.
+
+    Each new period is folded into the running totals in constant time and
+    published to the registered callbacks.
+    """
+    
+    def __init__(self, settlement_date: str, api: Optional[BMRSApi] = None,
+                 start_period: int = 1, statistics: Optional[StreamingStatistics] = None):
+        validate_date_format(settlement_date)
+        
+        self.settlement_date = settlement_date
+        self.api = api or BMRSApi()
+        self.logger = logging.getLogger(__name__)
+        self.total_periods = periods_in_day(settlement_date)
+        self.next_period = start_period
+        
+        self.running_cost = 0.0
+        self.running_net_volume = 0.0
+        self.running_abs_volume = 0.0
+        self.hourly_abs_volume = [0.0] * 24
+        self.peak_hour = None
+        self.statistics = statistics
+        
+        self._callbacks: List[Callable[[IntradayUpdate], None]] = []
+        self._stop = threading.Event()
+
+    def subscribe(self, callback: Callable[[IntradayUpdate], None]):
+        """Register a callback that receives every IntradayUpdate"""
+        self._callbacks.append(callback)
+
+    @property
+    def is_complete(self) -> bool:
+        return self.next_period > self.total_periods
+
+    @property
+    def unit_rate(self) -> Optional[float]:
+        if self.running_abs_volume == 0:
+            return None
+        return self.running_cost / self.running_abs_volume
+
+    def add_period(self, settlement_period: int, timestamp: datetime,
+                   system_sell_price: float, system_buy_price: float,
+                   net_imbalance_volume: float, received_at: Optional[float] = None) -> IntradayUpdate:
+        """
+        Fold one settlement period into the running intraday view
+        """
+        
+        # Same sign convention as ImbalanceAnalysis
+        if net_imbalance_volume >= 0:
+            period_cost = net_imbalance_volume * system_sell_price
+        else:
+            period_cost = net_imbalance_volume * system_buy_price
+        
+        self.running_cost += period_cost
+        self.running_net_volume += net_imbalance_volume
+        self.running_abs_volume += abs(net_imbalance_volume)
+        
+        # Only the updated hour can overtake the current peak
+        hour = timestamp.hour
+        self.hourly_abs_volume[hour] += abs(net_imbalance_volume)
+        if self.peak_hour is None or self.hourly_abs_volume[hour] > self.hourly_abs_volume[self.peak_hour]:
+            self.peak_hour = hour
+        
+        self.next_period = max(self.next_period, settlement_period + 1)
+        
+        snapshot = None
+        if self.statistics is not None:
+            snapshot = self.statistics.update({
+                'system_sell_price': system_sell_price,
+                'system_buy_price': system_buy_price,
+                'net_imbalance_volume': net_imbalance_volume
+            })
+        
+        update = IntradayUpdate(
+            settlement_date=self.settlement_date,
+            settlement_period=settlement_period,
+            timestamp=timestamp,
+            period_cost=period_cost,
+            running_cost=self.running_cost,
+            running_net_volume=self.running_net_volume,
+            running_abs_volume=self.running_abs_volume,
+            unit_rate=self.unit_rate,
+            peak_hour=self.peak_hour,
+            peak_hour_volume=self.hourly_abs_volume[self.peak_hour],
+            latency_seconds=time.monotonic() - received_at if received_at is not None else 0.0,
+            statistics=snapshot
+        )
+        
+        for callback in self._callbacks:
+            try:
+                callback(update)
+            except Exception as e:
+                self.logger.error(f"Intraday callback failed: {str(e)}")
+        
+        return update
+
+    def poll_once(self) -> Optional[IntradayUpdate]:
+        """
+        Request the next expected period, returning None if it is not
+        published yet or the day is complete
+        """
+        if self.is_complete:
+            return None
+        
+        df = self.api.get_imbalance_data(self.settlement_date, settlement_period=self.next_period)
+        received_at = time.monotonic()
+        if df.empty:
+            return None
+        
+        row = df.iloc[-1]
+        values = [row['systemSellPrice'], row['systemBuyPrice'], row['netImbalanceVolume']]
+        if any(math.isnan(value) for value in values):
+            self.logger.warning(f"Incomplete data for period {self.next_period}, retrying later")
+            return None
+        
+        return self.add_period(
+            int(row['settlementPeriod']),
+            row['timestamp'].to_pydatetime(),
+            *values,
+            received_at=received_at
+        )
+
+    def run(self, interval: float = 60.0, max_polls: Optional[int] = None):
+        """
+        Poll until the day is complete, stop() is called or max_polls is
+        reached. Published periods are caught up without waiting.
+        """
+        polls = 0
+        while not self.is_complete and not self._stop.is_set():
+            if max_polls is not None and polls >= max_polls:
+                break
+            polls += 1
+            
+            try:
+                update = self.poll_once()
+            except BMRSError as e:
+                self.logger.warning(f"Intraday poll failed: {str(e)}")
+                update = None
+            
+            if update is None:
+                self._stop.wait(interval)
+
+    def stop(self):
+        """Stop a running poll loop"""
+        self._stop.set()
@@ -1,16 +1,32 @@
 import requests
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import logging
-from utils.helpers import BMRSError
+from api.concurrency import shared_limiter
+from api.hedging import DeadlineExceeded, HedgedRequests
+from api.revalidation import ValidatorStore
+from api.schema import parse_system_prices
+from utils.helpers import BMRSError, validate_settlement_period
 
 class BMRSApi:
     """Class for calling BMRS System Prices API endpoint"""
     
-    def __init__(self):
+    def __init__(self, validator_store=None, base_url="https://data.elexon.co.uk/bmrs/api/v1", limiter=None,
+                 timeout=30.0, hedger=None):
         """Initialise the BMRS API"""
         
-        self.base_url = "https://data.elexon.co.uk/bmrs/api/v1"
+        self.base_url = base_url
+        
+        # Validators for conditional requests of previously fetched days
+        self.validators = validator_store or ValidatorStore()
+        
+        # Adaptive limit on concurrent requests, shared by the clients of the server
+        self.limiter = limiter or shared_limiter(base_url)
+        self.timeout = timeout
+        
+        # Hedged requests for fetches with a deadline
+        self.hedger = hedger or HedgedRequests()
         
         # Set up logging
         logging.basicConfig(
@@ -19,9 +35,11 @@ class BMRSApi:
         )
         self.logger = logging.getLogger(__name__)
 
-    def get_imbalance_data(self, settlement_date):
+    def get_imbalance_data(self, settlement_date, settlement_period=None, deadline=None):
         """
-        Fetch imbalance prices for a given settlement date
+        Fetch imbalance prices for a given settlement date, or for a
+        single settlement period of that date. With a deadline the HTTP
+        request is hedged and DeadlineExceeded is raised once it passes.
         """
         
         try:
@@ -32,15 +50,32 @@ class BMRSApi:
             endpoint = f"{self.base_url}/balancing/settlement/system-prices/{settlement_date}"
             params = {'format': 'json'}
             
-            # Make the API request
+            if settlement_period is not None:
+                validate_settlement_period(settlement_period, settlement_date)
+                return self._get_period_data(f"{endpoint}/{int(settlement_period)}", params,
+                                             settlement_date, settlement_period)
+            
+            # Make the API request, conditional if the day was fetched before
             self.logger.info(f"Fetching system prices data for {settlement_date}")
             
-            response = requests.get(endpoint, params=params)
+            headers = self.validators.conditional_headers(settlement_date)
+            send = lambda: self.limiter.request(requests.get, endpoint, params=params, headers=headers,
+                                                timeout=self.timeout)
+            # Only the request is duplicated; decoding and the validator update run once
+            response = send() if deadline is None else self.hedger.call(send, deadline=deadline)
             
             # Log request details
             self.logger.info(f"Request URL: {response.url}")
             self.logger.info(f"Response status code: {response.status_code}")
             
+            # Serve unchanged days from the validator store without decoding
+            cached = self.validators.check_response(settlement_date, response)
+            if cached is not None:
+                self.logger.info(f"Data for {settlement_date} unchanged, using cached copy")
+                if cached.payload is None:
+                    cached.payload = self._to_dataframe(cached.records)
+                return cached.payload.copy()
+            
             # Check if request was successful
             response.raise_for_status()
             
@@ -51,36 +86,15 @@ class BMRSApi:
             if not response_data or 'data' not in response_data:
                 raise BMRSError(f"No data returned for {settlement_date}")
             
-            # Define expected columns and their types
-            column_types = {
-                'settlementDate': 'str',
-                'settlementPeriod': 'int',
-                'startTime': 'str',
-                'systemSellPrice': 'float',
-                'systemBuyPrice': 'float',
-                'netImbalanceVolume': 'float',
-                'totalAcceptedOfferVolume': 'float',
-                'totalAcceptedBidVolume': 'float'
-            }
-            
-            # Convert to DataFrame with specified dtypes
-            df = pd.DataFrame(response_data['data'])
-            
-            # Convert columns to specified types
-            for col, dtype in column_types.items():
-                if col in df.columns:
-                    df[col] = df[col].astype(dtype)
-            
-            # Convert startTime to timestamp
-            df['timestamp'] = pd.to_datetime(df['startTime'])
-            
-            # Sort by settlement period
-            df = df.sort_values(['settlementDate', 'settlementPeriod'])
+            df = self._to_dataframe(response_data['data'])
+            self.validators.update(settlement_date, response, response_data['data'], df)
             
             self.logger.info(f"Successfully retrieved {len(df)} periods for {settlement_date}")
             
             return df
             
+        except DeadlineExceeded:
+            raise
         except requests.exceptions.RequestException as e:
             self.logger.error(f"API request failed: {str(e)}")
             raise BMRSError(f"Failed to fetch data: {str(e)}")
@@ -91,9 +105,10 @@ class BMRSApi:
             self.logger.error(f"Error processing data: {str(e)}")
             raise BMRSError(f"Error processing data: {str(e)}")
 
-    def get_historic_imbalance_data(self, start_date, end_date):
+    def get_historic_imbalance_data(self, start_date, end_date, deadline=None):
         """
-        Fetch historic imbalance data for a date range
+        Fetch historic imbalance data for a date range; with a deadline,
+        days still unanswered when it passes are left out
         """
         
         try:
@@ -104,38 +119,72 @@ class BMRSApi:
             if end < start:
                 raise BMRSError("End date must be after start date")
             
-            # Fetch data for each day
-            all_data = []
-            current_date = start
-            
-            while current_date <= end:
-                date_str = current_date.strftime('%Y-%m-%d')
-                try:
-                    df = self.get_imbalance_data(date_str)
-                    if not df.empty:  # Only append non-empty DataFrames
-                        all_data.append(df)
-                    self.logger.info(f"Successfully retrieved data for {date_str}")
-                except BMRSError as e:
-                    self.logger.warning(f"Failed to fetch data for {date_str}: {str(e)}")
-                current_date += timedelta(days=1)
+            # Fetch days concurrently; the limiter adapts how many are in flight
+            dates = [(start + timedelta(days=d)).strftime('%Y-%m-%d') for d in range((end - start).days + 1)]
+            workers = min(len(dates), int(self.limiter.max_limit))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(lambda date: self._fetch_day(date, deadline), dates))
+            
+            # Only keep non-empty DataFrames
+            all_data = [df for df in results if df is not None and not df.empty]
+            failed = [date for date, df in zip(dates, results) if df is None or df.empty]
+            if failed:
+                self.logger.warning(f"No data retrieved for {len(failed)} days: {', '.join(failed)}")
             
             if not all_data:
                 raise BMRSError("No data retrieved for the specified date range")
                 
             # Ensure all DataFrames have the same columns before concatenation
             common_columns = set.intersection(*[set(df.columns) for df in all_data])
-            all_data = [df[list(common_columns)] for df in all_data]
+            columns = [col for col in all_data[0].columns if col in common_columns]
+            all_data = [df[columns] for df in all_data]
             
             # Concatenate all data
             combined_df = pd.concat(all_data, ignore_index=True)
             
             # Sort by timestamp
-            combined_df = combined_df.sort_values('timestamp')
+            combined_df = combined_df.sort_values('timestamp', ignore_index=True)
             
             self.logger.info(f"Successfully retrieved data for {len(all_data)} days")
+            self.logger.info(f"Revalidation: {self.validators.stats.summary()}")
+            self.logger.info(f"Concurrency: {self.limiter.summary()}")
             
             return combined_df
             
         except Exception as e:
             self.logger.error(f"Error fetching historic data: {str(e)}")
-            raise BMRSError(f"Error fetching historic data: {str(e)}")
\ No newline at end of file
+            raise BMRSError(f"Error fetching historic data: {str(e)}")
+
+    def _fetch_day(self, date_str, deadline=None):
+        """Fetch one day of a range, returning None if it failed"""
+        
+        try:
+            df = self.get_imbalance_data(date_str, deadline=deadline)
+            self.logger.info(f"Successfully retrieved data for {date_str}")
+            return df
+        except BMRSError as e:
+            self.logger.warning(f"Failed to fetch data for {date_str}: {str(e)}")
+            return None
+
+    def _get_period_data(self, endpoint, params, settlement_date, settlement_period):
+        """
+        Fetch a single settlement period, returning an empty DataFrame
+        if the period has not been published yet
+        """
+        
+        response = self.limiter.request(requests.get, endpoint, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        
+        records = (response.json() or {}).get('data') or []
+        if not records:
+            self.logger.info(f"No data yet for {settlement_date} period {settlement_period}")
+            return pd.DataFrame()
+        
+        return self._to_dataframe(records)
+
+    @staticmethod
+    def _to_dataframe(records):
+        """
+        Convert raw API records to a typed DataFrame sorted by settlement period
+        """
+        return parse_system_prices(records)
\ No newline at end of file
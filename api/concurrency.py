@@ -0,0 +1,166 @@
+from collections import deque
+from dataclasses import dataclass
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+import numpy as np
+import requests
+
+# Responses telling the client to slow down
+THROTTLE_STATUSES = {429, 503}
+
+@dataclass
+class LimiterStats:
+    """Counters of an AdaptiveLimiter"""
+    requests: int = 0
+    throttled: int = 0
+    timeouts: int = 0
+    latency_backoffs: int = 0
+    retries: int = 0
+    peak_in_flight: int = 0
+
+    def summary(self, limit: float) -> str:
+        return (
+            f"limit {limit:.1f}, peak {self.peak_in_flight} in flight, {self.requests} requests, "
+            f"{self.throttled} throttled, {self.timeouts} timeouts, "
+            f"{self.latency_backoffs} latency backoffs, {self.retries} retries"
+        )
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on the number of in-flight requests.
+
+    Every successful response whose latency is within latency_tolerance x
+    the baseline raises the limit by increase / limit, i.e. by about
+    `increase` per round trip. The baseline is the baseline_quantile
+    (median by default) of recent full responses; 304 Not Modified answers
+    are much faster than a full body, so they are checked against the
+    baseline but do not enter it. A 429/503, a timeout or a latency above
+    the tolerance multiplies the limit by decrease, at most once per round
+    of requests: responses to requests sent before the last decrease do
+    not decrease it again.
+    """
+
+    def __init__(self, initial: float = 4, min_limit: float = 1, max_limit: float = 32,
+                 increase: float = 1.0, decrease: float = 0.5, latency_tolerance: float = 3.0,
+                 latency_window: int = 200, baseline_quantile: float = 0.5, backoff: float = 0.5,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.baseline_quantile = baseline_quantile
+        self.backoff = backoff
+        self.clock = clock
+        self.stats = LimiterStats()
+        self.logger = logging.getLogger(__name__)
+
+        self._in_flight = 0
+        self._epoch = 0
+        self._latencies = deque(maxlen=latency_window)
+        self._condition = threading.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self) -> int:
+        """Wait for a free slot; returns the epoch the request was sent in"""
+        with self._condition:
+            while self._in_flight >= int(self.limit):
+                self._condition.wait()
+            self._in_flight += 1
+            self.stats.requests += 1
+            self.stats.peak_in_flight = max(self.stats.peak_in_flight, self._in_flight)
+            return self._epoch
+
+    def release(self, epoch: int, latency: Optional[float] = None, congested: Optional[str] = None,
+                full: bool = True):
+        """
+        Free a slot and adapt the limit. congested is 'throttled' or
+        'timeout' for failed requests; otherwise latency is checked
+        against the baseline, which only full responses update.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if congested is None and latency is not None:
+                if full:
+                    self._latencies.append(latency)
+                baseline = float(np.quantile(self._latencies, self.baseline_quantile)) if self._latencies else None
+                if len(self._latencies) > 1 and latency > self.latency_tolerance * baseline:
+                    congested = 'latency'
+                else:
+                    self.limit = min(self.limit + self.increase / self.limit, self.max_limit)
+
+            if congested is not None:
+                if congested == 'throttled':
+                    self.stats.throttled += 1
+                elif congested == 'timeout':
+                    self.stats.timeouts += 1
+                if epoch == self._epoch:
+                    self._epoch += 1
+                    self.limit = max(self.limit * self.decrease, self.min_limit)
+                    if congested == 'latency':
+                        self.stats.latency_backoffs += 1
+                    self.logger.info(f"Backing off ({congested}), concurrency limit now {self.limit:.1f}")
+            self._condition.notify_all()
+
+    def request(self, func: Callable, *args, retries: int = 3, **kwargs):
+        """
+        Call func (e.g. requests.get) within a slot, adapting the limit to
+        the outcome. Throttled requests and timeouts are retried up to
+        `retries` times, waiting for Retry-After or an exponential backoff.
+        """
+        for attempt in range(retries + 1):
+            epoch = self.acquire()
+            start = self.clock()
+            try:
+                response = func(*args, **kwargs)
+            except requests.exceptions.Timeout:
+                self.release(epoch, congested='timeout')
+                if attempt == retries:
+                    raise
+                self._wait(attempt)
+                continue
+            except Exception:
+                self.release(epoch)
+                raise
+
+            if response.status_code in THROTTLE_STATUSES:
+                self.release(epoch, congested='throttled')
+                if attempt == retries:
+                    return response
+                self._wait(attempt, response.headers.get('Retry-After'))
+                continue
+
+            self.release(epoch, latency=self.clock() - start, full=response.status_code != 304)
+            return response
+
+    def _wait(self, attempt: int, retry_after: Optional[str] = None):
+        self.stats.retries += 1
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = self.backoff * 2 ** attempt
+        time.sleep(delay)
+
+    def summary(self) -> str:
+        return self.stats.summary(self.limit)
+
+_shared_limiters: Dict[str, AdaptiveLimiter] = {}
+_shared_lock = threading.Lock()
+
+def shared_limiter(base_url: str) -> AdaptiveLimiter:
+    """
+    The limiter of every client of a server that is not given its own, so
+    BMRSApi and FetchScheduler requests to one host count against one limit
+    """
+    host = urlsplit(base_url).netloc
+    with _shared_lock:
+        if host not in _shared_limiters:
+            _shared_limiters[host] = AdaptiveLimiter()
+        return _shared_limiters[host]
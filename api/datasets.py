@@ -0,0 +1,269 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+import requests
+from api.concurrency import AdaptiveLimiter, shared_limiter
+from api.schema import to_float, settlement_period_start
+from utils.helpers import BMRSError, periods_in_day
+
+@dataclass
+class DatasetSpec:
+    """
+    Declaration of one Elexon dataset.
+
+    path and params may contain {date} (one request per settlement date)
+    or {start} and {end} (one request per chunk of up to max_days days).
+    columns maps raw fields to output column names. When pivot is set,
+    the single value column is spread into one column per value of the
+    pivot field, named <prefix><value>.
+    """
+    name: str
+    path: str
+    columns: Dict[str, str]
+    params: Dict[str, str] = field(default_factory=lambda: {'format': 'json'})
+    date_field: str = 'settlementDate'
+    period_field: str = 'settlementPeriod'
+    aggregation: str = 'last'  # How several records of one period combine: 'last', 'sum' or 'mean'
+    pivot: Optional[str] = None
+    prefix: str = ''
+    max_days: int = 7
+
+    @property
+    def per_day(self) -> bool:
+        return '{date}' in self.path or any('{date}' in value for value in self.params.values())
+
+    def requests_for(self, dates: List[str]) -> List[tuple]:
+        """(path, params) of every request covering the dates"""
+        if self.per_day:
+            chunks = [(date, date) for date in dates]
+        else:
+            chunks = [(dates[i], dates[min(i + self.max_days, len(dates)) - 1])
+                      for i in range(0, len(dates), self.max_days)]
+        return [
+            (
+                self.path.format(date=start, start=start, end=end),
+                tuple(sorted((key, value.format(date=start, start=start, end=end))
+                             for key, value in self.params.items()))
+            )
+            for start, end in chunks
+        ]
+
+class DatasetRegistry:
+    """Named dataset declarations"""
+
+    def __init__(self, specs: Iterable[DatasetSpec] = ()):
+        self._specs: Dict[str, DatasetSpec] = {}
+        for spec in specs:
+            self.register(spec)
+
+    def register(self, spec: DatasetSpec):
+        outputs = set(spec.columns.values())
+        for other in self._specs.values():
+            if other.name != spec.name and outputs & set(other.columns.values()) and not (spec.pivot or other.pivot):
+                raise BMRSError(f"Dataset {spec.name} reuses output columns of {other.name}")
+        self._specs[spec.name] = spec
+
+    def get(self, name: str) -> DatasetSpec:
+        if name not in self._specs:
+            raise BMRSError(f"Unknown dataset: {name}")
+        return self._specs[name]
+
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+DEFAULT_REGISTRY = DatasetRegistry([
+    DatasetSpec(
+        name='system_prices',
+        path='/balancing/settlement/system-prices/{date}',
+        columns={
+            'systemSellPrice': 'system_sell_price',
+            'systemBuyPrice': 'system_buy_price',
+            'netImbalanceVolume': 'net_imbalance_volume'
+        }
+    ),
+    DatasetSpec(
+        # Served by the system prices endpoint; the shared request is made once
+        name='accepted_volumes',
+        path='/balancing/settlement/system-prices/{date}',
+        columns={
+            'totalAcceptedOfferVolume': 'accepted_offer_volume',
+            'totalAcceptedBidVolume': 'accepted_bid_volume'
+        }
+    ),
+    DatasetSpec(
+        name='demand',
+        path='/demand/outturn',
+        params={'settlementDateFrom': '{start}', 'settlementDateTo': '{end}', 'format': 'json'},
+        columns={
+            'initialDemandOutturn': 'demand_outturn',
+            'initialTransmissionSystemDemandOutturn': 'transmission_demand_outturn'
+        }
+    ),
+    DatasetSpec(
+        name='generation',
+        path='/datasets/FUELHH',
+        params={'settlementDateFrom': '{start}', 'settlementDateTo': '{end}', 'format': 'json'},
+        columns={'generation': 'generation'},
+        pivot='fuelType',
+        prefix='generation_',
+        aggregation='sum'
+    )
+])
+
+class FetchScheduler:
+    """
+    Shared thread pool for dataset requests. Identical requests of
+    several datasets are made once; the limiter adapts how many of the
+    max_workers threads have a request in flight.
+    """
+
+    def __init__(self, base_url: str, max_workers: int = 32, timeout: float = 30.0,
+                 limiter: Optional[AdaptiveLimiter] = None):
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.timeout = timeout
+        # BMRSApi's limiter of the same server unless one is given
+        self.limiter = limiter or shared_limiter(base_url)
+        self.logger = logging.getLogger(__name__)
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _get(self, request: tuple):
+        path, params = request
+        try:
+            response = self.limiter.request(self._session().get, f"{self.base_url}{path}",
+                                            params=dict(params), timeout=self.timeout)
+            response.raise_for_status()
+            body = response.json()
+            return body.get('data', []) if isinstance(body, dict) else body
+        except (requests.exceptions.RequestException, ValueError) as e:
+            self.logger.warning(f"Failed to fetch {path}: {str(e)}")
+            return None
+
+    def fetch(self, requests_: List[tuple]) -> Dict[tuple, Optional[list]]:
+        """Records of every unique request, None for failed requests"""
+        unique = list(dict.fromkeys(requests_))
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(len(unique), 1))) as executor:
+            responses = dict(zip(unique, executor.map(self._get, unique)))
+        self.logger.info(f"Concurrency: {self.limiter.summary()}")
+        return responses
+
+class DatasetFetcher:
+    """
+    Fetches several registered datasets for a date range through one
+    scheduler and aligns them onto the settlement grid: one row per
+    settlement date and period (46, 48 or 50 per day).
+    """
+
+    def __init__(self, base_url: str = "https://data.elexon.co.uk/bmrs/api/v1",
+                 registry: DatasetRegistry = DEFAULT_REGISTRY, scheduler: Optional[FetchScheduler] = None):
+        self.registry = registry
+        self.scheduler = scheduler or FetchScheduler(base_url)
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def settlement_grid(start_date: str, end_date: str) -> pd.DataFrame:
+        """Settlement dates, periods and UTC start times of a date range"""
+        dates = DatasetFetcher._dates(start_date, end_date)
+        counts = np.array([periods_in_day(date) for date in dates])
+        settlement_dates = np.repeat(dates, counts)
+        periods = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+        return pd.DataFrame({
+            'settlement_date': settlement_dates,
+            'settlement_period': periods,
+            'timestamp': settlement_period_start(settlement_dates, periods)
+        })
+
+    @staticmethod
+    def _dates(start_date: str, end_date: str) -> List[str]:
+        start = datetime.strptime(start_date, '%Y-%m-%d')
+        end = datetime.strptime(end_date, '%Y-%m-%d')
+        if end < start:
+            raise BMRSError("End date must be after start date")
+        return [(start + timedelta(days=d)).strftime('%Y-%m-%d') for d in range((end - start).days + 1)]
+
+    def fetch(self, names: Iterable[str], start_date: str, end_date: str) -> pd.DataFrame:
+        """Fetch datasets concurrently and return them aligned on the settlement grid"""
+        try:
+            specs = [self.registry.get(name) for name in names]
+            dates = self._dates(start_date, end_date)
+            planned = {spec.name: spec.requests_for(dates) for spec in specs}
+            responses = self.scheduler.fetch([request for requests_ in planned.values() for request in requests_])
+
+            grid = self.settlement_grid(start_date, end_date)
+            for spec in specs:
+                results = [responses[request] for request in planned[spec.name]]
+                failed = sum(result is None for result in results)
+                if failed:
+                    self.logger.warning(f"{failed} of {len(results)} requests failed for {spec.name}")
+                records = [record for result in results if result for record in result]
+                for column, values in self.align(spec, records, dates).items():
+                    grid[column] = values
+            return grid
+
+        except BMRSError:
+            raise
+        except Exception as e:
+            raise BMRSError(f"Error fetching datasets: {str(e)}")
+
+    @staticmethod
+    def align(spec: DatasetSpec, records: List[dict], dates: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Scatter a dataset's records onto the settlement grid of dates.
+        Returns one array per output column, in grid row order.
+        """
+        counts = np.array([periods_in_day(date) for date in dates])
+        offsets = np.cumsum(counts) - counts
+        n_rows = int(counts.sum())
+        date_index = {date: i for i, date in enumerate(dates)}
+
+        day = np.array([date_index.get(str(record.get(spec.date_field))[:10], -1) for record in records], dtype=np.int64)
+        period = to_float([record.get(spec.period_field) for record in records])
+        valid = (day >= 0) & ~np.isnan(period)
+        period = np.where(valid, period, 1).astype(np.int64)
+        valid &= (period >= 1) & (period <= counts[np.maximum(day, 0)])
+        rows = offsets[np.maximum(day, 0)] + period - 1
+
+        if spec.pivot is None:
+            keys = rows[valid]
+            outputs = {
+                output: to_float([record.get(raw) for record in records])[valid]
+                for raw, output in spec.columns.items()
+            }
+            n_cells = n_rows
+            labels = None
+        else:
+            categories = np.array([str(record.get(spec.pivot)) for record in records], dtype=object)
+            codes, labels = pd.factorize(categories[valid])
+            keys = codes * n_rows + rows[valid]
+            raw, = spec.columns
+            outputs = {None: to_float([record.get(raw) for record in records])[valid]}
+            n_cells = len(labels) * n_rows
+
+        aligned = {}
+        for output, values in outputs.items():
+            present = ~np.isnan(values)
+            if spec.aggregation == 'last':
+                cells = np.full(n_cells, np.nan)
+                cells[keys[present]] = values[present]
+            else:
+                total = np.bincount(keys[present], values[present], minlength=n_cells)
+                number = np.bincount(keys[present], minlength=n_cells)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    cells = np.where(number > 0, total / number if spec.aggregation == 'mean' else total, np.nan)
+
+            if labels is None:
+                aligned[output] = cells
+            else:
+                for i, label in enumerate(labels):
+                    aligned[f"{spec.prefix}{str(label).lower()}"] = cells[i * n_rows:(i + 1) * n_rows]
+        return aligned
@@ -0,0 +1,128 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+import logging
+import threading
+import time
+from typing import Callable, Optional
+import numpy as np
+from utils.helpers import BMRSError
+
+class DeadlineExceeded(BMRSError):
+    """Raised when a request is still unanswered at the run's deadline"""
+
+class Deadline:
+    """Overall time budget of a run, in seconds from its creation"""
+
+    def __init__(self, budget: float, clock: Callable[[], float] = time.perf_counter):
+        self.budget = budget
+        self.clock = clock
+        self.expires = clock() + budget
+
+    def remaining(self) -> float:
+        return max(self.expires - self.clock(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+@dataclass
+class HedgeStats:
+    """Counters of HedgedRequests"""
+    requests: int = 0
+    hedged: int = 0        # Duplicate requests sent
+    hedge_wins: int = 0    # Duplicates answered before the original request
+    deadline_misses: int = 0
+
+    def summary(self, delay: float) -> str:
+        return (
+            f"hedge after {delay * 1000:.0f} ms, {self.requests} requests, {self.hedged} hedged, "
+            f"{self.hedge_wins} won by the hedge, {self.deadline_misses} past the deadline"
+        )
+
+class HedgedRequests:
+    """
+    Hedged calls with an optional deadline.
+
+    A call that has not answered within the observed quantile (p95 by
+    default) of recent latencies is sent again, and the first answer of
+    either copy is used. Until min_samples latencies have been seen the
+    hedge is sent after initial_delay. With a Deadline, a call still
+    unanswered when it expires raises DeadlineExceeded; calls cannot be
+    cancelled, so the abandoned copies finish in the background.
+    """
+
+    def __init__(self, quantile: float = 0.95, window: int = 200, min_samples: int = 20,
+                 initial_delay: float = 1.0, max_workers: int = 32, clock: Callable[[], float] = time.perf_counter):
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self.max_workers = max_workers
+        self.clock = clock
+        self.stats = HedgeStats()
+        self.logger = logging.getLogger(__name__)
+
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def hedge_delay(self) -> float:
+        """Time after which a call is duplicated: the latency quantile, once known"""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return self.initial_delay
+            return float(np.quantile(self._latencies, self.quantile))
+
+    def _submit(self, func: Callable, *args, **kwargs):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='hedge')
+        return self._executor.submit(func, *args, **kwargs)
+
+    def call(self, func: Callable, *args, deadline: Optional[Deadline] = None, **kwargs):
+        """Call func, hedging a slow call and giving up at the deadline"""
+        if deadline is not None and deadline.expired:
+            self.stats.deadline_misses += 1
+            raise DeadlineExceeded("Deadline passed before the request was sent")
+
+        start = self.clock()
+        delay = self.hedge_delay()
+        self.stats.requests += 1
+        primary = self._submit(func, *args, **kwargs)
+        pending = {primary}
+        hedged = False
+
+        while True:
+            timeout = None if deadline is None else deadline.remaining()
+            if not hedged:
+                wait_hedge = max(delay - (self.clock() - start), 0.0)
+                timeout = wait_hedge if timeout is None else min(timeout, wait_hedge)
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                if future.exception() is None:
+                    with self._lock:
+                        self._latencies.append(self.clock() - start)
+                    if future is not primary:
+                        self.stats.hedge_wins += 1
+                    return future.result()
+            if done and not pending:
+                # Every copy sent has failed
+                raise next(iter(done)).exception()
+
+            if deadline is not None and deadline.expired:
+                self.stats.deadline_misses += 1
+                raise DeadlineExceeded(f"No response within the deadline ({deadline.budget:.1f}s budget)")
+            if not hedged and pending and self.clock() - start >= delay:
+                hedged = True
+                self.stats.hedged += 1
+                pending.add(self._submit(func, *args, **kwargs))
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def summary(self) -> str:
+        return self.stats.summary(self.hedge_delay())
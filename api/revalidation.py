@@ -0,0 +1,166 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+@dataclass
+class DayValidator:
+    """Validators and cached records for a single settlement day"""
+    settlement_date: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    records: List[dict] = field(default_factory=list)
+    payload: Any = None  # Decoded result, kept in memory only
+
+@dataclass
+class RevalidationStats:
+    """Counts of how each day was served by the fetch layer"""
+    revalidated: int = 0  # Server confirmed the cached copy (304 or same content hash)
+    refreshed: int = 0    # Server returned changed data for a known day
+    fetched: int = 0      # First download of a day
+
+    def summary(self) -> str:
+        return (
+            f"{self.revalidated} days revalidated, "
+            f"{self.refreshed} days refreshed, "
+            f"{self.fetched} days fetched"
+        )
+
+class ValidatorStore:
+    """
+    Store of per-day HTTP validators (ETag, Last-Modified, content hash)
+    used to make conditional requests for recent settlement days.
+
+    Validators and raw records are optionally persisted as one JSON file
+    per day under ``path`` so they survive between runs.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.stats = RevalidationStats()
+        self.logger = logging.getLogger(__name__)
+        self._entries: Dict[str, DayValidator] = {}
+
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+
+    def get(self, settlement_date: str) -> Optional[DayValidator]:
+        """Return the stored validator for a day, loading it from disk if needed"""
+        entry = self._entries.get(settlement_date)
+        if entry is None and self.path:
+            entry = self._load(settlement_date)
+            if entry is not None:
+                self._entries[settlement_date] = entry
+        return entry
+
+    def conditional_headers(self, settlement_date: str) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers for a day"""
+        entry = self.get(settlement_date)
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def check_response(self, settlement_date: str, response) -> Optional[DayValidator]:
+        """
+        Return the stored entry if the response says the day is unchanged,
+        otherwise None. Unchanged means a 304 status or, when the server
+        sends no validators, a body with the same content hash.
+        """
+        entry = self.get(settlement_date)
+        if entry is None:
+            return None
+
+        if response.status_code == 304:
+            self.stats.revalidated += 1
+            return entry
+
+        content_hash = self._hash_content(response)
+        if content_hash is not None and content_hash == entry.content_hash:
+            entry.etag, entry.last_modified = self._response_validators(response)
+            self.stats.revalidated += 1
+            return entry
+
+        return None
+
+    def update(self, settlement_date: str, response, records: List[dict],
+               payload: Any = None) -> DayValidator:
+        """Record validators and data for a freshly downloaded day"""
+        if self.get(settlement_date) is None:
+            self.stats.fetched += 1
+        else:
+            self.stats.refreshed += 1
+
+        etag, last_modified = self._response_validators(response)
+        entry = DayValidator(
+            settlement_date=settlement_date,
+            etag=etag,
+            last_modified=last_modified,
+            content_hash=self._hash_content(response),
+            records=records,
+            payload=payload
+        )
+        self._entries[settlement_date] = entry
+
+        if self.path:
+            self._save(entry)
+
+        return entry
+
+    def reset_stats(self):
+        """Reset the revalidation counters"""
+        self.stats = RevalidationStats()
+
+    @staticmethod
+    def _response_validators(response):
+        """Extract ETag and Last-Modified headers from a response"""
+        headers = getattr(response, 'headers', None) or {}
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        return (
+            etag if isinstance(etag, str) else None,
+            last_modified if isinstance(last_modified, str) else None
+        )
+
+    @staticmethod
+    def _hash_content(response) -> Optional[str]:
+        """Hash the raw response body, used when no validators are sent"""
+        content = getattr(response, 'content', None)
+        if not isinstance(content, bytes):
+            return None
+        return hashlib.sha256(content).hexdigest()
+
+    def _file_path(self, settlement_date: str) -> str:
+        return os.path.join(self.path, f"{settlement_date}.json")
+
+    def _load(self, settlement_date: str) -> Optional[DayValidator]:
+        file_path = self._file_path(settlement_date)
+        if not os.path.exists(file_path):
+            return None
+        try:
+            with open(file_path) as f:
+                return DayValidator(**json.load(f))
+        except (OSError, ValueError, TypeError) as e:
+            self.logger.warning(f"Ignoring unreadable validator file {file_path}: {str(e)}")
+            return None
+
+    def _save(self, entry: DayValidator):
+        data = {
+            'settlement_date': entry.settlement_date,
+            'etag': entry.etag,
+            'last_modified': entry.last_modified,
+            'content_hash': entry.content_hash,
+            'records': entry.records
+        }
+        tmp_path = f"{self._file_path(entry.settlement_date)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self._file_path(entry.settlement_date))
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+# Columns of the system prices endpoint and their dtypes
+SYSTEM_PRICES_SCHEMA = {
+    'settlementDate': 'str',
+    'settlementPeriod': 'int',
+    'startTime': 'str',
+    'systemSellPrice': 'float',
+    'systemBuyPrice': 'float',
+    'netImbalanceVolume': 'float',
+    'totalAcceptedOfferVolume': 'float',
+    'totalAcceptedBidVolume': 'float'
+}
+
+def settlement_period_start(settlement_dates, settlement_periods):
+    """
+    UTC start time of settlement periods: local midnight of the settlement
+    date in Europe/London plus 30 minutes per elapsed period
+    """
+    midnight = (
+        pd.to_datetime(pd.Series(settlement_dates).reset_index(drop=True), format='%Y-%m-%d')
+        .dt.tz_localize('Europe/London')
+        .dt.tz_convert('UTC')
+    )
+    offsets = pd.to_timedelta((np.asarray(settlement_periods, dtype=np.int64) - 1) * 30, unit='min')
+    return midnight + offsets
+
+def to_float(values):
+    """Float64 array of values, with unparseable values as NaN"""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64)
+
+def _parse_start_times(values):
+    """
+    UTC timestamps of startTime strings. The API's fixed
+    'YYYY-MM-DDTHH:MM:SSZ' form is parsed by numpy directly; anything
+    else goes through the general ISO 8601 parser.
+    """
+    if all(isinstance(value, str) and len(value) == 20 and value[-1] == 'Z' for value in values):
+        parsed = np.array([value[:19] for value in values], dtype='datetime64[s]')
+        return pd.Series(pd.DatetimeIndex(parsed.astype('datetime64[ns]'), tz='UTC'))
+    return pd.to_datetime(pd.Series(values), utc=True, format='ISO8601')
+
+def parse_system_prices(records):
+    """
+    Convert raw system prices records into a typed DataFrame.
+
+    Only schema columns are extracted, column by column, which avoids
+    building a frame of every field in the response. The UTC timestamp
+    comes from startTime, or from the settlement date and period when
+    startTime is absent.
+    """
+    records = list(records)
+    keys = set().union(*records) if records else set()
+    present = [col for col in SYSTEM_PRICES_SCHEMA if col in keys]
+    columns = {col: [record.get(col) for record in records] for col in present}
+
+    for col in present:
+        dtype = SYSTEM_PRICES_SCHEMA[col]
+        if dtype == 'float':
+            columns[col] = to_float(columns[col])
+        elif dtype == 'int':
+            columns[col] = np.asarray(columns[col], dtype=np.int64)
+    df = pd.DataFrame(columns)
+    for col in present:
+        if SYSTEM_PRICES_SCHEMA[col] == 'str':
+            df[col] = df[col].astype('str')
+
+    if 'startTime' in df.columns:
+        df['timestamp'] = _parse_start_times(columns['startTime'])
+    elif {'settlementDate', 'settlementPeriod'} <= set(df.columns):
+        df['timestamp'] = settlement_period_start(df['settlementDate'], df['settlementPeriod'])
+    else:
+        df['timestamp'] = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns, UTC]')
+
+    if {'settlementDate', 'settlementPeriod'} <= set(df.columns):
+        df = df.sort_values(['settlementDate', 'settlementPeriod'])
+    return df.reset_index(drop=True)
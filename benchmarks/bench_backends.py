@@ -0,0 +1,36 @@
+"""
+Benchmark the pandas and polars analysis backends on the daily imbalance
+metrics and hourly volume analyses of a multi-year range.
+
+Run from the project root (requires polars):
+    python -m benchmarks.bench_backends --years 5
+"""
+import argparse
+import pandas as pd
+from benchmarks.bench_period_matrix import timed
+from benchmarks.bench_sharded_analysis import make_frames
+from utils.imbalance_analysis import ImbalanceAnalysis
+from utils.volume_analysis import VolumeAnalysis
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--years', type=float, default=5)
+    args = parser.parse_args()
+
+    prices_df, volumes_df = make_frames(args.years)
+    print(f"Analysis Backend Benchmark ({len(volumes_df):,} periods)")
+    print('=' * 50)
+
+    for name, analyse, frames in [
+        ('daily metrics', ImbalanceAnalysis.calculate_daily_imbalance_metrics, (prices_df, volumes_df)),
+        ('hourly volumes', lambda *frames, backend: VolumeAnalysis.analyse_hourly_volumes(*frames, backend=backend)[0],
+         (volumes_df,))
+    ]:
+        pandas_time, expected = timed(lambda: analyse(*frames, backend='pandas'))
+        polars_time, result = timed(lambda: analyse(*frames, backend='polars'))
+        pd.testing.assert_frame_equal(result, expected)
+        print(f"{name}: pandas {pandas_time:.3f}s, polars {polars_time:.3f}s "
+              f"({pandas_time / polars_time:.1f}x)")
+
+if __name__ == '__main__':
+    main()
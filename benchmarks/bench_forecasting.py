@@ -0,0 +1,45 @@
+"""
+Benchmark the per-settlement-period forecasting baselines on ten years
+of history: a daily refit (one origin) and a one-year rolling-origin
+backtest.
+
+Run from the project root:
+    python -m benchmarks.bench_forecasting --years 10
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from utils.forecasting import BaselineForecaster
+
+def make_frames(years):
+    """Create synthetic processed prices and volumes with a daily profile"""
+    timestamps = pd.date_range('2014-01-01', periods=int(years * 365) * 48, freq='30min', tz='UTC')
+    rng = np.random.default_rng(0)
+    profile = np.sin(np.arange(len(timestamps)) % 48 / 48 * 2 * np.pi)
+    buy = 80 + 20 * profile + rng.normal(0, 5, len(timestamps))
+    prices_df = pd.DataFrame({'timestamp': timestamps, 'system_buy_price': buy, 'system_sell_price': buy - 5})
+    volumes_df = pd.DataFrame({'timestamp': timestamps,
+                               'net_imbalance_volume': 200 * profile + rng.normal(0, 100, len(timestamps))})
+    return prices_df, volumes_df
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--years', type=float, default=10)
+    parser.add_argument('--origins', type=int, default=365)
+    args = parser.parse_args()
+
+    frames = make_frames(args.years)
+    forecaster = BaselineForecaster()
+
+    print(f"Forecasting baselines on {args.years:g} years of history")
+    print('=' * 50)
+    for name, n_origins in [('Daily refit', 1), (f'Backtest ({args.origins} origins)', args.origins)]:
+        start = time.perf_counter()
+        result = forecaster.backtest(*frames, n_origins=n_origins)
+        print(f"{name:<32}{time.perf_counter() - start:>8.2f} s")
+    print()
+    print(result.metrics().round(3))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark the tail latency of day fetches with and without hedged
+requests against a local server that stalls on a fraction of requests.
+
+Run from the project root:
+    python -m benchmarks.bench_hedging --requests 200 --slow-fraction 0.05 --stall 1.0
+"""
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import logging
+import threading
+import time
+import numpy as np
+from api.hedging import Deadline, HedgedRequests
+from benchmarks.bench_pipeline import day_payload
+from services.api import APIService
+
+def serve(latency, slow_fraction, stall, seed=0):
+    rng = np.random.default_rng(seed)
+    lock = threading.Lock()
+    body = day_payload('2024-03-01')
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                slow = rng.random() < slow_fraction
+            time.sleep(stall if slow else latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def latencies(service, n, budget):
+    """Latency of n sequential fetches, each with its own deadline"""
+    times = []
+    for _ in range(n):
+        tick = time.perf_counter()
+        service.get_imbalance_frame('2024-03-01', Deadline(budget) if budget else None)
+        times.append(time.perf_counter() - tick)
+    return np.array(times)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--slow-fraction', type=float, default=0.05)
+    parser.add_argument('--stall', type=float, default=1.0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    server = serve(args.latency, args.slow_fraction, args.stall)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    print(f"Hedged Request Benchmark ({args.requests} requests, {args.slow_fraction:.0%} stall for {args.stall:.1f}s)")
+    print('=' * 50)
+
+    plain = latencies(APIService(base_url), args.requests, None)
+    hedged_service = APIService(base_url, hedger=HedgedRequests(initial_delay=4 * args.latency))
+    hedged = latencies(hedged_service, args.requests, 10 * args.stall)
+
+    for name, times in [('unhedged', plain), ('hedged', hedged)]:
+        p50, p95, p99 = np.quantile(times, [0.5, 0.95, 0.99]) * 1000
+        print(f"{name}: p50 {p50:.0f} ms, p95 {p95:.0f} ms, p99 {p99:.0f} ms, max {times.max() * 1000:.0f} ms")
+    print(f"hedging: {hedged_service.hedger.summary()}")
+
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark the consolidated ingestion pipeline against the two ingestion
+paths it replaced: BMRSApi's DataFrame coercion and the ImbalanceData
+services path. Each path is timed end to end, from raw API records to
+processed frames, and the parsing step is also timed on its own. The
+legacy services path did no cleaning, so it does less work than the
+other two.
+
+Run from the project root:
+    python -m benchmarks.bench_ingestion --days 365
+"""
+import argparse
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from models.imbalance_data import ImbalanceData
+from services.ingestion import IngestionPipeline
+from utils.data_processor import BMRSDataProcessor
+
+def make_records(days):
+    """Create synthetic raw API records with 48 periods per day"""
+    dates = pd.date_range('2023-01-01', periods=days, freq='D', tz='UTC')
+    rng = np.random.default_rng(0)
+    records = []
+    for date in dates:
+        for period in range(1, 49):
+            start = date + pd.Timedelta(minutes=30 * (period - 1))
+            records.append({
+                'settlementDate': date.strftime('%Y-%m-%d'),
+                'settlementPeriod': period,
+                'startTime': start.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'systemSellPrice': float(rng.uniform(60, 90)),
+                'systemBuyPrice': float(rng.uniform(90, 120)),
+                'netImbalanceVolume': float(rng.normal(0, 400)),
+                'totalAcceptedOfferVolume': float(rng.uniform(0, 1000)),
+                'totalAcceptedBidVolume': float(rng.uniform(-1000, 0))
+            })
+    return records
+
+def legacy_api_path(records):
+    """The former BMRSApi coercion followed by the raw DataFrame construction"""
+    df = pd.DataFrame(records)
+    for col, dtype in {'settlementDate': 'str', 'settlementPeriod': 'int', 'startTime': 'str',
+                       'systemSellPrice': 'float', 'systemBuyPrice': 'float',
+                       'netImbalanceVolume': 'float'}.items():
+        df[col] = df[col].astype(dtype)
+    df['timestamp'] = pd.to_datetime(df['startTime'])
+    return df.sort_values(['settlementDate', 'settlementPeriod'])
+
+def legacy_service_path(records):
+    """The former ImbalanceData list and DataFrame of dataclass fields"""
+    items = [
+        ImbalanceData(
+            timestamp=datetime.fromisoformat(r['startTime'].rstrip('Z')),
+            settlement_period=r['settlementPeriod'],
+            system_buy_price=float(r['systemBuyPrice']),
+            system_sell_price=float(r['systemSellPrice']),
+            net_imbalance_volume=float(r['netImbalanceVolume']),
+            settlement_date=r['settlementDate']
+        )
+        for r in records
+    ]
+    return pd.DataFrame([vars(item) for item in items])
+
+def legacy_service_process(df):
+    """The former DataService.process_data, which split the frame without cleaning"""
+    prices_df = pd.DataFrame({
+        'timestamp': df['timestamp'],
+        'system_sell_price': df['system_sell_price'],
+        'system_buy_price': df['system_buy_price'],
+        'price_spread': df['system_buy_price'] - df['system_sell_price']
+    })
+    volumes_df = pd.DataFrame({
+        'timestamp': df['timestamp'],
+        'net_imbalance_volume': df['net_imbalance_volume'],
+        'abs_imbalance_volume': abs(df['net_imbalance_volume'])
+    })
+    return prices_df, volumes_df
+
+def best_of(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    records = make_records(args.days)
+    pipeline = IngestionPipeline()
+
+    parse_times = {
+        'BMRSApi coercion (legacy)': best_of(lambda: legacy_api_path(records), args.repeat),
+        'ImbalanceData list (legacy)': best_of(lambda: legacy_service_path(records), args.repeat),
+        'IngestionPipeline.parse': best_of(lambda: pipeline.parse(records), args.repeat)
+    }
+    total_times = {
+        'BMRSApi + cleaning (legacy)': best_of(
+            lambda: BMRSDataProcessor.clean_and_process_data(legacy_api_path(records)), args.repeat
+        ),
+        'ImbalanceData, no cleaning (legacy)': best_of(
+            lambda: legacy_service_process(legacy_service_path(records)), args.repeat
+        ),
+        'IngestionPipeline parse + process': best_of(lambda: pipeline.process(pipeline.parse(records)), args.repeat)
+    }
+
+    print(f"Ingestion of {len(records):,} records ({args.days} days)")
+    print('=' * 50)
+    print("Parsing")
+    for name, seconds in parse_times.items():
+        print(f"  {name:<36}{seconds * 1000:>10.1f} ms")
+    print("End to end")
+    for name, seconds in total_times.items():
+        print(f"  {name:<36}{seconds * 1000:>10.1f} ms")
+    fastest_legacy = min(parse_times['BMRSApi coercion (legacy)'], parse_times['ImbalanceData list (legacy)'])
+    print(f"Parse speedup over fastest legacy parse: {fastest_legacy / parse_times['IngestionPipeline.parse']:.2f}x")
+    print(
+        "End-to-end speedup over the legacy path with cleaning: "
+        f"{total_times['BMRSApi + cleaning (legacy)'] / total_times['IngestionPipeline parse + process']:.2f}x"
+    )
+
+if __name__ == '__main__':
+    main()
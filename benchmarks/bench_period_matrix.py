@@ -0,0 +1,92 @@
+"""
+Benchmark the dense day x period matrix kernels against the pandas
+groupbys they replace in the hourly volume and daily imbalance analyses.
+
+Run from the project root:
+    python -m benchmarks.bench_period_matrix --years 5
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from benchmarks.bench_sharded_analysis import make_frames
+from utils.period_matrix import PeriodMatrix
+
+HOURLY = {
+    'abs_imbalance_volume': ['mean', 'sum', 'std', 'min', 'max'],
+    'net_imbalance_volume': ['mean', 'sum']
+}
+
+DAILY = {
+    'imbalance_cost': ['sum'],
+    'net_imbalance_volume': ['sum'],
+    'abs_imbalance_volume': ['sum'],
+    'system_sell_price': ['mean', 'min', 'max'],
+    'system_buy_price': ['mean', 'min', 'max']
+}
+
+def groupby_hourly(volumes_df):
+    """Hourly statistics and per day and hour volumes with groupbys"""
+    df = volumes_df.copy()
+    df['hour'] = df['timestamp'].dt.hour
+    df['date'] = df['timestamp'].dt.date
+    stats = df.groupby('hour').agg(HOURLY)
+    peaks = df.groupby(['date', 'hour'])['abs_imbalance_volume'].sum()
+    return stats, peaks
+
+def matrix_hourly(volumes_df):
+    """Hourly statistics and per day and hour volumes from the matrix"""
+    matrix = PeriodMatrix.from_frames(volumes_df, columns=list(HOURLY))
+    return matrix.hourly_stats(HOURLY), matrix.hourly_totals('abs_imbalance_volume')
+
+def groupby_daily(prices_df, volumes_df):
+    """Daily imbalance metrics with a merge and a groupby"""
+    df = pd.merge(prices_df, volumes_df, on='timestamp', how='inner')
+    df['date'] = df['timestamp'].dt.date
+    df['imbalance_cost'] = np.where(
+        df['net_imbalance_volume'] >= 0,
+        df['net_imbalance_volume'] * df['system_sell_price'],
+        df['net_imbalance_volume'] * df['system_buy_price']
+    )
+    return df.groupby('date').agg(DAILY)
+
+def matrix_daily(prices_df, volumes_df):
+    """Daily imbalance metrics from the matrix"""
+    matrix = PeriodMatrix.from_frames(prices_df, volumes_df, columns=[c for c in DAILY if c != 'imbalance_cost'])
+    niv = matrix.values['net_imbalance_volume']
+    matrix.values['imbalance_cost'] = np.where(
+        niv >= 0, niv * matrix.values['system_sell_price'], niv * matrix.values['system_buy_price']
+    )
+    return matrix.daily_stats(DAILY)
+
+def timed(func, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--years', type=float, default=5)
+    args = parser.parse_args()
+
+    prices_df, volumes_df = make_frames(args.years)
+    print(f"Period Matrix Benchmark ({len(volumes_df):,} periods)")
+    print('=' * 50)
+
+    for name, reference, kernel, frames in [
+        ('hourly volumes', groupby_hourly, matrix_hourly, (volumes_df,)),
+        ('daily metrics', groupby_daily, matrix_daily, (prices_df, volumes_df))
+    ]:
+        groupby_time, expected = timed(reference, *frames)
+        matrix_time, result = timed(kernel, *frames)
+        stats = expected[0] if isinstance(expected, tuple) else expected
+        matrix_stats = result[0] if isinstance(result, tuple) else result
+        assert np.allclose(stats.to_numpy(), matrix_stats.to_numpy(), equal_nan=True)
+        print(f"{name}: groupby {groupby_time:.3f}s, matrix {matrix_time:.3f}s "
+              f"({groupby_time / matrix_time:.1f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark single-period and date-range lookups in the memory-mapped
+PeriodArrayStore against filtering a DataFrame.
+
+Run from the project root:
+    python -m benchmarks.bench_period_store --years 10
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from utils.period_store import PeriodArrayStore
+
+def make_raw_frame(years):
+    """Create synthetic raw API rows with 48 periods per day"""
+    days = pd.date_range('2015-01-01', periods=int(years * 365), freq='D')
+    rng = np.random.default_rng(0)
+    n = len(days) * 48
+    return pd.DataFrame({
+        'settlementDate': np.repeat(days.strftime('%Y-%m-%d'), 48),
+        'settlementPeriod': np.tile(np.arange(1, 49), len(days)),
+        'systemSellPrice': rng.uniform(60, 90, n),
+        'systemBuyPrice': rng.uniform(90, 120, n),
+        'netImbalanceVolume': rng.normal(0, 400, n)
+    })
+
+def per_call(func, queries):
+    start = time.perf_counter()
+    for query in queries:
+        func(*query)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--years', type=float, default=10)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+
+    df = make_raw_frame(args.years)
+    dates = df['settlementDate'].unique()
+    rng = np.random.default_rng(1)
+    queries = [(dates[i], int(p)) for i, p in zip(rng.integers(0, len(dates), args.queries),
+                                                  rng.integers(1, 49, args.queries))]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'periods.bin')
+        store = PeriodArrayStore.create(path, dates[0], dates[-1])
+        store.write_frame(df)
+        store.flush()
+        store = PeriodArrayStore.open(path)
+
+        lookup_store = per_call(store.get, queries)
+        lookup_df = per_call(
+            lambda d, p: df[(df['settlementDate'] == d) & (df['settlementPeriod'] == p)].iloc[0],
+            queries[:200]
+        )
+        range_queries = [(d, dates[min(np.searchsorted(dates, d) + 30, len(dates) - 1)]) for d, _ in queries[:200]]
+        range_store = per_call(lambda s, e: store.range('systemBuyPrice', s, e), range_queries)
+        range_df = per_call(
+            lambda s, e: df.loc[df['settlementDate'].between(s, e), 'systemBuyPrice'].to_numpy(),
+            range_queries
+        )
+
+    print(f"{len(df):,} periods")
+    print(f"single period: store {lookup_store:.1f}us, DataFrame filter {lookup_df:.1f}us "
+          f"({lookup_df / lookup_store:.0f}x)")
+    print(f"31-day range:  store {range_store:.1f}us, DataFrame filter {range_df:.1f}us "
+          f"({range_df / range_store:.0f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark the sequential and pipelined analysis of a date range fetched
+from a local server that answers each day after a fixed latency.
+
+Run from the project root:
+    python -m benchmarks.bench_pipeline --days 31 --latency 0.2 --limit 4
+"""
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import threading
+import time
+import numpy as np
+import pandas as pd
+from analysis.bmrs import BMRSAnalysis
+from api.concurrency import AdaptiveLimiter
+from services.api import APIService
+from services.ingestion import IngestionPipeline
+from services.pipeline import PipelinedIngestion
+from utils.helpers import periods_in_day
+
+def day_payload(date):
+    """System prices body of one settlement date"""
+    rng = np.random.default_rng(int(date.replace('-', '')))
+    start = pd.Timestamp(date, tz='Europe/London').tz_convert('UTC')
+    return json.dumps({'data': [
+        {
+            'settlementDate': date,
+            'settlementPeriod': period,
+            'startTime': (start + pd.Timedelta(minutes=30 * (period - 1))).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'systemSellPrice': float(rng.uniform(60, 90)),
+            'systemBuyPrice': float(rng.uniform(90, 120)),
+            'netImbalanceVolume': float(rng.normal(0, 400))
+        }
+        for period in range(1, periods_in_day(date) + 1)
+    ]}).encode()
+
+def serve(latency):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            body = day_payload(self.path.split('?')[0].rsplit('/', 1)[-1])
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def analysis_for(base_url, limit):
+    analysis = BMRSAnalysis()
+    # A fixed concurrency limit so both runs fetch at the same rate
+    limiter = AdaptiveLimiter(initial=limit, min_limit=limit, max_limit=limit)
+    analysis.api_service = APIService(base_url, limiter=limiter)
+    analysis.ingestion = IngestionPipeline(analysis.api_service.api)
+    analysis.pipeline = PipelinedIngestion(analysis.ingestion, fetch_workers=limit, queue_size=2 * limit)
+    return analysis
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--days', type=int, default=31)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--limit', type=int, default=4)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    server = serve(args.latency)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    dates = pd.date_range('2024-03-01', periods=args.days)
+    start_date, end_date = dates[0].strftime('%Y-%m-%d'), dates[-1].strftime('%Y-%m-%d')
+
+    print(f"Pipeline Benchmark ({args.days} days, {args.latency * 1000:.0f} ms latency, {args.limit} in flight)")
+    print('=' * 50)
+
+    sequential = analysis_for(base_url, args.limit)
+    tick = time.perf_counter()
+    _, sequential._prices_df, sequential._volumes_df = sequential.ingestion.run(start_date, end_date)
+    # The same forecast history and anomaly flags as run_analysis
+    history = sequential._with_range(sequential._load_history(start_date))
+    fetch_time = time.perf_counter() - tick
+    sequential._flag_anomalies()
+    sequential._compute(start_date, end_date, history)
+    sequential_time = time.perf_counter() - tick
+    print(f"sequential: {sequential_time:.2f}s (fetch {fetch_time:.2f}s, "
+          f"compute {sequential_time - fetch_time:.2f}s)")
+
+    pipelined = analysis_for(base_url, args.limit)
+    tick = time.perf_counter()
+    pipelined.run_analysis(start_date, end_date)
+    pipelined_time = time.perf_counter() - tick
+    print(f"pipelined:  {pipelined_time:.2f}s ({sequential_time / pipelined_time:.2f}x)")
+
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Load test the local report server: cold (uncached) requests and warm
+requests for popular date ranges, reporting p50/p99 latency against
+targets.
+
+The clients run in the server's process, so with more clients than
+cores the latencies include queueing behind the other clients; the
+targets apply to the default single client.
+
+Run from the project root:
+    python -m benchmarks.bench_report_server --requests 2000
+    python -m benchmarks.bench_report_server --concurrency 8
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import requests
+from services.report_server import RESOURCES, ReportServer
+from utils.data_processor import BMRSDataProcessor
+from utils.history_store import HistoryStore
+
+# Warm (cached) latency targets in milliseconds
+TARGET_P50_MS = 2.0
+TARGET_P99_MS = 20.0
+
+def make_store(root, days):
+    """Create a history store with synthetic processed data"""
+    dates = pd.date_range('2024-01-01', periods=days * 48, freq='30min', tz='UTC')
+    rng = np.random.default_rng(0)
+    raw = pd.DataFrame({
+        'timestamp': dates,
+        'systemSellPrice': rng.uniform(60, 90, len(dates)),
+        'systemBuyPrice': rng.uniform(90, 120, len(dates)),
+        'netImbalanceVolume': rng.normal(0, 400, len(dates))
+    })
+    store = HistoryStore(root)
+    store.write(*BMRSDataProcessor.clean_and_process_data(raw))
+    return store
+
+def timed_get(session, url, headers=None):
+    start = time.perf_counter()
+    response = session.get(url, headers=headers)
+    elapsed = (time.perf_counter() - start) * 1000
+    if response.status_code not in (200, 304):
+        raise RuntimeError(f"{url}: HTTP {response.status_code}")
+    return elapsed
+
+def run_load(urls, concurrency, headers=None):
+    """Issue every URL with `concurrency` clients and return latencies in ms"""
+    chunks = [urls[i::concurrency] for i in range(concurrency)]
+
+    def client(chunk):
+        with requests.Session() as session:
+            return [timed_get(session, url, headers.get(url) if headers else None) for url in chunk]
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        return np.concatenate([np.array(latencies) for latencies in executor.map(client, chunks)])
+
+def report(name, latencies, check=False):
+    p50, p99 = np.percentile(latencies, [50, 99])
+    line = f"{name:<26}{len(latencies):>7}{p50:>10.2f}{p99:>10.2f}"
+    if check:
+        passed = p50 <= TARGET_P50_MS and p99 <= TARGET_P99_MS
+        line += f"  {'PASS' if passed else 'FAIL'}"
+    print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--ranges', type=int, default=10, help="number of popular date ranges")
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        store = make_store(root, args.days)
+        server = ReportServer(store, port=0, cache_size=args.ranges)
+        server.start()
+        try:
+            starts = pd.date_range('2024-01-01', periods=args.ranges, freq='7D')
+            ranges = [(s.strftime('%Y-%m-%d'), (s + pd.Timedelta(days=6)).strftime('%Y-%m-%d')) for s in starts]
+            range_urls = [
+                [f"{server.base_url}{path}?start={start}&end={end}" for path in RESOURCES]
+                for start, end in ranges
+            ]
+
+            # Cold: the first request of each range runs the analysis
+            cold = run_load([urls[0] for urls in range_urls], 1)
+
+            # Warm: popular ranges drawn with a skewed (Zipf-like) distribution
+            rng = np.random.default_rng(1)
+            weights = 1 / np.arange(1, args.ranges + 1)
+            picks = rng.choice(args.ranges, args.requests, p=weights / weights.sum())
+            urls = [range_urls[i][rng.integers(len(RESOURCES))] for i in picks]
+            warm = run_load(urls, args.concurrency)
+
+            # Revalidation with the ETags of the warm responses
+            etags = {url: {'If-None-Match': requests.get(url).headers['ETag']} for url in set(urls)}
+            revalidated = run_load(urls, args.concurrency, etags)
+
+            print(f"Report server load test ({args.requests} requests, {args.concurrency} clients)")
+            print('=' * 50)
+            print(f"{'':<26}{'n':>7}{'p50 ms':>10}{'p99 ms':>10}")
+            report('Cold (analysis)', cold)
+            report('Warm (LRU)', warm, check=True)
+            report('Warm (304 Not Modified)', revalidated, check=True)
+            print(f"Targets: p50 <= {TARGET_P50_MS} ms, p99 <= {TARGET_P99_MS} ms")
+            print(f"Cache: {server.cache.stats.summary()}")
+        finally:
+            server.stop()
+
+if __name__ == '__main__':
+    main()
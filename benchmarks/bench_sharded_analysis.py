@@ -0,0 +1,58 @@
+"""
+Benchmark serial vs sharded hourly volume and daily imbalance analyses.
+
+Run from the project root:
+    python -m benchmarks.bench_sharded_analysis --years 5 --workers 4
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from utils.imbalance_analysis import ImbalanceAnalysis
+from utils.sharded_analysis import ShardedAnalysis
+from utils.volume_analysis import VolumeAnalysis
+
+def make_frames(years):
+    """Create synthetic processed frames covering the given number of years"""
+    dates = pd.date_range(start='2015-01-01', periods=int(years * 365 * 48), freq='30min')
+    rng = np.random.default_rng(0)
+    niv = rng.normal(0, 400, len(dates))
+    prices_df = pd.DataFrame({
+        'timestamp': dates,
+        'system_sell_price': rng.uniform(60, 90, len(dates)),
+        'system_buy_price': rng.uniform(90, 120, len(dates))
+    })
+    volumes_df = pd.DataFrame({
+        'timestamp': dates,
+        'net_imbalance_volume': niv,
+        'abs_imbalance_volume': np.abs(niv)
+    })
+    return prices_df, volumes_df
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--years', type=float, default=5)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    prices_df, volumes_df = make_frames(args.years)
+    print(f"{len(volumes_df):,} periods")
+
+    serial_volumes = timed(VolumeAnalysis.analyse_hourly_volumes, volumes_df)
+    serial_metrics = timed(ImbalanceAnalysis.calculate_daily_imbalance_metrics, prices_df, volumes_df)
+    print(f"serial:    hourly volumes {serial_volumes:.3f}s, daily metrics {serial_metrics:.3f}s")
+
+    for workers in args.workers:
+        volumes = timed(ShardedAnalysis.analyse_hourly_volumes, volumes_df, max_workers=workers)
+        metrics = timed(ShardedAnalysis.calculate_daily_imbalance_metrics, prices_df, volumes_df,
+                        max_workers=workers)
+        print(f"{workers} workers: hourly volumes {volumes:.3f}s ({serial_volumes / volumes:.1f}x), "
+              f"daily metrics {metrics:.3f}s ({serial_metrics / metrics:.1f}x)")
+
+if __name__ == '__main__':
+    main()
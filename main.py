@@ -1,7 +1,10 @@
 import logging
 import sys
 from analysis.bmrs import BMRSAnalysis
+from api.revalidation import ValidatorStore
 from utils.helpers import BMRSError, setup_logging, display_results
+from utils.result_cache import ResultCache
+from utils.revisions import IncrementalProcessor, RevisionStore
 from ui.visual import VisualisationService
 
 def main():
@@ -12,7 +15,11 @@ def main():
         logger = logging.getLogger(__name__)
         
         # Initialise analysis
-        analysis = BMRSAnalysis()
+        analysis = BMRSAnalysis(
+            validator_store=ValidatorStore('cache/validators'),
+            result_cache=ResultCache('cache/results'),
+            revisions=IncrementalProcessor(RevisionStore('cache/revisions'))
+        )
         ui_service = VisualisationService()
         
         # Define analysis period
@@ -34,7 +41,8 @@ def main():
             results,
             prices_df,
             volumes_df,
-            filename='bmrs_dashboard.html'
+            filename='bmrs_dashboard.html',
+            cube=results.imbalance_cube
         )
         
         print("\nAnalysis complete. Dashboard saved to 'bmrs_dashboard.html'")
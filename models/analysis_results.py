@@ -1,7 +1,10 @@
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import pandas as pd
-from typing import Dict
+from typing import Dict, List, Optional
+from utils.forecasting import ForecastResult
+from utils.imbalance_cube import ImbalanceCube
+from utils.revisions import RevisionReport
 
 @dataclass
 class AnalysisResult:
@@ -10,5 +13,12 @@ class AnalysisResult:
     peak_hours_report: str
     daily_reports: Dict[str, str]
     data_quality: Dict[str, Dict[str, float]]
-
-
+    quality_profile: Optional[pd.DataFrame] = None  # Per-day, per-column quality counts
+    imbalance_cube: Optional[ImbalanceCube] = None  # Roll-up cube of the analysed range
+    price_volume: Optional[pd.DataFrame] = None  # Rolling price-volume correlation, slope and elasticity
+    price_volume_by_period: Optional[pd.DataFrame] = None  # Latest statistics per settlement period
+    forecasts: Optional[ForecastResult] = None  # One-day-ahead baseline forecasts and actuals
+    provisional: bool = False  # Some days were served from cache or missed at the fetch deadline
+    provisional_dates: List[str] = field(default_factory=list)
+    failed_dates: List[str] = field(default_factory=list)  # Days that could not be fetched and are left out
+    revisions: Optional[RevisionReport] = None  # Data revised since the previous run, with revision tracking
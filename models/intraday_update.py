@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional
+
+@dataclass
+class IntradayUpdate:
+    """Data class for the running intraday position after a new settlement period"""
+    settlement_date: str
+    settlement_period: int
+    timestamp: datetime
+    period_cost: float
+    running_cost: float
+    running_net_volume: float
+    running_abs_volume: float
+    unit_rate: Optional[float]
+    peak_hour: int
+    peak_hour_volume: float
+    latency_seconds: float
+    statistics: Optional[Dict[str, float]] = None
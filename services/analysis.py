@@ -1,13 +1,14 @@
 from typing import Tuple
 import pandas as pd
+from utils.backends import get_backend
 
 class AnalysisService:
     """Service class for data analysis"""
     
     @staticmethod
-    def analyse_volumes(volumes_df: pd.DataFrame) -> Tuple[pd.DataFrame, str]:
+    def analyse_volumes(volumes_df: pd.DataFrame, backend=None) -> Tuple[pd.DataFrame, str]:
         """Analyse volume patterns"""
-        hourly_stats = volumes_df.groupby(volumes_df['timestamp'].dt.hour).agg({
+        hourly_stats = get_backend(backend).hourly_stats([volumes_df], {
             'abs_imbalance_volume': ['mean', 'sum', 'std']
         })
         
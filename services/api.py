@@ -1,32 +1,87 @@
-from typing import List
-import requests
+from typing import List, Optional
 import logging
+import threading
+import pandas as pd
+from api.bmrs import BMRSApi
+from api.concurrency import AdaptiveLimiter
+from api.hedging import Deadline, DeadlineExceeded, HedgedRequests
+from api.revalidation import ValidatorStore
 from models.imbalance_data import ImbalanceData
 from utils.helpers import BMRSError
 
 class APIService:
     """Service class for API interactions"""
     
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, validator_store: Optional[ValidatorStore] = None,
+                 limiter: Optional[AdaptiveLimiter] = None, hedger: Optional[HedgedRequests] = None):
         self.base_url = base_url
+        self.api = BMRSApi(validator_store, base_url=base_url, limiter=limiter, hedger=hedger)
+        self.validators = self.api.validators
+        self.limiter = self.api.limiter
+        self.hedger = self.api.hedger
+        # Dates served from cache, or not at all, because the deadline passed
+        self.provisional_dates = set()
+        self._lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
 
-    def get_imbalance_data(self, settlement_date: str) -> List[ImbalanceData]:
+    def get_imbalance_frame(self, settlement_date: str, deadline: Optional[Deadline] = None) -> pd.DataFrame:
+        """
+        Fetch the typed raw DataFrame for a single date. With a deadline
+        the HTTP request is hedged, and a day still unanswered at the deadline
+        is served from the validator store's cached copy and recorded in
+        provisional_dates; without a cached copy DeadlineExceeded is raised.
+        """
+        if deadline is None:
+            return self.api.get_imbalance_data(settlement_date)
+        
+        try:
+            return self.api.get_imbalance_data(settlement_date, deadline=deadline)
+        except DeadlineExceeded:
+            with self._lock:
+                self.provisional_dates.add(settlement_date)
+            cached = self.cached_frame(settlement_date)
+            if cached is None:
+                self.logger.warning(f"Deadline passed for {settlement_date} with no cached data")
+                raise
+            self.logger.warning(f"Deadline passed for {settlement_date}, using cached data")
+            return cached
+
+    def cached_frame(self, settlement_date: str) -> Optional[pd.DataFrame]:
+        """Raw DataFrame of the last download of a date, if any"""
+        entry = self.validators.get(settlement_date)
+        if entry is None or not entry.records:
+            return None
+        if entry.payload is None:
+            entry.payload = self.api._to_dataframe(entry.records)
+        return entry.payload.copy()
+
+    def reset_provisional(self):
+        with self._lock:
+            self.provisional_dates = set()
+
+    def get_imbalance_data(self, settlement_date: str, deadline: Optional[Deadline] = None) -> List[ImbalanceData]:
         """Fetch imbalance data for a single date"""
         try:
-            endpoint = f"{self.base_url}/balancing/settlement/system-prices/{settlement_date}"
-            params = {'format': 'json'}
-            
-            response = requests.get(endpoint, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if not data or 'data' not in data:
+            df = self.get_imbalance_frame(settlement_date, deadline)
+            if df.empty:
                 raise BMRSError(f"No data returned for {settlement_date}")
-                
-            return [ImbalanceData.from_api_response(item) for item in data['data']]
+            
+            timestamps = df['timestamp'].dt.tz_convert(None)
+            return [
+                ImbalanceData(
+                    timestamp=timestamp,
+                    settlement_period=int(period),
+                    system_buy_price=float(buy),
+                    system_sell_price=float(sell),
+                    net_imbalance_volume=float(niv),
+                    settlement_date=date
+                )
+                for timestamp, period, buy, sell, niv, date in zip(
+                    timestamps, df['settlementPeriod'], df['systemBuyPrice'],
+                    df['systemSellPrice'], df['netImbalanceVolume'], df['settlementDate']
+                )
+            ]
             
         except Exception as e:
             self.logger.error(f"API error: {str(e)}")
-            raise BMRSError(f"Failed to fetch data: {str(e)}")
\ No newline at end of file
+            raise BMRSError(f"Failed to fetch data: {str(e)}")
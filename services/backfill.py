@@ -0,0 +1,238 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import argparse
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+import json
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+from services.ingestion import IngestionPipeline
+from utils.helpers import BMRSError
+from utils.history_store import HistoryStore
+
+# Per-day states of a backfill manifest
+PENDING = 'pending'
+DONE = 'done'
+RETRY = 'retry'    # Failed; fetched again once retry_at has passed
+FAILED = 'failed'  # Gave up after max_attempts
+STATUSES = [PENDING, DONE, RETRY, FAILED]
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+@dataclass
+class DayEntry:
+    """Backfill state of one settlement date"""
+    settlement_date: str
+    status: str = PENDING
+    attempts: int = 0
+    retry_at: Optional[str] = None  # ISO 8601 UTC time of the next attempt
+    error: Optional[str] = None
+    rows: int = 0
+
+class BackfillManifest:
+    """
+    Checkpoint of a backfill job: the state of every settlement date.
+
+    The manifest is a JSON snapshot plus an append-only journal
+    (<path>.journal) with one JSON line per changed day, so recording a
+    day costs one small append whatever the range. Loading replays the
+    journal over the snapshot and compacts both into a new snapshot; a
+    line cut short by a crash is ignored.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.journal_path = path + '.journal'
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.entries: Dict[str, DayEntry] = self._load()
+        if os.path.exists(self.journal_path):
+            self.save()
+
+    def _load(self) -> Dict[str, DayEntry]:
+        entries = {}
+        try:
+            if os.path.exists(self.path):
+                with open(self.path) as f:
+                    entries = {day['settlement_date']: DayEntry(**day) for day in json.load(f)['days']}
+            if os.path.exists(self.journal_path):
+                with open(self.journal_path) as f:
+                    for line in f:
+                        try:
+                            day = json.loads(line)
+                        except ValueError:
+                            self.logger.warning(f"Ignoring incomplete journal line in {self.journal_path}")
+                            continue
+                        entries[day['settlement_date']] = DayEntry(**day)
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            raise BMRSError(f"Error reading backfill manifest {self.path}: {str(e)}")
+        return entries
+
+    def save(self):
+        """Write a snapshot of every day and clear the journal"""
+        with self._lock:
+            data = {'days': [asdict(self.entries[day]) for day in sorted(self.entries)]}
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+
+    def _record(self, entry: DayEntry):
+        """Append a day's new state to the journal"""
+        with self._lock:
+            with open(self.journal_path, 'a') as f:
+                f.write(json.dumps(asdict(entry)) + '\n')
+                f.flush()
+
+    def plan(self, start_date: str, end_date: str, retry_failed: bool = False):
+        """
+        Add the dates of an inclusive range that are not yet in the
+        manifest; known dates keep their state. With retry_failed, dates
+        that gave up are made pending again.
+        """
+        start = datetime.strptime(start_date, '%Y-%m-%d')
+        end = datetime.strptime(end_date, '%Y-%m-%d')
+        if end < start:
+            raise BMRSError("End date must be after start date")
+        for d in range((end - start).days + 1):
+            settlement_date = (start + timedelta(days=d)).strftime('%Y-%m-%d')
+            entry = self.entries.setdefault(settlement_date, DayEntry(settlement_date))
+            if retry_failed and entry.status == FAILED:
+                entry.status, entry.attempts, entry.retry_at = PENDING, 0, None
+        self.save()
+
+    def due(self, now: datetime, start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[str]:
+        """Dates to fetch now: pending days and retries whose time has come"""
+        return [
+            day for day in sorted(self.entries)
+            if (start_date is None or day >= start_date) and (end_date is None or day <= end_date)
+            and (self.entries[day].status == PENDING or (
+                self.entries[day].status == RETRY and datetime.fromisoformat(self.entries[day].retry_at) <= now
+            ))
+        ]
+
+    def next_retry(self) -> Optional[datetime]:
+        """Earliest scheduled retry, or None"""
+        times = [datetime.fromisoformat(e.retry_at) for e in self.entries.values() if e.status == RETRY]
+        return min(times) if times else None
+
+    def mark_done(self, settlement_date: str, rows: int):
+        entry = self.entries[settlement_date]
+        entry.status, entry.attempts, entry.rows = DONE, entry.attempts + 1, rows
+        entry.retry_at = entry.error = None
+        self._record(entry)
+
+    def mark_failed(self, settlement_date: str, error: str, retry_at: Optional[datetime]):
+        """Record a failed attempt; without retry_at the day is given up"""
+        entry = self.entries[settlement_date]
+        entry.attempts += 1
+        entry.error = error
+        entry.status = RETRY if retry_at is not None else FAILED
+        entry.retry_at = retry_at.isoformat() if retry_at is not None else None
+        self._record(entry)
+
+    def counts(self) -> Dict[str, int]:
+        counts = dict.fromkeys(STATUSES, 0)
+        for entry in self.entries.values():
+            counts[entry.status] += 1
+        return counts
+
+    def summary(self) -> str:
+        return ", ".join(f"{count} {status}" for status, count in self.counts().items())
+
+class BackfillJob:
+    """
+    Restartable backfill of a date range into a HistoryStore.
+
+    Days are fetched concurrently and each completed day is processed and
+    written to the store as soon as it arrives, then checkpointed in the
+    manifest. Failed days are retried with exponential backoff (retry_delay
+    seconds, doubling per attempt) until max_attempts; running the job
+    again fetches only the days that are not done. Store writes upsert by
+    timestamp, so repeating a day is harmless.
+
+    Each day is cleaned on its own, so gaps at the day boundaries are not
+    interpolated across days.
+    """
+
+    def __init__(self, ingestion: IngestionPipeline, store: HistoryStore, manifest: BackfillManifest,
+                 max_workers: int = 4, max_attempts: int = 5, retry_delay: float = 60.0,
+                 clock: Callable[[], datetime] = _utcnow):
+        self.ingestion = ingestion
+        self.store = store
+        self.manifest = manifest
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+
+    def _retry_at(self, attempts: int) -> Optional[datetime]:
+        """Time of the next attempt after a failure, or None to give up"""
+        if attempts >= self.max_attempts:
+            return None
+        return self.clock() + timedelta(seconds=self.retry_delay * 2 ** (attempts - 1))
+
+    def _store_day(self, settlement_date: str, raw_df) -> int:
+        if raw_df.empty:
+            raise BMRSError(f"No data published for {settlement_date}")
+        prices_df, volumes_df = self.ingestion.process(raw_df)
+        self.store.write(prices_df, volumes_df)
+        return len(prices_df)
+
+    def run(self, start_date: str, end_date: str, retry_failed: bool = False) -> Dict[str, int]:
+        """
+        Backfill the days of a range that are due and return the manifest
+        counts by status. Days scheduled for a later retry are left for a
+        later run.
+        """
+        self.manifest.plan(start_date, end_date, retry_failed)
+        due = self.manifest.due(self.clock(), start_date, end_date)
+        self.logger.info(f"Backfilling {len(due)} days ({self.manifest.summary()})")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.ingestion.fetch_day, day): day for day in due}
+            for future in as_completed(futures):
+                settlement_date = futures[future]
+                try:
+                    rows = self._store_day(settlement_date, future.result())
+                except BMRSError as e:
+                    attempts = self.manifest.entries[settlement_date].attempts + 1
+                    retry_at = self._retry_at(attempts)
+                    self.logger.warning(
+                        f"Backfill of {settlement_date} failed (attempt {attempts}): {str(e)}"
+                        + (f"; retrying after {retry_at.isoformat()}" if retry_at else "; giving up")
+                    )
+                    self.manifest.mark_failed(settlement_date, str(e), retry_at)
+                else:
+                    self.manifest.mark_done(settlement_date, rows)
+
+        self.manifest.save()
+        self.logger.info(f"Backfill: {self.manifest.summary()}")
+        return self.manifest.counts()
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill BMRS system prices into a history store")
+    parser.add_argument('start_date')
+    parser.add_argument('end_date')
+    parser.add_argument('--store', default='data/history')
+    parser.add_argument('--manifest', help="Manifest file; defaults to backfill.json in the store")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--retry-failed', action='store_true', help="Retry days that gave up")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    store = HistoryStore(args.store)
+    manifest = BackfillManifest(args.manifest or os.path.join(args.store, 'backfill.json'))
+    job = BackfillJob(IngestionPipeline(), store, manifest, max_workers=args.workers)
+    job.run(args.start_date, args.end_date, args.retry_failed)
+
+if __name__ == '__main__':
+    main()
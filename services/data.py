@@ -1,6 +1,16 @@
 import pandas as pd
 from typing import Tuple, List
 from models.imbalance_data import ImbalanceData
+from services.ingestion import IngestionPipeline
+
+# ImbalanceData fields and the raw API columns they come from
+RAW_COLUMNS = {
+    'settlement_date': 'settlementDate',
+    'settlement_period': 'settlementPeriod',
+    'system_sell_price': 'systemSellPrice',
+    'system_buy_price': 'systemBuyPrice',
+    'net_imbalance_volume': 'netImbalanceVolume'
+}
 
 class DataService:
     """Service class for data processing"""
@@ -12,20 +22,9 @@ class DataService:
     
     @staticmethod
     def process_data(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
-        """Process raw data into prices and volumes DataFrames"""
-        # Prices DataFrame
-        prices_df = pd.DataFrame({
-            'timestamp': df['timestamp'],
-            'system_sell_price': df['system_sell_price'],
-            'system_buy_price': df['system_buy_price'],
-            'price_spread': df['system_buy_price'] - df['system_sell_price']
-        })
-        
-        # Volumes DataFrame
-        volumes_df = pd.DataFrame({
-            'timestamp': df['timestamp'],
-            'net_imbalance_volume': df['net_imbalance_volume'],
-            'abs_imbalance_volume': abs(df['net_imbalance_volume'])
-        })
-        
-        return prices_df, volumes_df
+        """
+        Process raw data into prices and volumes DataFrames. Accepts either
+        the raw API columns or converted ImbalanceData and cleans both with
+        the ingestion pipeline.
+        """
+        return IngestionPipeline().process(df.rename(columns=RAW_COLUMNS))
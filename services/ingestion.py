@@ -0,0 +1,57 @@
+import logging
+from typing import Iterable, Optional, Tuple
+import pandas as pd
+from api.bmrs import BMRSApi
+from api.hedging import Deadline
+from api.schema import parse_system_prices
+from services.api import APIService
+from utils.data_processor import BMRSDataProcessor
+from utils.helpers import BMRSError
+
+class IngestionPipeline:
+    """
+    Single ingestion path for the system prices endpoint: fetch (with
+    revalidation), parse into the typed raw schema and clean into the
+    processed prices and volumes frames used by every analysis
+    """
+
+    def __init__(self, api: Optional[BMRSApi] = None, interpolation_limit: int = 2,
+                 service: Optional[APIService] = None):
+        self.api = api or (service.api if service else BMRSApi())
+        # Service for deadline-aware fetching
+        self.service = service
+        self.interpolation_limit = interpolation_limit
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def parse(records: Iterable[dict]) -> pd.DataFrame:
+        """Parse raw API records into the typed raw DataFrame"""
+        return parse_system_prices(records)
+
+    def fetch_day(self, settlement_date: str, deadline: Optional[Deadline] = None) -> pd.DataFrame:
+        """
+        Fetch the raw DataFrame of one settlement date; with a deadline,
+        through the service's hedged, deadline-aware fetch
+        """
+        if deadline is not None and self.service is not None:
+            return self.service.get_imbalance_frame(settlement_date, deadline)
+        return self.api.get_imbalance_data(settlement_date)
+
+    def fetch_range(self, start_date: str, end_date: str, deadline: Optional[Deadline] = None) -> pd.DataFrame:
+        """
+        Fetch the raw DataFrame of an inclusive date range; with a deadline,
+        days not fetched in time are left out
+        """
+        return self.api.get_historic_imbalance_data(start_date, end_date, deadline)
+
+    def process(self, raw_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Clean a raw DataFrame into processed (prices_df, volumes_df)"""
+        if raw_df.empty:
+            raise BMRSError("No data to process")
+        return BMRSDataProcessor.clean_and_process_data(raw_df, self.interpolation_limit)
+
+    def run(self, start_date: str, end_date: str) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Fetch and process a date range, returning (raw_df, prices_df, volumes_df)"""
+        raw_df = self.fetch_range(start_date, end_date)
+        prices_df, volumes_df = self.process(raw_df)
+        return raw_df, prices_df, volumes_df
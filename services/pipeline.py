@@ -0,0 +1,222 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import reduce
+import logging
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+import pandas as pd
+from api.hedging import Deadline
+from services.analysis import AnalysisService
+from services.ingestion import IngestionPipeline
+from utils.aggregates import finalise_aggregates, merge_partial_aggregates, partial_aggregates
+from utils.helpers import BMRSError
+from utils.imbalance_cube import ImbalanceCube
+
+# Hourly volume statistics of AnalysisService.analyse_volumes
+HOURLY_STATS = {'abs_imbalance_volume': ['mean', 'sum', 'std']}
+
+@dataclass
+class BlockPartials:
+    """Mergeable analysis results of consecutive UTC days of processed data"""
+    hourly: pd.DataFrame
+    cube: ImbalanceCube
+    reports: Dict[str, str] = field(default_factory=dict)
+
+@dataclass
+class PipelineStats:
+    wall: float = 0.0
+    compute: float = 0.0
+    fetch_wait: float = 0.0  # Time the process stage waited for the next day
+
+    def summary(self) -> str:
+        return (
+            f"{self.wall:.2f}s wall, {self.compute:.2f}s processing, "
+            f"{self.fetch_wait:.2f}s waiting for fetches"
+        )
+
+@dataclass
+class PipelineResult:
+    """Ingested frames of a range and the analyses merged from per-day partials"""
+    raw_df: pd.DataFrame
+    prices_df: pd.DataFrame
+    volumes_df: pd.DataFrame
+    hourly_stats: pd.DataFrame
+    daily_reports: Dict[str, str]
+    imbalance_cube: ImbalanceCube
+    failed_dates: List[str] = field(default_factory=list)  # Days not fetched, left out of the frames
+    stats: PipelineStats = field(default_factory=PipelineStats)
+
+class PipelinedIngestion:
+    """
+    Fetch, decode and process a date range as overlapping stages.
+
+    Fetch workers download and decode settlement days while the process
+    stage cleans and analyses the days already received. Days pass
+    between the stages in date order; fetching never runs more than
+    queue_size days ahead of processing.
+
+    A UTC day is processed once the next fetched settlement day after it
+    has arrived, together with the fetched days on either side of it, so
+    gap filling at day boundaries and over failed days matches processing
+    the whole range. All days ready when the process stage looks are
+    handled as one block, so blocks grow when processing falls behind
+    fetching. The frames, hourly aggregates, cubes and reports of the
+    blocks are concatenated or merged into the result.
+    """
+
+    def __init__(self, ingestion: IngestionPipeline, fetch_workers: int = 8, queue_size: int = 8):
+        self.ingestion = ingestion
+        self.fetch_workers = fetch_workers
+        self.queue_size = queue_size
+        self.logger = logging.getLogger(__name__)
+
+    def _fetch(self, settlement_date: str, deadline: Optional[Deadline] = None) -> Optional[pd.DataFrame]:
+        """Fetch and decode one day, returning None if it failed"""
+        try:
+            return self.ingestion.fetch_day(settlement_date, deadline)
+        except BMRSError as e:
+            self.logger.warning(f"Failed to fetch data for {settlement_date}: {str(e)}")
+            return None
+
+    @staticmethod
+    def _block_partials(prices_df: pd.DataFrame, volumes_df: pd.DataFrame, report_dates) -> BlockPartials:
+        days = volumes_df['timestamp'].dt.date
+        hourly = volumes_df.assign(hour=volumes_df['timestamp'].dt.hour)
+        return BlockPartials(
+            hourly=partial_aggregates(hourly, 'hour', list(HOURLY_STATS)),
+            cube=ImbalanceCube.build(prices_df, volumes_df),
+            reports={
+                utc_date.strftime('%Y-%m-%d'): AnalysisService.analyse_volumes(day_df)[1]
+                for utc_date, day_df in volumes_df.groupby(days, sort=True)
+                if utc_date in report_dates
+            }
+        )
+
+    def _process_block(self, raws: List[pd.DataFrame], first, last) -> Optional[tuple]:
+        """Process raw days and return the (prices, volumes) of UTC days first to last"""
+        if not raws:
+            return None
+        prices_df, volumes_df = self.ingestion.process(pd.concat(raws, ignore_index=True))
+        days = prices_df['timestamp'].dt.date
+        in_block = ((days >= first) & (days <= last)).to_numpy()
+        if not in_block.any():
+            return None
+        return prices_df[in_block].reset_index(drop=True), volumes_df[in_block].reset_index(drop=True)
+
+    def run(self, start_date: str, end_date: str, deadline: Optional[Deadline] = None) -> PipelineResult:
+        """Fetch, process and analyse an inclusive date range, optionally within a deadline"""
+        start = datetime.strptime(start_date, '%Y-%m-%d')
+        end = datetime.strptime(end_date, '%Y-%m-%d')
+        if end < start:
+            raise BMRSError("End date must be after start date")
+        dates = [start + timedelta(days=d) for d in range((end - start).days + 1)]
+        report_dates = {date.date() for date in dates}
+
+        stats = PipelineStats()
+        began = time.perf_counter()
+        pending = queue.Queue()
+        stop = threading.Event()
+
+        raws: List[Optional[pd.DataFrame]] = []
+        blocks: List[tuple] = []  # (prices, volumes, BlockPartials) in date order
+        processed = 0
+
+        def fetched(i):
+            return raws[i] is not None and not raws[i].empty
+
+        def process(upto):
+            """Process the days before dates[upto] as one block"""
+            nonlocal processed
+            if upto <= processed:
+                return
+            first, last = processed, upto - 1
+            processed = upto
+            # Reach back and on to the nearest fetched days, so gaps over failed days fill as range-wide
+            lo = next((i for i in range(first - 1, -1, -1) if fetched(i)), 0)
+            hi = next((i for i in range(last + 1, len(raws)) if fetched(i)), len(raws) - 1)
+            # The first block also holds the UTC hour before the range in summer time
+            first_date = dates[first].date() if first else dates[0].date() - timedelta(days=1)
+            tick = time.perf_counter()
+            block = self._process_block([raws[i] for i in range(lo, hi + 1) if fetched(i)],
+                                        first_date, dates[last].date())
+            if block is not None:
+                blocks.append((*block, self._block_partials(*block, report_dates)))
+            stats.compute += time.perf_counter() - tick
+
+        def take(future):
+            raws.append(future.result())
+            slots.release()
+
+        # A slot is taken before a day is fetched and freed when the process
+        # stage takes it, so at most queue_size days are fetched ahead
+        slots = threading.Semaphore(self.queue_size)
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as executor:
+            def produce():
+                for date in dates:
+                    while not slots.acquire(timeout=0.1):
+                        if stop.is_set():
+                            return
+                    if stop.is_set():
+                        return
+                    pending.put(executor.submit(self._fetch, date.strftime('%Y-%m-%d'), deadline))
+
+            producer = threading.Thread(target=produce, daemon=True)
+            producer.start()
+            try:
+                held = None
+                while len(raws) < len(dates):
+                    tick = time.perf_counter()
+                    take(held or pending.get())
+                    held = None
+                    stats.fetch_wait += time.perf_counter() - tick
+                    # Take every further day that has already arrived
+                    while len(raws) < len(dates):
+                        try:
+                            future = pending.get_nowait()
+                        except queue.Empty:
+                            break
+                        if not future.done():
+                            held = future
+                            break
+                        take(future)
+                    if len(raws) < len(dates):
+                        # Days before the last fetched day received so far
+                        process(next((i for i in range(len(raws) - 1, processed - 1, -1) if fetched(i)), processed))
+                    else:
+                        process(len(raws))
+            finally:
+                stop.set()
+                producer.join()
+
+        if not blocks:
+            raise BMRSError("No data retrieved for the specified date range")
+        failed_dates = [date.strftime('%Y-%m-%d') for i, date in enumerate(dates) if not fetched(i)]
+        if failed_dates:
+            self.logger.warning(f"No data fetched for {', '.join(failed_dates)}")
+
+        # The blocks are consecutive UTC days, so their frames make up the range-wide frames
+        tick = time.perf_counter()
+        raw_df = pd.concat([raw for i, raw in enumerate(raws) if fetched(i)], ignore_index=True)
+        raw_df = raw_df.sort_values('timestamp', ignore_index=True)
+        prices_df = pd.concat([prices for prices, _, _ in blocks], ignore_index=True)
+        volumes_df = pd.concat([volumes for _, volumes, _ in blocks], ignore_index=True)
+        partials = [partial for _, _, partial in blocks]
+
+        hourly_stats = finalise_aggregates(merge_partial_aggregates([b.hourly for b in partials]), HOURLY_STATS)
+        result = PipelineResult(
+            raw_df=raw_df,
+            prices_df=prices_df,
+            volumes_df=volumes_df,
+            hourly_stats=hourly_stats,
+            daily_reports={utc_date: report for b in partials for utc_date, report in b.reports.items()},
+            imbalance_cube=reduce(ImbalanceCube.merge, [b.cube for b in partials]),
+            failed_dates=failed_dates,
+            stats=stats
+        )
+        stats.compute += time.perf_counter() - tick
+        stats.wall = time.perf_counter() - began
+        self.logger.info(f"Pipeline: {stats.summary()}")
+        return result
@@ -0,0 +1,277 @@
+from collections import OrderedDict
+import argparse
+from dataclasses import dataclass
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+import pandas as pd
+from analysis.bmrs import BMRSAnalysis
+from utils.helpers import BMRSError, validate_date_format
+from utils.history_store import HistoryStore
+from utils.imbalance_analysis import ImbalanceAnalysis
+from utils.quality_profiler import QualityProfiler
+
+# Resources served for every date range, by URL path
+RESOURCES = ['/reports/daily', '/metrics', '/hourly-stats', '/quality']
+
+@dataclass
+class CachedResponse:
+    """Serialised JSON body of one resource and its entity tag"""
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_payload(cls, payload) -> 'CachedResponse':
+        body = json.dumps(payload, default=_json_default).encode()
+        return cls(body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0  # Entries recomputed because the data changed or the TTL passed
+
+    def summary(self) -> str:
+        return (
+            f"{self.hits} hits, {self.misses} misses, "
+            f"{self.evictions} evictions, {self.expirations} expirations"
+        )
+
+@dataclass
+class CacheEntry:
+    """Responses of a date range and the data version they were computed from"""
+    responses: Dict[str, CachedResponse]
+    version: Optional[str]
+    expires_at: Optional[float]
+
+def _json_default(value):
+    """Serialise numpy scalars, timestamps and dates"""
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+def _frame_records(df: pd.DataFrame, index_name: str):
+    """DataFrame as a list of records with flattened MultiIndex column names"""
+    df = df.copy()
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = ['_'.join(str(part) for part in col if part) for col in df.columns]
+    df = df.reset_index().rename(columns={'index': index_name})
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict(orient='records')
+
+class ReportCache:
+    """
+    Thread-safe LRU of serialised responses per date range. Concurrent
+    misses for the same range wait for a single computation.
+
+    An entry is only served for the data version it was computed from and,
+    with a ttl, for ttl seconds; otherwise it is recomputed.
+    """
+
+    def __init__(self, maxsize: int = 32, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._entries: 'OrderedDict[tuple, CacheEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending: Dict[tuple, threading.Lock] = {}
+
+    def _lookup(self, key: tuple, version: Optional[str]) -> Optional[Dict[str, CachedResponse]]:
+        """Responses of a current entry, dropping a stale one; call with the lock held"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.version != version or (entry.expires_at is not None and time.monotonic() >= entry.expires_at):
+            del self._entries[key]
+            self.stats.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry.responses
+
+    def get(self, key: tuple, compute: Callable[[], Dict[str, CachedResponse]],
+            version: Optional[str] = None) -> Dict[str, CachedResponse]:
+        with self._lock:
+            responses = self._lookup(key, version)
+            if responses is not None:
+                return responses
+            pending = self._pending.setdefault(key, threading.Lock())
+
+        with pending:
+            with self._lock:
+                responses = self._lookup(key, version)
+                if responses is not None:
+                    return responses
+                self.stats.misses += 1
+            try:
+                responses = compute()
+            finally:
+                with self._lock:
+                    self._pending.pop(key, None)
+
+            expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+            with self._lock:
+                self._entries[key] = CacheEntry(responses, version, expires_at)
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.stats.evictions += 1
+            return responses
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class ReportServer:
+    """
+    Local HTTP service serving BMRSAnalysis results as JSON.
+
+    GET /reports/daily, /metrics, /hourly-stats and /quality take
+    ?start=YYYY-MM-DD&end=YYYY-MM-DD. Every resource of a range is
+    computed and serialised once, kept in an LRU, and served with an ETag
+    so unchanged responses revalidate with 304 Not Modified.
+
+    With a HistoryStore, ranges are analysed from the store and cached
+    responses are recomputed once the store is written. Otherwise they are
+    fetched from the BMRS API and cached for cache_ttl seconds, so
+    revised settlement data is picked up.
+    """
+
+    def __init__(self, store: Optional[HistoryStore] = None, host: str = '127.0.0.1', port: int = 8000,
+                 cache_size: int = 32, analysis_factory: Callable[[], BMRSAnalysis] = BMRSAnalysis,
+                 cache_ttl: Optional[float] = 300.0):
+        self.store = store
+        self.analysis_factory = analysis_factory
+        self.cache = ReportCache(cache_size, ttl=None if store is not None else cache_ttl)
+        self.logger = logging.getLogger(__name__)
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def compute(self, start_date: str, end_date: str) -> Dict[str, CachedResponse]:
+        """Run the analysis for a range and serialise every resource"""
+        analysis = self.analysis_factory()
+        if self.store is not None:
+            result = analysis.run_analysis_from_store(self.store, start_date, end_date)
+        else:
+            result = analysis.run_analysis(start_date, end_date)
+        prices_df, volumes_df = analysis.get_dataframes()
+        daily_metrics = ImbalanceAnalysis.calculate_daily_imbalance_metrics(prices_df, volumes_df)
+
+        payloads = {
+            '/reports/daily': {'start': start_date, 'end': end_date, 'reports': result.daily_reports},
+            '/metrics': {'start': start_date, 'end': end_date, 'days': _frame_records(daily_metrics, 'date')},
+            '/hourly-stats': {'start': start_date, 'end': end_date, 'hours': _frame_records(result.hourly_stats, 'hour')},
+            '/quality': {
+                'start': start_date,
+                'end': end_date,
+                'metrics': result.data_quality,
+                'columns': _frame_records(QualityProfiler.summarise(result.quality_profile), 'column')
+            }
+        }
+        return {path: CachedResponse.from_payload(payload) for path, payload in payloads.items()}
+
+    def respond(self, path: str, query: Dict[str, list], if_none_match: Optional[str] = None):
+        """Return (status, body, etag) for a request"""
+        if path == '/health':
+            return 200, json.dumps({'status': 'ok', 'cache': self.cache.stats.summary()}).encode(), None
+        if path not in RESOURCES:
+            return 404, json.dumps({'error': f"Unknown resource: {path}"}).encode(), None
+
+        start_date = query.get('start', [None])[0]
+        end_date = query.get('end', [start_date])[0]
+        if not start_date:
+            return 400, json.dumps({'error': "Missing start date"}).encode(), None
+
+        try:
+            validate_date_format(start_date)
+            validate_date_format(end_date)
+            if end_date < start_date:
+                raise BMRSError("End date must be after start date")
+        except BMRSError as e:
+            return 400, json.dumps({'error': str(e)}).encode(), None
+
+        try:
+            responses = self.cache.get(
+                (start_date, end_date),
+                lambda: self.compute(start_date, end_date),
+                version=self.store.version() if self.store is not None else None
+            )
+        except BMRSError as e:
+            return 502, json.dumps({'error': str(e)}).encode(), None
+
+        response = responses[path]
+        if if_none_match == response.etag:
+            return 304, b'', response.etag
+        return 200, response.body, response.etag
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately; without TCP_NODELAY
+            # keep-alive responses stall on the client's delayed ACK
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                status, body, etag = server.respond(
+                    url.path.rstrip('/') or '/', parse_qs(url.query), self.headers.get('If-None-Match')
+                )
+                self.send_response(status)
+                if etag:
+                    self.send_header('ETag', etag)
+                    self.send_header('Cache-Control', 'no-cache')
+                if status != 304:
+                    self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                server.logger.debug(format % args)
+
+        return Handler
+
+    def start(self):
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        self.logger.info(f"Serving reports on {self.base_url}")
+
+    def serve_forever(self):
+        self.logger.info(f"Serving reports on {self.base_url}")
+        self.server.serve_forever()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve BMRS analysis results as JSON")
+    parser.add_argument('--store', help="History store root; fetch from the BMRS API when omitted")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--cache-size', type=int, default=32)
+    parser.add_argument('--cache-ttl', type=float, default=300.0,
+                        help="Seconds API results are cached; store results are cached until the store changes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    store = HistoryStore(args.store) if args.store else None
+    ReportServer(store, args.host, args.port, args.cache_size, cache_ttl=args.cache_ttl).serve_forever()
+
+if __name__ == '__main__':
+    main()
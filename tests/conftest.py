@@ -0,0 +1,76 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+import pytest
+
+class StubBMRSServer:
+    """Local HTTP server standing in for the BMRS API"""
+    
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        # Requests beyond capacity in flight are answered 429 Too Many Requests
+        self.capacity = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlparse(self.path).path
+                stub.requests.append(path)
+                with stub._lock:
+                    stub.in_flight += 1
+                    stub.peak_in_flight = max(stub.peak_in_flight, stub.in_flight)
+                    throttled = stub.capacity is not None and stub.in_flight > stub.capacity
+                try:
+                    status, payload, delay = stub.routes.get(path, (404, {'data': []}, 0))
+                    if throttled:
+                        status, payload = 429, {'error': 'Too Many Requests'}
+                    elif callable(payload):
+                        payload = payload()
+                    if callable(delay):
+                        delay = delay()
+                    if delay:
+                        time.sleep(delay)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                if throttled:
+                    self.send_header('Retry-After', '0')
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+    
+    def add_route(self, path, payload, status=200, delay=0):
+        """Serve payload (a dict or a callable returning one) at path after delay (seconds or a callable)"""
+        self.routes[path] = (status, payload, delay)
+    
+    def start(self):
+        self._thread.start()
+    
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def bmrs_stub():
+    """Run a local stub of the BMRS API for the duration of a test"""
+    stub = StubBMRSServer()
+    stub.start()
+    yield stub
+    stub.stop()
@@ -0,0 +1,111 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from analysis.bmrs import BMRSAnalysis
+from services.api import APIService
+from services.ingestion import IngestionPipeline
+from services.pipeline import PipelinedIngestion
+from tests.test_ingestion import day_records
+from utils.history_store import HistoryStore
+from utils.anomaly_detection import AnomalyDetector
+from utils.quality_profiler import QualityProfiler
+
+def make_processed_data(periods, seed=7):
+    """Create processed frames with a daily price shape and noise"""
+    dates = pd.date_range(start='2015-01-01', periods=periods, freq='30min')
+    rng = np.random.default_rng(seed)
+    shape = 20 * np.sin(np.arange(periods) * 2 * np.pi / 48)
+    sell = 80 + shape + rng.normal(0, 5, periods)
+    buy = sell + rng.uniform(0, 5, periods)
+    niv = rng.normal(0, 300, periods)
+    prices_df = pd.DataFrame({
+        'timestamp': dates,
+        'system_sell_price': sell,
+        'system_buy_price': buy,
+        'price_spread': buy - sell,
+        'price_quality': 'Good'
+    })
+    volumes_df = pd.DataFrame({
+        'timestamp': dates,
+        'net_imbalance_volume': niv,
+        'abs_imbalance_volume': np.abs(niv),
+        'volume_quality': 'Good'
+    })
+    return prices_df, volumes_df
+
+def test_detects_injected_anomalies():
+    """Test that an injected spike, NIV outlier and stale run are flagged"""
+    prices_df, volumes_df = make_processed_data(48 * 30)
+    prices_df.loc[1000, 'system_buy_price'] = 2000.0
+    volumes_df.loc[1100, 'net_imbalance_volume'] = 6000.0
+    volumes_df.loc[1200:1209, 'net_imbalance_volume'] = 150.0
+    
+    flags = AnomalyDetector.detect(prices_df, volumes_df)
+    
+    assert flags.loc[1000, 'is_price_spike']
+    assert flags.loc[1100, 'is_niv_outlier']
+    assert flags.loc[1200:1209, 'is_stale_volume'].all()
+    assert not flags.loc[1210, 'is_stale_volume']
+    assert flags['is_price_spike'].sum() < 10
+
+def test_apply_feeds_quality_table():
+    """Test that applied flags reach quality flags and the quality profile"""
+    prices_df, volumes_df = make_processed_data(48 * 30)
+    prices_df.loc[1000, 'system_buy_price'] = 2000.0
+    
+    prices_df, volumes_df = AnomalyDetector.apply(prices_df, volumes_df)
+    profile = QualityProfiler.profile(prices_df, volumes_df)
+    
+    assert prices_df.loc[1000, 'price_quality'] == 'Anomaly'
+    assert profile.xs('system_buy_price', level='column')['anomaly'].sum() >= 1
+
+def test_ten_years_performance():
+    """Test that ten years of half-hourly data are scanned quickly"""
+    prices_df, volumes_df = make_processed_data(48 * 3653)
+    
+    start = time.perf_counter()
+    AnomalyDetector.detect(prices_df, volumes_df)
+    
+    assert time.perf_counter() - start < 2.0
+
+def test_analysis_flags_anomalies(bmrs_stub):
+    """Test a run flags its frames and counts the anomalies in the quality profile"""
+    dates = [d.strftime('%Y-%m-%d') for d in pd.date_range('2024-03-01', periods=10)]
+    for i, date in enumerate(dates):
+        records = day_records(date, seed=i)
+        if i == 8:
+            records[10]['systemBuyPrice'] = 2000.0
+        bmrs_stub.add_route(f'/balancing/settlement/system-prices/{date}', {'data': records})
+    analysis = BMRSAnalysis()
+    analysis.api_service = APIService(bmrs_stub.base_url)
+    analysis.ingestion = IngestionPipeline(analysis.api_service.api)
+    analysis.pipeline = PipelinedIngestion(analysis.ingestion)
+    
+    result = analysis.run_analysis(dates[0], dates[-1])
+    prices_df, _ = analysis.get_dataframes()
+    
+    spike = prices_df['system_buy_price'] == 2000.0
+    assert prices_df.loc[spike, 'is_price_spike'].all()
+    assert prices_df.loc[spike, 'price_quality'].eq('Anomaly').all()
+    anomalies = result.quality_profile.xs('system_buy_price', level='column')['anomaly']
+    assert anomalies.loc[pd.Timestamp(dates[8]).date()] >= 1
+
+def test_flagged_frames_round_trip_through_store(bmrs_stub, tmp_path):
+    """Test flagged frames written to a store are flagged again when analysed from it"""
+    dates = [d.strftime('%Y-%m-%d') for d in pd.date_range('2024-03-01', periods=4)]
+    for i, date in enumerate(dates):
+        bmrs_stub.add_route(f'/balancing/settlement/system-prices/{date}', {'data': day_records(date, seed=i)})
+    analysis = BMRSAnalysis()
+    analysis.api_service = APIService(bmrs_stub.base_url)
+    analysis.ingestion = IngestionPipeline(analysis.api_service.api)
+    analysis.pipeline = PipelinedIngestion(analysis.ingestion)
+    fetched = analysis.run_analysis(dates[0], dates[-1])
+    
+    store = HistoryStore(str(tmp_path / 'store'))
+    store.write(*analysis.get_dataframes())
+    stored = analysis.run_analysis_from_store(store, dates[0], dates[-1])
+    prices_df, volumes_df = analysis.get_dataframes()
+    
+    assert not any(column.endswith(('_x', '_y')) for column in [*prices_df.columns, *volumes_df.columns])
+    assert stored.data_quality == fetched.data_quality
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from services.analysis import AnalysisService
+from utils.backends import PandasBackend, get_backend, set_default_backend
+from utils.helpers import BMRSError
+from utils.imbalance_analysis import ImbalanceAnalysis
+from utils.volume_analysis import VolumeAnalysis
+from tests.test_period_matrix import STATS, frames
+
+pytest.importorskip('polars')
+
+@pytest.mark.parametrize('tz', ['UTC', 'Europe/London', None])
+def test_polars_statistics_match_pandas(frames, tz):
+    """Test polars hourly, daily and per-hour statistics against the default engine"""
+    prices_df, volumes_df = frames
+    if tz != 'UTC':
+        prices_df = prices_df.assign(timestamp=prices_df['timestamp'].dt.tz_convert(tz or 'UTC'))
+        volumes_df = volumes_df.assign(timestamp=volumes_df['timestamp'].dt.tz_convert(tz or 'UTC'))
+    if tz is None:
+        prices_df['timestamp'] = prices_df['timestamp'].dt.tz_localize(None)
+        volumes_df['timestamp'] = volumes_df['timestamp'].dt.tz_localize(None)
+    agg = {'net_imbalance_volume': STATS + ['count'], 'system_sell_price': ['mean']}
+    pandas_backend, polars_backend = get_backend('pandas'), get_backend('polars')
+
+    for method in ['hourly_stats', 'daily_stats']:
+        expected = getattr(pandas_backend, method)([volumes_df, prices_df], agg)
+        pd.testing.assert_frame_equal(getattr(polars_backend, method)([volumes_df, prices_df], agg), expected)
+
+    dates, totals = polars_backend.hourly_totals([volumes_df], 'abs_imbalance_volume')
+    expected_dates, expected_totals = pandas_backend.hourly_totals([volumes_df], 'abs_imbalance_volume')
+    assert (dates == expected_dates).all()
+    np.testing.assert_allclose(totals, expected_totals)
+
+def test_polars_analyses_match_pandas(frames):
+    """Test the analysis modules give the same results on either engine"""
+    prices_df, volumes_df = frames
+
+    pd.testing.assert_frame_equal(
+        ImbalanceAnalysis.calculate_daily_imbalance_metrics(prices_df, volumes_df, backend='polars'),
+        ImbalanceAnalysis.calculate_daily_imbalance_metrics(prices_df, volumes_df)
+    )
+    stats, report = VolumeAnalysis.analyse_hourly_volumes(volumes_df, backend='polars')
+    expected_stats, expected_report = VolumeAnalysis.analyse_hourly_volumes(volumes_df)
+    pd.testing.assert_frame_equal(stats, expected_stats)
+    assert report == expected_report
+    assert AnalysisService.analyse_volumes(volumes_df, backend='polars')[1] == AnalysisService.analyse_volumes(volumes_df)[1]
+    assert (VolumeAnalysis.generate_daily_peak_report(volumes_df, '2024-10-27', backend='polars')
+            == VolumeAnalysis.generate_daily_peak_report(volumes_df, '2024-10-27'))
+
+def test_empty_date_matches(frames):
+    """Test a date without rows gives an empty report and empty statistics on either engine"""
+    prices_df, volumes_df = frames
+    report = VolumeAnalysis.generate_daily_peak_report(volumes_df, '1999-01-01')
+    assert report.endswith("Top 3 Hours by Volume:\n")
+    assert VolumeAnalysis.generate_daily_peak_report(volumes_df, '1999-01-01', backend='polars') == report
+
+    agg = {'net_imbalance_volume': STATS + ['count']}
+    empty = volumes_df.iloc[:0]
+    for method in ['hourly_stats', 'daily_stats']:
+        expected = getattr(get_backend('pandas'), method)([empty, prices_df], agg)
+        assert expected.empty
+        pd.testing.assert_frame_equal(getattr(get_backend('polars'), method)([empty, prices_df], agg), expected)
+
+def test_backend_selection(monkeypatch):
+    """Test the default engine and unknown names"""
+    assert isinstance(get_backend(), PandasBackend)
+    assert get_backend(get_backend('polars')).name == 'polars'
+
+    monkeypatch.setattr('utils.backends._default_backend', 'pandas')
+    set_default_backend('polars')
+    assert get_backend().name == 'polars'
+    with pytest.raises(BMRSError):
+        set_default_backend('spark')
+    with pytest.raises(BMRSError):
+        get_backend('spark')
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+import pytest
+from services.api import APIService
+from services.backfill import BackfillJob, BackfillManifest
+from services.ingestion import IngestionPipeline
+from utils.history_store import HistoryStore
+from tests.test_ingestion import day_records
+
+DATES = [d.strftime('%Y-%m-%d') for d in pd.date_range('2024-03-01', periods=5)]
+
+def serve(bmrs_stub, failed=()):
+    for i, date in enumerate(DATES):
+        status = 500 if date in failed else 200
+        bmrs_stub.add_route(f'/balancing/settlement/system-prices/{date}', {'data': day_records(date, seed=i)}, status)
+
+def job_for(bmrs_stub, tmp_path, **kwargs):
+    ingestion = IngestionPipeline(APIService(bmrs_stub.base_url).api)
+    manifest = BackfillManifest(str(tmp_path / 'backfill.json'))
+    return BackfillJob(ingestion, HistoryStore(str(tmp_path / 'store')), manifest, **kwargs)
+
+def test_resumes_after_crash(bmrs_stub, tmp_path, monkeypatch):
+    """Test a crashed job keeps completed days and fetches only the rest"""
+    serve(bmrs_stub)
+    job = job_for(bmrs_stub, tmp_path, max_workers=1)
+    write = job.store.write
+    written = []
+
+    def crashing_write(prices_df, volumes_df):
+        if len(written) == 2:
+            raise RuntimeError("Killed")
+        written.append(prices_df)
+        write(prices_df, volumes_df)
+
+    monkeypatch.setattr(job.store, 'write', crashing_write)
+    with pytest.raises(RuntimeError):
+        job.run(DATES[0], DATES[-1])
+
+    # Completed days are in the journal; a line cut short by the crash is ignored
+    journal = tmp_path / 'backfill.json.journal'
+    assert len(journal.read_text().splitlines()) == 2
+    with open(journal, 'a') as f:
+        f.write('{"settlement_date": "2024-03-0')
+
+    bmrs_stub.requests.clear()
+    resumed = job_for(bmrs_stub, tmp_path)
+    assert resumed.manifest.counts()['done'] == 2
+    assert not journal.exists()
+    counts = resumed.run(DATES[0], DATES[-1])
+
+    assert counts['done'] == len(DATES)
+    assert sorted(path.rsplit('/', 1)[-1] for path in bmrs_stub.requests) == DATES[2:]
+    prices_df = resumed.store.read('prices')
+    assert len(prices_df) == 48 * len(DATES)
+    assert prices_df['timestamp'].is_unique
+
+    # Finished ranges are not fetched again
+    bmrs_stub.requests.clear()
+    resumed.run(DATES[0], DATES[-1])
+    assert bmrs_stub.requests == []
+
+def test_failed_days_retried_with_backoff(bmrs_stub, tmp_path):
+    """Test failed days wait for their retry time and give up after max_attempts"""
+    serve(bmrs_stub, failed=[DATES[1]])
+    now = [datetime(2024, 4, 1, tzinfo=timezone.utc)]
+    job = job_for(bmrs_stub, tmp_path, max_attempts=2, retry_delay=60, clock=lambda: now[0])
+
+    assert job.run(DATES[0], DATES[-1])['retry'] == 1
+    entry = job.manifest.entries[DATES[1]]
+    assert (entry.attempts, entry.retry_at) == (1, (now[0] + timedelta(seconds=60)).isoformat())
+
+    bmrs_stub.requests.clear()
+    job.run(DATES[0], DATES[-1])
+    assert bmrs_stub.requests == []
+
+    now[0] += timedelta(seconds=61)
+    assert job.run(DATES[0], DATES[-1])['failed'] == 1
+
+    serve(bmrs_stub)
+    counts = job.run(DATES[0], DATES[-1], retry_failed=True)
+    assert counts['done'] == len(DATES)
+    assert len(job.store.read('prices', DATES[1], DATES[1])) == 48
@@ -0,0 +1,112 @@
+import pandas as pd
+from api.bmrs import BMRSApi
+from api.concurrency import AdaptiveLimiter
+from api.datasets import FetchScheduler
+from tests.test_ingestion import day_records
+
+class FakeClock:
+    """Clock advanced by hand"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_additive_increase_on_stable_latency():
+    """Test the limit grows by about one per round of successful requests"""
+    limiter = AdaptiveLimiter(initial=2, max_limit=4)
+    for _ in range(40):
+        limiter.release(limiter.acquire(), latency=0.1)
+
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+def test_one_decrease_per_round():
+    """Test a burst of throttled responses halves the limit once"""
+    limiter = AdaptiveLimiter(initial=8)
+    epochs = [limiter.acquire() for _ in range(8)]
+    for epoch in epochs:
+        limiter.release(epoch, congested='throttled')
+
+    assert limiter.limit == 4
+    assert limiter.stats.throttled == 8
+
+    limiter.release(limiter.acquire(), congested='timeout')
+    assert limiter.limit == 2
+    assert limiter.stats.timeouts == 1
+
+def test_backs_off_on_rising_latency():
+    """Test latency above the tolerance of the baseline decreases the limit"""
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial=4, latency_tolerance=2.0, clock=clock)
+
+    def respond(latency):
+        def get():
+            clock.now += latency
+            return type('Response', (), {'status_code': 200})()
+        return limiter.request(get)
+
+    respond(0.1)
+    respond(0.1)
+    limit = limiter.limit
+    respond(0.5)
+
+    assert limiter.limit == limit / 2
+    assert limiter.stats.latency_backoffs == 1
+
+def test_not_modified_does_not_lower_baseline():
+    """Test fast 304 answers are not taken as the latency baseline"""
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial=4, latency_tolerance=2.0, clock=clock)
+
+    def respond(latency, status_code=200):
+        def get():
+            clock.now += latency
+            return type('Response', (), {'status_code': status_code})()
+        return limiter.request(get)
+
+    for _ in range(5):
+        respond(0.1)
+    respond(0.001, status_code=304)
+    respond(0.15)
+
+    assert limiter.stats.latency_backoffs == 0
+    assert limiter.limit > 4
+
+def test_historic_fetch_adapts_to_throttling(bmrs_stub):
+    """Test a server limiting concurrency is backed off from and every day still arrives"""
+    dates = [d.strftime('%Y-%m-%d') for d in pd.date_range('2024-03-01', periods=20)]
+    for i, date in enumerate(dates):
+        bmrs_stub.add_route(f'/balancing/settlement/system-prices/{date}', {'data': day_records(date, seed=i)},
+                            delay=0.02)
+    bmrs_stub.capacity = 3
+
+    api = BMRSApi(base_url=bmrs_stub.base_url, limiter=AdaptiveLimiter(initial=8, backoff=0))
+    df = api.get_historic_imbalance_data(dates[0], dates[-1])
+
+    assert len(df) == 20 * 48
+    assert df['timestamp'].is_monotonic_increasing
+    assert api.limiter.stats.throttled > 0
+    assert api.limiter.limit < 8
+    assert 'throttled' in api.limiter.summary()
+
+def test_scheduler_raises_limit_while_stable(bmrs_stub):
+    """Test the scheduler increases concurrency when the server keeps up"""
+    paths = [f'/datasets/TEST{i}' for i in range(60)]
+    for path in paths:
+        bmrs_stub.add_route(path, {'data': [{'value': 1}]}, delay=0.01)
+
+    scheduler = FetchScheduler(bmrs_stub.base_url, limiter=AdaptiveLimiter(initial=2, latency_tolerance=100))
+    responses = scheduler.fetch([(path, (('format', 'json'),)) for path in paths])
+
+    assert all(records == [{'value': 1}] for records in responses.values())
+    assert scheduler.limiter.limit > 2
+    assert scheduler.limiter.stats.peak_in_flight > 2
+
+def test_clients_share_limiter():
+    """Test BMRSApi and FetchScheduler of one server share a limiter unless given their own"""
+    api = BMRSApi(base_url='http://bmrs.test/api')
+    assert FetchScheduler('http://bmrs.test/api').limiter is api.limiter
+    assert FetchScheduler('http://other.test/api').limiter is not api.limiter
+    assert BMRSApi(base_url='http://bmrs.test/api', limiter=AdaptiveLimiter()).limiter is not api.limiter
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+from api.datasets import DatasetFetcher, DatasetRegistry, DatasetSpec, DEFAULT_REGISTRY, FetchScheduler
+from utils.helpers import BMRSError
+
+def price_records(date, periods):
+    """Create system prices records for one settlement date"""
+    return [
+        {
+            'settlementDate': date,
+            'settlementPeriod': period,
+            'systemSellPrice': 50.0 + period,
+            'systemBuyPrice': 60.0 + period,
+            'netImbalanceVolume': 10.0 * period,
+            'totalAcceptedOfferVolume': 100.0,
+            'totalAcceptedBidVolume': -100.0
+        }
+        for period in range(1, periods + 1)
+    ]
+
+@pytest.fixture
+def fetcher(bmrs_stub):
+    """Serve prices, demand and generation for the autumn clock change"""
+    for date, periods in [('2024-10-26', 48), ('2024-10-27', 50)]:
+        bmrs_stub.add_route(f'/balancing/settlement/system-prices/{date}', {'data': price_records(date, periods)})
+    bmrs_stub.add_route('/demand/outturn', {'data': [
+        {'settlementDate': '2024-10-27', 'settlementPeriod': 50, 'initialDemandOutturn': 21000,
+         'initialTransmissionSystemDemandOutturn': 23000}
+    ]})
+    bmrs_stub.add_route('/datasets/FUELHH', {'data': [
+        {'settlementDate': '2024-10-26', 'settlementPeriod': 1, 'fuelType': 'WIND', 'generation': 5000},
+        {'settlementDate': '2024-10-26', 'settlementPeriod': 1, 'fuelType': 'CCGT', 'generation': 7000},
+        {'settlementDate': '2024-10-26', 'settlementPeriod': 1, 'fuelType': 'CCGT', 'generation': 1000},
+        {'settlementDate': '2024-10-27', 'settlementPeriod': 3, 'fuelType': 'WIND', 'generation': 4000}
+    ]})
+    return DatasetFetcher(bmrs_stub.base_url)
+
+def test_settlement_grid():
+    """Test the grid has one row per period across a clock change"""
+    grid = DatasetFetcher.settlement_grid('2024-10-26', '2024-10-27')
+    
+    assert len(grid) == 98
+    assert grid['settlement_period'].iloc[47:49].tolist() == [48, 1]
+    assert grid['timestamp'].iloc[48] == pd.Timestamp('2024-10-26T23:00:00Z')
+    assert grid['timestamp'].diff().iloc[1:].eq(pd.Timedelta(minutes=30)).all()
+
+def test_fetch_aligned(bmrs_stub, fetcher):
+    """Test datasets are joined on settlement periods with shared requests made once"""
+    grid = fetcher.fetch(['system_prices', 'accepted_volumes', 'demand', 'generation'],
+                         '2024-10-26', '2024-10-27')
+    
+    last = grid.iloc[-1]
+    assert last['settlement_period'] == 50
+    assert last['system_buy_price'] == 110.0
+    assert last['demand_outturn'] == 21000
+    assert grid['accepted_offer_volume'].eq(100.0).all()
+    assert grid.loc[0, 'generation_ccgt'] == 8000
+    assert grid.loc[0, 'generation_wind'] == 5000
+    assert grid.loc[50, 'generation_wind'] == 4000
+    assert grid['demand_outturn'].notna().sum() == 1
+    
+    # Prices and accepted volumes share one request per day
+    assert sorted(bmrs_stub.requests).count('/balancing/settlement/system-prices/2024-10-26') == 1
+    assert len(bmrs_stub.requests) == 4
+
+def test_failed_requests_leave_gaps(bmrs_stub):
+    """Test a failing dataset yields NaN columns without failing the fetch"""
+    bmrs_stub.add_route('/balancing/settlement/system-prices/2024-03-01', {'data': price_records('2024-03-01', 48)})
+    grid = DatasetFetcher(bmrs_stub.base_url).fetch(['system_prices'], '2024-03-01', '2024-03-02')
+    
+    assert grid['system_sell_price'].iloc[:48].notna().all()
+    assert grid['system_sell_price'].iloc[48:].isna().all()
+
+def test_registry():
+    """Test registry lookups and request planning"""
+    registry = DatasetRegistry([DEFAULT_REGISTRY.get('demand')])
+    with pytest.raises(BMRSError):
+        registry.get('system_prices')
+    with pytest.raises(BMRSError):
+        registry.register(DatasetSpec('copy', '/copy', {'x': 'demand_outturn'}))
+    
+    dates = [f'2024-03-{day:02d}' for day in range(1, 11)]
+    planned = DEFAULT_REGISTRY.get('demand').requests_for(dates)
+    assert len(planned) == 2
+    assert dict(planned[1][1])['settlementDateTo'] == '2024-03-10'
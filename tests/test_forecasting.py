@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+import pytest
+from analysis.bmrs import BMRSAnalysis
+from services.api import APIService
+from services.ingestion import IngestionPipeline
+from services.pipeline import PipelinedIngestion
+from tests.test_ingestion import day_records
+from utils.history_store import HistoryStore
+from utils.forecasting import BaselineForecaster, day_period_matrix
+
+@pytest.fixture
+def frames():
+    """Create 8 weeks of data with a daily profile and a weekly pattern"""
+    timestamps = pd.date_range('2024-01-01', periods=56 * 48, freq='30min', tz='UTC')
+    rng = np.random.default_rng(4)
+    profile = 200 * np.sin(np.arange(len(timestamps)) % 48 / 48 * 2 * np.pi)
+    weekend = (timestamps.weekday >= 5) * 150
+    niv = profile + weekend + rng.normal(0, 50, len(timestamps))
+    buy = 80 + profile / 10 + rng.normal(0, 3, len(timestamps))
+    prices_df = pd.DataFrame({'timestamp': timestamps, 'system_buy_price': buy, 'system_sell_price': buy - 10})
+    volumes_df = pd.DataFrame({'timestamp': timestamps, 'net_imbalance_volume': niv})
+    return prices_df, volumes_df
+
+def test_day_period_matrix(frames):
+    """Test the matrix reshape against the frame rows"""
+    _, volumes_df = frames
+    dates, matrix = day_period_matrix(volumes_df.drop(index=[5]), 'net_imbalance_volume')
+    
+    assert matrix.shape == (56, 48)
+    assert dates[0] == pd.Timestamp('2024-01-01').date()
+    assert np.isnan(matrix[0, 5])
+    assert matrix[3, 17] == volumes_df['net_imbalance_volume'].iloc[3 * 48 + 17]
+
+def test_baselines_match_definitions(frames):
+    """Test seasonal naive and smoothing forecasts against loops over days"""
+    forecaster = BaselineForecaster(alpha=0.5)
+    _, matrix = day_period_matrix(frames[1], 'net_imbalance_volume')
+    
+    naive = forecaster.seasonal_naive(matrix)
+    np.testing.assert_array_equal(naive[10], matrix[3])
+    np.testing.assert_array_equal(naive[3], matrix[2])
+    
+    smoothed = forecaster.exp_smoothing(matrix)
+    level = matrix[0]
+    for day in matrix[1:5]:
+        level = 0.5 * day + 0.5 * level
+    np.testing.assert_allclose(smoothed[5], level)
+
+def test_rolling_origin_backtest(frames):
+    """Test forecasts use only earlier days and ridge learns the weekly pattern"""
+    forecaster = BaselineForecaster()
+    result = forecaster.backtest(*frames, n_origins=14)
+    
+    assert len(result.dates) == 15
+    assert np.isnan(result.actuals['net_imbalance_volume'][-1]).all()
+    
+    # Changing the last day must not change the forecast of that day
+    prices_df, volumes_df = frames
+    changed = volumes_df.copy()
+    changed.loc[changed.index[-48:], 'net_imbalance_volume'] += 1000
+    rerun = forecaster.backtest(prices_df, changed, n_origins=14)
+    np.testing.assert_allclose(rerun.forecasts['net_imbalance_volume']['ridge'][-2],
+                               result.forecasts['net_imbalance_volume']['ridge'][-2])
+    
+    metrics = result.metrics()
+    assert metrics.loc[('net_imbalance_volume', 'ridge'), 'skill'] > 0
+    assert 'Forecast vs Actual' in result.format_day(result.dates[0])
+
+def test_day_period_matrix_clock_change(caplog):
+    """Test the repeated hour of the 50-period day keeps its later periods, with a warning"""
+    timestamps = pd.date_range(pd.Timestamp('2024-10-27', tz='Europe/London'),
+                               pd.Timestamp('2024-10-28', tz='Europe/London'),
+                               freq='30min', inclusive='left').tz_convert('UTC')
+    volumes_df = pd.DataFrame({'timestamp': timestamps, 'net_imbalance_volume': np.arange(50, dtype=float)})
+    dates, matrix = day_period_matrix(volumes_df.iloc[::-1], 'net_imbalance_volume')
+    
+    assert dates == [pd.Timestamp('2024-10-27').date()]
+    # Periods 5 and 6 are 01:00 and 01:30 GMT, after 01:00 and 01:30 BST
+    np.testing.assert_array_equal(matrix[0, :6], [0, 1, 4, 5, 6, 7])
+    np.testing.assert_array_equal(matrix[0, 6:], np.arange(8, 50))
+    assert '2 rows share a local half-hour' in caplog.text
+
+def test_live_analysis_fetches_history(bmrs_stub):
+    """Test forecasts of a fetched range are fitted on the days before it"""
+    dates = [d.strftime('%Y-%m-%d') for d in pd.date_range('2024-02-01', periods=30)]
+    for i, date in enumerate(dates):
+        bmrs_stub.add_route(f'/balancing/settlement/system-prices/{date}', {'data': day_records(date, seed=i)})
+    analysis = BMRSAnalysis()
+    analysis.api_service = APIService(bmrs_stub.base_url)
+    analysis.ingestion = IngestionPipeline(analysis.api_service.api)
+    analysis.pipeline = PipelinedIngestion(analysis.ingestion)
+    analysis.forecast_history_days = 28
+    analysis.fetch_history = True
+    
+    result = analysis.run_analysis(dates[-2], dates[-1])
+    forecasts = result.forecasts.forecasts['net_imbalance_volume']
+    assert result.forecasts.dates[0] == pd.Timestamp(dates[-2]).date()
+    assert np.isfinite(forecasts['ridge'][:2]).all()
+    
+    # Seasonal naive is the same day a week earlier, not the previous day
+    _, volumes_df = analysis.ingestion.process(analysis.ingestion.fetch_range(dates[-9], dates[-9]))
+    _, week_before = day_period_matrix(volumes_df, 'net_imbalance_volume')
+    np.testing.assert_allclose(forecasts['seasonal_naive'][0], week_before[0])
+
+def test_live_analysis_reads_stored_history(bmrs_stub, tmp_path):
+    """Test forecast history comes from the stores without fetching it by default"""
+    dates = [d.strftime('%Y-%m-%d') for d in pd.date_range('2024-02-01', periods=16)]
+    for i, date in enumerate(dates):
+        bmrs_stub.add_route(f'/balancing/settlement/system-prices/{date}', {'data': day_records(date, seed=i)})
+    analysis = BMRSAnalysis()
+    analysis.api_service = APIService(bmrs_stub.base_url)
+    analysis.ingestion = IngestionPipeline(analysis.api_service.api)
+    analysis.pipeline = PipelinedIngestion(analysis.ingestion)
+    
+    # Days cached by the validator store from an earlier run
+    analysis.run_analysis(dates[-9], dates[-3])
+    requests = len(bmrs_stub.requests)
+    cached = analysis.run_analysis(dates[-2], dates[-1])
+    assert len(bmrs_stub.requests) == requests + 2
+    
+    _, volumes_df = analysis.ingestion.process(analysis.ingestion.fetch_range(dates[-9], dates[-9]))
+    _, week_before = day_period_matrix(volumes_df, 'net_imbalance_volume')
+    np.testing.assert_allclose(cached.forecasts.forecasts['net_imbalance_volume']['seasonal_naive'][0], week_before[0])
+    
+    # Days in a history store, with nothing cached
+    store = HistoryStore(str(tmp_path / 'history'))
+    store.write(*analysis.ingestion.process(analysis.ingestion.fetch_range(dates[0], dates[-3])))
+    stored = BMRSAnalysis(history_store=store)
+    stored.api_service = APIService(bmrs_stub.base_url)
+    stored.ingestion = IngestionPipeline(stored.api_service.api)
+    stored.pipeline = PipelinedIngestion(stored.ingestion)
+    requests = len(bmrs_stub.requests)
+    result = stored.run_analysis(dates[-2], dates[-1])
+    
+    assert len(bmrs_stub.requests) == requests + 2
+    np.testing.assert_allclose(result.forecasts.forecasts['net_imbalance_volume']['seasonal_naive'][0], week_before[0])
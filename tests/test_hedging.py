@@ -0,0 +1,80 @@
+import time
+import pytest
+from analysis.bmrs import BMRSAnalysis
+from api.hedging import Deadline, DeadlineExceeded, HedgedRequests
+from services.api import APIService
+from services.ingestion import IngestionPipeline
+from services.pipeline import PipelinedIngestion
+from tests.test_ingestion import day_records
+
+DATES = ['2024-03-01', '2024-03-02', '2024-03-03']
+
+def route(date):
+    return f'/balancing/settlement/system-prices/{date}'
+
+def slow_first(seconds):
+    """Delay of the first request only"""
+    calls = []
+    def delay():
+        calls.append(1)
+        return seconds if len(calls) == 1 else 0
+    return delay
+
+def test_hedge_answers_slow_request(bmrs_stub):
+    """Test a duplicate sent after the hedge delay answers before a stalled request"""
+    bmrs_stub.add_route(route(DATES[0]), {'data': day_records(DATES[0])}, delay=slow_first(2))
+    service = APIService(bmrs_stub.base_url, hedger=HedgedRequests(initial_delay=0.05))
+
+    tick = time.perf_counter()
+    df = service.get_imbalance_frame(DATES[0], Deadline(5))
+    assert time.perf_counter() - tick < 1
+    assert len(df) == 48
+    assert (service.hedger.stats.hedged, service.hedger.stats.hedge_wins) == (1, 1)
+    assert len(bmrs_stub.requests) == 2
+    # Only the request is duplicated, so the day is recorded once
+    assert (service.validators.stats.fetched, service.validators.stats.revalidated) == (1, 0)
+
+    # The hedge delay follows the observed latency quantile
+    hedger = HedgedRequests(min_samples=3, quantile=0.5)
+    for _ in range(3):
+        hedger.call(time.sleep, 0.01)
+    assert 0.01 <= hedger.hedge_delay() < 0.5
+
+def test_deadline_falls_back_to_cache(bmrs_stub):
+    """Test a day still unanswered at the deadline is served from cache and marked provisional"""
+    bmrs_stub.add_route(route(DATES[0]), {'data': day_records(DATES[0])})
+    service = APIService(bmrs_stub.base_url, hedger=HedgedRequests(initial_delay=0.05))
+    cached = service.get_imbalance_frame(DATES[0])
+
+    bmrs_stub.add_route(route(DATES[0]), {'data': day_records(DATES[0], seed=1)}, delay=2)
+    bmrs_stub.add_route(route(DATES[1]), {'data': day_records(DATES[1])}, delay=2)
+    tick = time.perf_counter()
+    deadline = Deadline(0.3)
+    assert service.get_imbalance_frame(DATES[0], deadline).equals(cached)
+    with pytest.raises(DeadlineExceeded):
+        service.get_imbalance_frame(DATES[1], deadline)
+    assert time.perf_counter() - tick < 1
+    assert service.provisional_dates == set(DATES[:2])
+    assert service.hedger.stats.deadline_misses == 2
+
+def test_analysis_marked_provisional(bmrs_stub):
+    """Test a run past its time budget completes on cached data with a provisional report"""
+    for date in DATES:
+        bmrs_stub.add_route(route(date), {'data': day_records(date)})
+    analysis = BMRSAnalysis(time_budget=5)
+    analysis.api_service = APIService(bmrs_stub.base_url, hedger=HedgedRequests(initial_delay=0.05))
+    analysis.ingestion = IngestionPipeline(service=analysis.api_service)
+    analysis.pipeline = PipelinedIngestion(analysis.ingestion)
+    fresh = analysis.run_analysis(DATES[0], DATES[-1])
+    assert not fresh.provisional
+
+    bmrs_stub.add_route(route(DATES[1]), {'data': day_records(DATES[1])}, delay=3)
+    analysis.time_budget = 0.5
+    tick = time.perf_counter()
+    result = analysis.run_analysis(DATES[0], DATES[-1])
+
+    assert time.perf_counter() - tick < 2
+    assert result.provisional and result.provisional_dates == [DATES[1]]
+    assert result.daily_reports[DATES[1]].startswith('PROVISIONAL')
+    assert not result.daily_reports[DATES[0]].startswith('PROVISIONAL')
+    assert not fresh.daily_reports[DATES[1]].startswith('PROVISIONAL')
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from analysis.bmrs import BMRSAnalysis
+from utils.data_processor import BMRSDataProcessor
+from utils.history_store import HistoryStore
+
+@pytest.fixture
+def processed_data():
+    """Create three months of processed data with quality flags"""
+    dates = pd.date_range(start='2024-01-01', end='2024-03-31 23:30', freq='30min', tz='UTC')
+    rng = np.random.default_rng(9)
+    raw = pd.DataFrame({
+        'timestamp': dates,
+        'systemSellPrice': rng.uniform(80, 90, len(dates)),
+        'systemBuyPrice': rng.uniform(90, 100, len(dates)),
+        'netImbalanceVolume': rng.uniform(-1000, 1000, len(dates))
+    })
+    return BMRSDataProcessor.clean_and_process_data(raw)
+
+@pytest.fixture
+def store(tmp_path, processed_data):
+    """Create a history store holding the processed data"""
+    store = HistoryStore(str(tmp_path))
+    store.write(*processed_data)
+    return store
+
+def test_partitioned_layout(store):
+    """Test one partition per year and month"""
+    assert store.partitions('prices') == [(2024, 1), (2024, 2), (2024, 3)]
+    assert store.partitions('volumes') == [(2024, 1), (2024, 2), (2024, 3)]
+
+def test_read_with_predicates(store, processed_data):
+    """Test date and column predicates return exactly the requested slice"""
+    prices_df, _ = processed_data
+    df = store.read('prices', '2024-02-10', '2024-02-11', columns=['system_buy_price'])
+    expected = prices_df[prices_df['timestamp'].dt.strftime('%Y-%m-%d').between('2024-02-10', '2024-02-11')]
+    
+    assert list(df.columns) == ['timestamp', 'system_buy_price']
+    assert len(df) == 96
+    np.testing.assert_allclose(df['system_buy_price'], expected['system_buy_price'])
+
+def test_upsert_replaces_rows(store, processed_data):
+    """Test rewriting a period replaces the stored row"""
+    prices_df, volumes_df = processed_data
+    revised = prices_df.iloc[[100]].copy()
+    revised['system_buy_price'] = 999.0
+    store.write(revised, volumes_df.iloc[:0])
+    
+    df = store.read('prices', '2024-01-03', '2024-01-03')
+    assert len(store.read('prices')) == len(prices_df)
+    assert (df['system_buy_price'] == 999.0).sum() == 1
+
+def test_analysis_from_store(store):
+    """Test BMRSAnalysis runs directly from the store"""
+    analysis = BMRSAnalysis()
+    result = analysis.run_analysis_from_store(store, '2024-03-01', '2024-03-02')
+    
+    assert list(result.daily_reports) == ['2024-03-01', '2024-03-02']
+    assert analysis.get_dataframes()[0]['price_quality'].notna().all()
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.helpers import BMRSError
+from utils.imbalance_cube import ImbalanceCube
+
+@pytest.fixture
+def frames():
+    """Create two years of processed prices and volumes"""
+    timestamps = pd.date_range('2022-01-01', '2023-12-31 23:30', freq='30min', tz='UTC')
+    rng = np.random.default_rng(0)
+    sell = rng.uniform(40, 80, len(timestamps))
+    buy = sell + rng.uniform(0, 40, len(timestamps))
+    niv = rng.normal(0, 300, len(timestamps))
+    prices_df = pd.DataFrame({
+        'timestamp': timestamps,
+        'system_sell_price': sell,
+        'system_buy_price': buy,
+        'price_spread': buy - sell
+    })
+    volumes_df = pd.DataFrame({
+        'timestamp': timestamps,
+        'net_imbalance_volume': niv,
+        'abs_imbalance_volume': np.abs(niv)
+    })
+    return prices_df, volumes_df
+
+def grouped(prices_df, volumes_df):
+    """Reference frame with local-time dimensions for pandas groupby"""
+    df = prices_df.merge(volumes_df, on='timestamp')
+    local = df['timestamp'].dt.tz_convert('Europe/London')
+    df['imbalance_cost'] = np.where(
+        df['net_imbalance_volume'] >= 0,
+        df['net_imbalance_volume'] * df['system_sell_price'],
+        df['net_imbalance_volume'] * df['system_buy_price']
+    )
+    return df.assign(year=local.dt.year, month=local.dt.month, weekday=local.dt.weekday,
+                     hour=local.dt.hour, position=np.where(df['net_imbalance_volume'] > 0, 'long', 'short'))
+
+def test_rollups_match_groupby(frames):
+    """Test roll-ups over each statistic against pandas groupby"""
+    cube = ImbalanceCube.build(*frames)
+    df = grouped(*frames)
+    
+    for stat in ['count', 'sum', 'mean', 'std', 'min', 'max']:
+        expected = df.groupby(['hour', 'position'])['imbalance_cost'].agg(stat)
+        result = cube.rollup(['hour', 'position'], 'imbalance_cost', stat)
+        np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(dtype=float), rtol=1e-9)
+
+def test_filtered_query(frames):
+    """Test a winter weekday 17:00 query against filtering the raw data"""
+    cube = ImbalanceCube.build(*frames)
+    df = grouped(*frames)
+    
+    winter = df[df['month'].isin([12, 1, 2]) & (df['weekday'] < 5) & (df['hour'] == 17)]
+    result = cube.rollup(hour=17, weekday=range(5), month=[12, 1, 2])
+    
+    assert result == pytest.approx(winter['imbalance_cost'].mean())
+    assert cube.rollup(stat='count', year=2023, position='short') == \
+        ((df['year'] == 2023) & (df['position'] == 'short')).sum()
+
+def test_heatmap_and_merge(frames, tmp_path):
+    """Test heatmap shape and that merged and reloaded cubes give the same answers"""
+    prices_df, volumes_df = frames
+    cube = ImbalanceCube.build(prices_df, volumes_df)
+    split = prices_df['timestamp'] < '2023-01-01'
+    merged = ImbalanceCube.build(prices_df[split], volumes_df[split]).merge(
+        ImbalanceCube.build(prices_df[~split], volumes_df[~split])
+    )
+    
+    heatmap = merged.heatmap('hour', 'weekday')
+    assert heatmap.shape == (24, 7)
+    pd.testing.assert_frame_equal(heatmap, cube.heatmap('hour', 'weekday'))
+    
+    cube.save(str(tmp_path / 'cube.npz'))
+    loaded = ImbalanceCube.load(str(tmp_path / 'cube.npz'))
+    assert loaded.rollup('month', stat='max').equals(cube.rollup('month', stat='max'))
+    
+    with pytest.raises(BMRSError):
+        cube.rollup(measure='unknown')
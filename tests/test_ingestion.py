@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+from analysis.bmrs import BMRSAnalysis
+from api.schema import parse_system_prices
+from services.api import APIService
+from services.data import DataService
+from services.ingestion import IngestionPipeline
+from services.pipeline import PipelinedIngestion
+
+def day_records(date, periods=48, seed=0):
+    """Create raw API records for one settlement date"""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp(date, tz='Europe/London').tz_convert('UTC')
+    return [
+        {
+            'settlementDate': date,
+            'settlementPeriod': period,
+            'startTime': (start + pd.Timedelta(minutes=30 * (period - 1))).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'systemSellPrice': float(rng.uniform(60, 90)),
+            'systemBuyPrice': float(rng.uniform(90, 120)),
+            'netImbalanceVolume': float(rng.normal(0, 400))
+        }
+        for period in range(periods, 0, -1)
+    ]
+
+def test_parse_matches_dataframe_coercion():
+    """Test the columnar parser against building the full DataFrame"""
+    records = day_records('2024-03-01')
+    parsed = parse_system_prices(records)
+    
+    expected = pd.DataFrame(records).astype({
+        'settlementPeriod': 'int64',
+        'systemSellPrice': 'float64',
+        'systemBuyPrice': 'float64',
+        'netImbalanceVolume': 'float64'
+    })
+    expected['timestamp'] = pd.to_datetime(expected['startTime'])
+    expected = expected.sort_values(['settlementDate', 'settlementPeriod']).reset_index(drop=True)
+    
+    pd.testing.assert_frame_equal(parsed, expected[parsed.columns])
+    assert parsed['settlementPeriod'].tolist() == list(range(1, 49))
+
+def test_timestamp_without_start_time():
+    """Test timestamps derived from settlement periods across a clock change"""
+    records = day_records('2024-10-27', periods=50)
+    derived = parse_system_prices([{k: v for k, v in r.items() if k != 'startTime'} for r in records])
+    
+    assert derived['timestamp'].equals(parse_system_prices(records)['timestamp'])
+    assert derived['timestamp'].iloc[0] == pd.Timestamp('2024-10-26T23:00:00Z')
+
+def test_service_paths_share_processing():
+    """Test both service entry points produce the pipeline's frames"""
+    raw = parse_system_prices(day_records('2024-03-01'))
+    prices_df, volumes_df = IngestionPipeline().process(raw)
+    
+    items = pd.DataFrame({
+        'timestamp': raw['timestamp'],
+        'settlement_period': raw['settlementPeriod'],
+        'system_buy_price': raw['systemBuyPrice'],
+        'system_sell_price': raw['systemSellPrice'],
+        'net_imbalance_volume': raw['netImbalanceVolume'],
+        'settlement_date': raw['settlementDate']
+    })
+    service_prices, service_volumes = DataService.process_data(items)
+    
+    pd.testing.assert_frame_equal(service_prices, prices_df)
+    pd.testing.assert_frame_equal(service_volumes, volumes_df)
+    assert 'price_quality' in service_prices.columns
+
+def test_analysis_uses_pipeline(bmrs_stub):
+    """Test the analysis and the API service read the same parsed data"""
+    for offset, date in enumerate(['2024-03-01', '2024-03-02']):
+        bmrs_stub.add_route(f'/balancing/settlement/system-prices/{date}',
+                            {'data': day_records(date, seed=offset)})
+    
+    analysis = BMRSAnalysis()
+    analysis.api_service = APIService(bmrs_stub.base_url)
+    analysis.ingestion = IngestionPipeline(analysis.api_service.api)
+    analysis.pipeline = PipelinedIngestion(analysis.ingestion)
+    analysis.run_analysis('2024-03-01', '2024-03-02')
+    prices_df, volumes_df = analysis.get_dataframes()
+    
+    assert len(prices_df) == len(volumes_df) == 96
+    assert prices_df['timestamp'].is_monotonic_increasing
+    
+    items = analysis.api_service.get_imbalance_data('2024-03-02')
+    assert [item.system_buy_price for item in items] == prices_df['system_buy_price'].iloc[48:].tolist()
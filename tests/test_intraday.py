@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+from analysis.intraday import IntradayMonitor
+from utils.helpers import BMRSError, periods_in_day
+from api.bmrs import BMRSApi
+
+def period_payload(period, niv, sell=80.0, buy=100.0, date='2024-03-01'):
+    """Create a single-period API payload"""
+    start = pd.Timestamp(date, tz='Europe/London').tz_convert('UTC') + pd.Timedelta(minutes=30 * (period - 1))
+    return {
+        'data': [{
+            'settlementDate': date,
+            'settlementPeriod': period,
+            'startTime': start.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'systemSellPrice': sell,
+            'systemBuyPrice': buy,
+            'netImbalanceVolume': niv
+        }]
+    }
+
+@pytest.fixture
+def monitor(bmrs_stub):
+    """Create a monitor polling the local stub"""
+    return IntradayMonitor('2024-03-01', api=BMRSApi(base_url=bmrs_stub.base_url))
+
+def test_periods_in_day():
+    """Test clock-change days have 46 or 50 periods"""
+    assert periods_in_day('2024-03-01') == 48
+    assert periods_in_day('2024-03-31') == 46
+    assert periods_in_day('2024-10-27') == 50
+
+def test_running_totals(bmrs_stub, monitor):
+    """Test running cost, unit rate and peak hour from polled periods"""
+    prefix = '/balancing/settlement/system-prices/2024-03-01'
+    bmrs_stub.add_route(f'{prefix}/1', period_payload(1, 100.0))
+    bmrs_stub.add_route(f'{prefix}/2', period_payload(2, -50.0))
+    bmrs_stub.add_route(f'{prefix}/3', period_payload(3, 200.0))
+    
+    updates = []
+    monitor.subscribe(updates.append)
+    monitor.run(interval=0, max_polls=4)
+    
+    assert [u.settlement_period for u in updates] == [1, 2, 3]
+    last = updates[-1]
+    assert last.running_cost == pytest.approx(100 * 80 - 50 * 100 + 200 * 80)
+    assert last.unit_rate == pytest.approx(last.running_cost / 350)
+    assert last.peak_hour == 1
+    assert monitor.next_period == 4
+
+def test_unpublished_period(bmrs_stub, monitor):
+    """Test that an unpublished period yields no update"""
+    bmrs_stub.add_route('/balancing/settlement/system-prices/2024-03-01/1', {'data': []})
+    
+    assert monitor.poll_once() is None
+    assert monitor.next_period == 1
+
+def test_long_clock_change_day(bmrs_stub):
+    """Test the monitor polls all 50 periods of the autumn clock-change day"""
+    date = '2024-10-27'
+    for period in range(1, 51):
+        bmrs_stub.add_route(f'/balancing/settlement/system-prices/{date}/{period}',
+                            period_payload(period, 10.0, date=date))
+    monitor = IntradayMonitor(date, api=BMRSApi(base_url=bmrs_stub.base_url))
+    updates = []
+    monitor.subscribe(updates.append)
+    monitor.run(interval=0, max_polls=60)
+    
+    assert monitor.is_complete
+    assert [u.settlement_period for u in updates] == list(range(1, 51))
+    assert updates[-1].running_abs_volume == pytest.approx(500.0)
+
+def test_period_validated_against_day():
+    """Test single-period requests are validated against the day's period count"""
+    api = BMRSApi(base_url='http://127.0.0.1:9')
+    with pytest.raises(BMRSError, match='between 1 and 48'):
+        api.get_imbalance_data('2024-03-01', 49)
+    with pytest.raises(BMRSError, match='between 1 and 46'):
+        api.get_imbalance_data('2024-03-31', 47)
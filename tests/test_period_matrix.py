@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+from services.analysis import AnalysisService
+from utils.helpers import BMRSError
+from utils.imbalance_analysis import ImbalanceAnalysis
+from utils.period_matrix import PeriodMatrix
+from utils.volume_analysis import VolumeAnalysis
+
+STATS = ['mean', 'sum', 'std', 'min', 'max']
+
+@pytest.fixture
+def frames():
+    """Processed frames over the autumn clock change with missing periods"""
+    timestamps = pd.date_range('2024-10-25', '2024-10-29 23:30', freq='30min', tz='UTC')
+    rng = np.random.default_rng(0)
+    niv = rng.normal(0, 400, len(timestamps))
+    niv[[10, 11]] = np.nan
+    prices_df = pd.DataFrame({
+        'timestamp': timestamps,
+        'system_sell_price': rng.uniform(60, 90, len(timestamps)),
+        'system_buy_price': rng.uniform(90, 120, len(timestamps))
+    }).drop(index=[3, 4, 100])
+    volumes_df = pd.DataFrame({
+        'timestamp': timestamps,
+        'net_imbalance_volume': niv,
+        'abs_imbalance_volume': np.abs(niv)
+    }).drop(index=[4, 5, 6, 150])
+    return prices_df.reset_index(drop=True), volumes_df.reset_index(drop=True)
+
+@pytest.mark.parametrize('tz', ['UTC', 'Europe/London', None])
+def test_hourly_and_daily_stats_match_groupby(frames, tz):
+    """Test reshape-and-reduce statistics against pandas groupbys"""
+    _, volumes_df = frames
+    if tz != 'UTC':
+        volumes_df = volumes_df.assign(timestamp=volumes_df['timestamp'].dt.tz_convert(tz or 'UTC'))
+    if tz is None:
+        volumes_df['timestamp'] = volumes_df['timestamp'].dt.tz_localize(None)
+    matrix = PeriodMatrix.from_frames(volumes_df, columns=['net_imbalance_volume'])
+    agg = {'net_imbalance_volume': STATS}
+
+    hourly = volumes_df.groupby(volumes_df['timestamp'].dt.hour.rename('hour')).agg(agg)
+    pd.testing.assert_frame_equal(matrix.hourly_stats(agg), hourly)
+
+    daily = volumes_df.groupby(volumes_df['timestamp'].dt.date.rename('date')).agg(agg)
+    pd.testing.assert_frame_equal(matrix.daily_stats(agg), daily)
+
+def test_dst_layout(frames):
+    """Test the long day has 50 slots and other days mask the padding"""
+    _, volumes_df = frames
+    local = volumes_df.assign(timestamp=volumes_df['timestamp'].dt.tz_convert('Europe/London'))
+    matrix = PeriodMatrix.from_frames(local, columns=['net_imbalance_volume'])
+
+    assert matrix.shape == (5, 50)
+    assert not matrix.regular
+    assert matrix.day_slots.tolist() == [48, 48, 50, 48, 48]
+    assert not matrix.present[~matrix.valid].any()
+    assert (matrix.hours[2, 2:6] == 1).all()
+
+def test_imbalance_metrics_match_merge(frames):
+    """Test daily imbalance metrics against the merge and groupby they replace"""
+    prices_df, volumes_df = frames
+    metrics = ImbalanceAnalysis.calculate_daily_imbalance_metrics(prices_df, volumes_df)
+
+    df = pd.merge(prices_df, volumes_df, on='timestamp', how='inner')
+    df['imbalance_cost'] = np.where(
+        df['net_imbalance_volume'] >= 0,
+        df['net_imbalance_volume'] * df['system_sell_price'],
+        df['net_imbalance_volume'] * df['system_buy_price']
+    )
+    expected = df.groupby(df['timestamp'].dt.date.rename('date')).agg({
+        'imbalance_cost': ['sum'],
+        'net_imbalance_volume': ['sum'],
+        'abs_imbalance_volume': ['sum'],
+        'system_sell_price': ['mean', 'min', 'max'],
+        'system_buy_price': ['mean', 'min', 'max']
+    }).round(2)
+    expected['unit_rate'] = (expected['imbalance_cost'] / expected['abs_imbalance_volume']).round(2)
+
+    pd.testing.assert_frame_equal(metrics, expected)
+
+def test_volume_analyses_match_groupby(frames):
+    """Test hourly volume statistics and peak hours against pandas"""
+    _, volumes_df = frames
+    stats, _ = AnalysisService.analyse_volumes(volumes_df)
+    expected = volumes_df.groupby(volumes_df['timestamp'].dt.hour.rename('hour')).agg({
+        'abs_imbalance_volume': ['mean', 'sum', 'std']
+    })
+    pd.testing.assert_frame_equal(stats, expected)
+
+    matrix = PeriodMatrix.from_frames(volumes_df, columns=['abs_imbalance_volume'])
+    peaks = VolumeAnalysis._identify_peak_hours(matrix.dates, matrix.hourly_totals('abs_imbalance_volume'))
+    df = volumes_df.assign(date=volumes_df['timestamp'].dt.date, hour=volumes_df['timestamp'].dt.hour)
+    daily_peaks = df.groupby(['date', 'hour'])['abs_imbalance_volume'].sum()
+
+    assert len(peaks['daily_peaks']) == len(daily_peaks)
+    assert peaks['daily_peaks'].iloc[0]['abs_imbalance_volume'] == pytest.approx(daily_peaks.max())
+    top_3 = daily_peaks.groupby(level='date').nlargest(3).droplevel(0).reset_index().groupby('hour').size()
+    assert peaks['top_3_frequency'].sort_index().tolist() == top_3.sort_index().tolist()
+
+def test_peak_slots():
+    """Test each day's peak slot and days without values"""
+    timestamps = pd.date_range('2024-03-01', periods=96, freq='30min')
+    values = np.zeros(96)
+    values[7] = 5.0
+    values[48:] = np.nan
+    df = pd.DataFrame({'timestamp': timestamps, 'value': values})
+
+    assert PeriodMatrix.from_frames(df, columns=['value']).peak_slots('value').tolist() == [7, -1]
+
+def test_missing_column():
+    """Test an unknown column raises a BMRSError"""
+    df = pd.DataFrame({'timestamp': pd.date_range('2024-03-01', periods=4, freq='30min')})
+    with pytest.raises(BMRSError):
+        PeriodMatrix.from_frames(df, columns=['value'])
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.helpers import BMRSError
+from utils.period_store import PeriodArrayStore
+
+@pytest.fixture
+def raw_data():
+    """Create raw API rows for three days including a 50-period day"""
+    rows = []
+    for day, periods in [('2024-10-26', 48), ('2024-10-27', 50), ('2024-10-28', 48)]:
+        for period in range(1, periods + 1):
+            rows.append({
+                'settlementDate': day,
+                'settlementPeriod': period,
+                'systemSellPrice': 80.0 + period,
+                'systemBuyPrice': 90.0 + period,
+                'netImbalanceVolume': -10.0 * period
+            })
+    return pd.DataFrame(rows)
+
+@pytest.fixture
+def store(tmp_path, raw_data):
+    """Create and fill a period store"""
+    path = str(tmp_path / 'periods.bin')
+    store = PeriodArrayStore.create(path, '2024-10-26', '2024-10-28')
+    store.write_frame(raw_data)
+    store.flush()
+    return PeriodArrayStore.open(path)
+
+def test_period_lookup(store):
+    """Test O(1) lookup of a period, including period 50 on clock-change day"""
+    assert store.get('2024-10-26', 17)['systemBuyPrice'] == 107.0
+    assert store.get('2024-10-27', 50)['netImbalanceVolume'] == -500.0
+
+def test_invalid_periods(store):
+    """Test period validation follows the day length"""
+    with pytest.raises(BMRSError):
+        store.get('2024-10-26', 49)
+    with pytest.raises(BMRSError):
+        store.get('2024-11-01', 1)
+
+def test_range_is_zero_copy(store):
+    """Test range slices are views on the memory map with validity masks"""
+    values, valid = store.range('systemSellPrice', '2024-10-27', '2024-10-28')
+    
+    assert values.shape == (2, 50)
+    assert isinstance(values, np.memmap) and not values.flags['OWNDATA']
+    assert valid[0].sum() == 50 and valid[1].sum() == 48
+    assert np.isnan(values[1, 48:]).all()
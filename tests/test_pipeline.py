@@ -0,0 +1,73 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from analysis.bmrs import BMRSAnalysis
+from services.api import APIService
+from services.ingestion import IngestionPipeline
+from services.pipeline import PipelinedIngestion
+from tests.test_ingestion import day_records
+
+DATES = [d.strftime('%Y-%m-%d') for d in pd.date_range('2024-06-01', periods=6)]
+
+def serve(bmrs_stub, failed=(), delay=0):
+    """Serve summer days with a short gap across the first midnight"""
+    for i, date in enumerate(DATES):
+        records = day_records(date, seed=i)
+        if i == 0:
+            records[0]['systemBuyPrice'] = None  # Last period of the day
+        if i == 1:
+            records[-1]['systemBuyPrice'] = None  # First period of the day
+        status = 500 if date in failed else 200
+        bmrs_stub.add_route(f'/balancing/settlement/system-prices/{date}', {'data': records}, status, delay)
+
+def analysis_for(bmrs_stub, **pipeline_args):
+    analysis = BMRSAnalysis()
+    analysis.api_service = APIService(bmrs_stub.base_url)
+    analysis.ingestion = IngestionPipeline(analysis.api_service.api)
+    analysis.pipeline = PipelinedIngestion(analysis.ingestion, **pipeline_args)
+    return analysis
+
+@pytest.mark.parametrize('failed', [['2024-06-04'], ['2024-06-02', '2024-06-03'], ['2024-06-01', '2024-06-06']])
+def test_matches_sequential_analysis(bmrs_stub, failed):
+    """Test the merged per-day analyses equal analysing the whole range at once"""
+    serve(bmrs_stub, failed=failed)
+    analysis = analysis_for(bmrs_stub, fetch_workers=2, queue_size=2)
+    staged = analysis.run_analysis(DATES[0], DATES[-1])
+    prices_df, volumes_df = analysis.get_dataframes()
+
+    sequential = analysis_for(bmrs_stub)
+    _, sequential._prices_df, sequential._volumes_df = sequential.ingestion.run(DATES[0], DATES[-1])
+    sequential._flag_anomalies()
+    expected = sequential._compute(DATES[0], DATES[-1])
+
+    pd.testing.assert_frame_equal(prices_df, sequential._prices_df)
+    pd.testing.assert_frame_equal(volumes_df, sequential._volumes_df)
+    assert staged.failed_dates == failed
+    pd.testing.assert_frame_equal(staged.hourly_stats, expected.hourly_stats)
+    assert staged.peak_hours_report == expected.peak_hours_report
+    assert staged.daily_reports == expected.daily_reports
+    pd.testing.assert_frame_equal(staged.quality_profile, expected.quality_profile)
+    assert staged.data_quality == expected.data_quality
+    np.testing.assert_allclose(staged.imbalance_cube.sums, expected.imbalance_cube.sums)
+    assert (staged.imbalance_cube.count == expected.imbalance_cube.count).all()
+
+def test_bounded_lookahead(bmrs_stub, monkeypatch):
+    """Test fetching stays at most queue_size days ahead of slow processing"""
+    serve(bmrs_stub)
+    pipeline = PipelinedIngestion(IngestionPipeline(APIService(bmrs_stub.base_url).api), fetch_workers=1, queue_size=1)
+    process_block = pipeline._process_block
+    ahead = []
+
+    def slow_process_block(raws, first, last):
+        time.sleep(0.05)
+        ahead.append(len(bmrs_stub.requests) - (last - pd.Timestamp(DATES[0]).date()).days)
+        return process_block(raws, first, last)
+
+    monkeypatch.setattr(pipeline, '_process_block', slow_process_block)
+    result = pipeline.run(DATES[0], DATES[-1])
+
+    assert len(result.daily_reports) == len(DATES)
+    # The last day being processed, the day after it and queue_size days ahead
+    assert max(ahead) <= pipeline.queue_size + 2
+    assert result.stats.compute > 0
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.price_volume import PriceVolumeAnalysis
+
+@pytest.fixture
+def frames():
+    """Create 60 days of prices that respond to the imbalance volume"""
+    timestamps = pd.date_range('2024-01-01', periods=60 * 48, freq='30min', tz='UTC')
+    rng = np.random.default_rng(0)
+    niv = rng.normal(0, 300, len(timestamps))
+    buy = 80 + 0.05 * niv + rng.normal(0, 10, len(timestamps))
+    buy[100:110] = np.nan
+    prices_df = pd.DataFrame({'timestamp': timestamps, 'system_buy_price': buy})
+    volumes_df = pd.DataFrame({'timestamp': timestamps, 'net_imbalance_volume': niv})
+    return prices_df, volumes_df
+
+def test_rolling_matches_pandas(frames):
+    """Test rolling correlation and slope against pandas rolling"""
+    prices_df, volumes_df = frames
+    result = PriceVolumeAnalysis.analyse(prices_df, volumes_df, windows=(48, 336))
+    
+    x = volumes_df['net_imbalance_volume'].where(prices_df['system_buy_price'].notna())
+    y = prices_df['system_buy_price']
+    for window in (48, 336):
+        rolling_x = x.rolling(window, min_periods=window // 2)
+        expected_corr = rolling_x.corr(y)
+        expected_slope = rolling_x.cov(y) / rolling_x.var()
+        np.testing.assert_allclose(result[f'correlation_{window}'], expected_corr, rtol=1e-7, atol=1e-9)
+        np.testing.assert_allclose(result[f'slope_{window}'], expected_slope, rtol=1e-7, atol=1e-12)
+    
+    assert result['slope_336'].iloc[-1] == pytest.approx(0.05, abs=0.01)
+    
+    # Elasticity is the slope scaled by mean |NIV| / mean price of the window
+    tail = slice(len(x) - 48, len(x))
+    expected = result['slope_48'].iloc[-1] * x.iloc[tail].abs().mean() / y.iloc[tail].mean()
+    assert result['elasticity_48'].iloc[-1] == pytest.approx(expected)
+
+def test_by_settlement_period(frames):
+    """Test per-period windows only span the same half-hour of earlier days"""
+    prices_df, volumes_df = frames
+    result = PriceVolumeAnalysis.by_settlement_period(prices_df, volumes_df, window_days=14)
+    
+    period_36 = result[result['settlement_period'] == 36].reset_index(drop=True)
+    slot = prices_df['timestamp'].dt.tz_convert('Europe/London')
+    mask = (slot.dt.hour * 2 + slot.dt.minute // 30 + 1) == 36
+    x = volumes_df.loc[mask, 'net_imbalance_volume'].reset_index(drop=True)
+    y = prices_df.loc[mask, 'system_buy_price'].reset_index(drop=True)
+    expected = x.rolling(14, min_periods=7).corr(y)
+    
+    assert len(period_36) == 60
+    np.testing.assert_allclose(period_36['correlation'], expected, rtol=1e-7)
+    
+    latest = PriceVolumeAnalysis.latest_by_settlement_period(result)
+    assert list(latest.index) == list(range(1, 49))
+    assert latest.loc[36, 'correlation'] == pytest.approx(expected.iloc[-1])
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.data_processor import BMRSDataProcessor
+from utils.quality_profiler import QualityProfiler
+
+@pytest.fixture
+def processed_data():
+    """Create two days of processed data with known quality issues"""
+    dates = pd.date_range(start='2024-03-01', periods=96, freq='30min')
+    rng = np.random.default_rng(6)
+    raw = pd.DataFrame({
+        'timestamp': dates,
+        'systemSellPrice': rng.uniform(80, 90, 96),
+        'systemBuyPrice': rng.uniform(90, 100, 96),
+        'netImbalanceVolume': rng.uniform(-1000, 1000, 96)
+    })
+    raw.loc[5, 'systemSellPrice'] = np.nan          # Interpolated on day 1
+    raw.loc[60:63, 'netImbalanceVolume'] = np.nan   # Missing run on day 2
+    raw.loc[70, 'netImbalanceVolume'] = 0.0         # Zero volume on day 2
+    raw.loc[80, ['systemSellPrice', 'systemBuyPrice']] = [120.0, 100.0]  # Anomaly on day 2
+    return BMRSDataProcessor.clean_and_process_data(raw)
+
+def test_profile_counts(processed_data):
+    """Test per-day, per-column counts"""
+    profile = QualityProfiler.profile(*processed_data)
+    day1, day2 = sorted(profile.index.get_level_values('date').unique())
+    
+    assert profile.loc[(day1, 'system_sell_price'), 'interpolated'] == 1
+    assert profile.loc[(day2, 'net_imbalance_volume'), 'missing'] == 4
+    assert profile.loc[(day2, 'net_imbalance_volume'), 'zero_volume'] == 1
+    assert profile.loc[(day2, 'price_spread'), 'anomaly'] == 1
+    assert profile.loc[(day1, 'price_spread'), 'periods'] == 48
+
+def test_out_of_range(processed_data):
+    """Test configurable out-of-range bounds"""
+    profile = QualityProfiler.profile(*processed_data, ranges={'system_buy_price': (0.0, 95.0)})
+    
+    assert profile.xs('system_buy_price', level='column')['out_of_range'].sum() > 0
+    assert profile.xs('system_sell_price', level='column')['out_of_range'].sum() == 0
+
+def test_merge_matches_full_profile(processed_data):
+    """Test that merging daily profiles equals profiling the whole range"""
+    prices_df, volumes_df = processed_data
+    parts = [
+        QualityProfiler.profile(prices_df.iloc[:48], volumes_df.iloc[:48]),
+        QualityProfiler.profile(prices_df.iloc[48:], volumes_df.iloc[48:])
+    ]
+    
+    pd.testing.assert_frame_equal(QualityProfiler.merge(*parts), QualityProfiler.profile(prices_df, volumes_df))
+    assert QualityProfiler.summarise(parts[0]).loc['system_sell_price', 'interpolated_pct'] == pytest.approx(100 / 48)
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+from services.report_server import ReportCache, ReportServer
+from utils.data_processor import BMRSDataProcessor
+from utils.history_store import HistoryStore
+
+def make_raw(seed=3):
+    """Create one week of raw half-hourly data"""
+    dates = pd.date_range(start='2024-03-01', end='2024-03-07 23:30', freq='30min', tz='UTC')
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'timestamp': dates,
+        'systemSellPrice': rng.uniform(80, 90, len(dates)),
+        'systemBuyPrice': rng.uniform(90, 100, len(dates)),
+        'netImbalanceVolume': rng.uniform(-1000, 1000, len(dates))
+    })
+
+@pytest.fixture
+def server(tmp_path):
+    """Serve reports from a history store holding one week of data"""
+    store = HistoryStore(str(tmp_path))
+    store.write(*BMRSDataProcessor.clean_and_process_data(make_raw()))
+    
+    server = ReportServer(store, port=0, cache_size=2)
+    server.start()
+    yield server
+    server.stop()
+
+def test_json_resources(server):
+    """Test every resource is served as JSON for a date range"""
+    params = {'start': '2024-03-01', 'end': '2024-03-03'}
+    reports = requests.get(f'{server.base_url}/reports/daily', params=params).json()
+    metrics = requests.get(f'{server.base_url}/metrics', params=params).json()
+    hourly = requests.get(f'{server.base_url}/hourly-stats', params=params).json()
+    quality = requests.get(f'{server.base_url}/quality', params=params).json()
+    
+    assert sorted(reports['reports']) == ['2024-03-01', '2024-03-02', '2024-03-03']
+    assert [day['date'] for day in metrics['days']] == ['2024-03-01', '2024-03-02', '2024-03-03']
+    assert 'imbalance_cost_sum' in metrics['days'][0]
+    assert len(hourly['hours']) == 24
+    assert 'abs_imbalance_volume_mean' in hourly['hours'][0]
+    assert set(quality['metrics']) == {'prices', 'volumes'}
+    
+    # One analysis serves all four resources of the range
+    assert server.cache.stats.misses == 1
+    assert server.cache.stats.hits == 3
+
+def test_etag_revalidation(server):
+    """Test a matching If-None-Match is answered with 304"""
+    url = f'{server.base_url}/metrics?start=2024-03-01&end=2024-03-02'
+    first = requests.get(url)
+    second = requests.get(url, headers={'If-None-Match': first.headers['ETag']})
+    
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert second.content == b''
+
+def test_store_write_invalidates(server):
+    """Test responses are recomputed after new data is written to the store"""
+    url = f'{server.base_url}/metrics?start=2024-03-01&end=2024-03-02'
+    first = requests.get(url)
+    server.store.write(*BMRSDataProcessor.clean_and_process_data(make_raw(seed=4)))
+    second = requests.get(url, headers={'If-None-Match': first.headers['ETag']})
+    
+    assert second.status_code == 200
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert second.json() != first.json()
+    assert server.cache.stats.expirations == 1
+
+def test_ttl_expiry():
+    """Test entries are recomputed once their TTL has passed"""
+    cache = ReportCache(ttl=0)
+    calls = []
+    cache.get(('2024-03-01', '2024-03-01'), lambda: calls.append(1) or {})
+    cache.get(('2024-03-01', '2024-03-01'), lambda: calls.append(1) or {})
+    
+    assert len(calls) == 2
+    assert cache.stats.expirations == 1
+
+def test_lru_eviction(server):
+    """Test the least recently used range is evicted"""
+    for start in ['2024-03-01', '2024-03-02', '2024-03-01', '2024-03-03']:
+        requests.get(f'{server.base_url}/quality', params={'start': start})
+    
+    assert server.cache.stats.evictions == 1
+    requests.get(f'{server.base_url}/quality', params={'start': '2024-03-01'})
+    assert server.cache.stats.misses == 3
+
+def test_errors(server):
+    """Test invalid requests are rejected without running an analysis"""
+    assert requests.get(f'{server.base_url}/metrics', params={'start': '2024-13-01'}).status_code == 400
+    assert requests.get(f'{server.base_url}/metrics',
+                        params={'start': '2024-03-02', 'end': '2024-03-01'}).status_code == 400
+    assert requests.get(f'{server.base_url}/unknown').status_code == 404
+    assert requests.get(f'{server.base_url}/metrics', params={'start': '2023-01-01'}).status_code == 502
+    assert server.cache.stats.misses == 1
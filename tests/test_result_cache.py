@@ -0,0 +1,77 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from analysis.bmrs import BMRSAnalysis
+from utils.data_processor import BMRSDataProcessor
+from utils.history_store import HistoryStore
+from utils.result_cache import ResultCache
+
+def raw_frame(seed=3):
+    """Create one week of raw data"""
+    dates = pd.date_range(start='2024-03-01', end='2024-03-07 23:30', freq='30min', tz='UTC')
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'timestamp': dates,
+        'systemSellPrice': rng.uniform(80, 90, len(dates)),
+        'systemBuyPrice': rng.uniform(90, 100, len(dates)),
+        'netImbalanceVolume': rng.uniform(-1000, 1000, len(dates))
+    })
+
+def test_key_tracks_data_and_params():
+    """Test keys change with any data revision or parameter"""
+    df = pd.DataFrame({'timestamp': pd.date_range('2024-03-01', periods=4, freq='30min'), 'value': [1.0, 2, 3, 4]})
+    key = ResultCache.key([df], {'window': 48})
+
+    assert ResultCache.key([df.copy()], {'window': 48}) == key
+    assert ResultCache.key([df], {'window': 336}) != key
+    revised = df.copy()
+    revised.loc[2, 'value'] = 3.5
+    assert ResultCache.key([revised], {'window': 48}) != key
+
+def test_memory_lru_and_disk(tmp_path):
+    """Test the LRU evicts the oldest entry and the disk cache outlives it"""
+    cache = ResultCache(str(tmp_path), maxsize=2)
+    for key in ['a', 'b', 'c']:
+        cache.put(key, {'result': key})
+
+    assert cache.stats.evictions == 1
+    assert cache.get('c') == {'result': 'c'}
+    assert cache.get('a') == {'result': 'a'}
+    assert cache.get('missing') is None
+    assert (cache.stats.memory_hits, cache.stats.disk_hits, cache.stats.misses) == (1, 1, 1)
+
+    reopened = ResultCache(str(tmp_path))
+    assert reopened.get('b') == {'result': 'b'}
+    assert reopened.stats.disk_hits == 1
+
+def test_disk_size_bound(tmp_path):
+    """Test the least recently used files are removed beyond max_bytes"""
+    cache = ResultCache(str(tmp_path), maxsize=1, max_bytes=25000)
+    for i, key in enumerate(['a', 'b', 'c']):
+        cache.put(key, b'x' * 10000)
+        os.utime(tmp_path / f'{key}.pkl', (i, i))
+
+    cache.put('d', b'x' * 10000)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['c.pkl', 'd.pkl']
+
+def test_analysis_memoised_until_data_revised(tmp_path):
+    """Test an unchanged range reuses the result and revised data recomputes it"""
+    store = HistoryStore(str(tmp_path / 'store'))
+    store.write(*BMRSDataProcessor.clean_and_process_data(raw_frame()))
+    cache = ResultCache(str(tmp_path / 'results'))
+
+    first = BMRSAnalysis(result_cache=cache).run_analysis_from_store(store, '2024-03-01', '2024-03-03')
+    second = BMRSAnalysis(result_cache=cache).run_analysis_from_store(store, '2024-03-01', '2024-03-03')
+    assert second is first
+    assert cache.stats.memory_hits == 1
+
+    from_disk = BMRSAnalysis(result_cache=ResultCache(str(tmp_path / 'results')))
+    result = from_disk.run_analysis_from_store(store, '2024-03-01', '2024-03-03')
+    assert result.daily_reports == first.daily_reports
+    assert from_disk.result_cache.stats.disk_hits == 1
+
+    store.write(*BMRSDataProcessor.clean_and_process_data(raw_frame(seed=4)))
+    revised = BMRSAnalysis(result_cache=cache).run_analysis_from_store(store, '2024-03-01', '2024-03-03')
+    assert revised.daily_reports != first.daily_reports
+    assert cache.stats.misses == 2
@@ -0,0 +1,82 @@
+import json
+import pytest
+from unittest.mock import patch
+from api.bmrs import BMRSApi
+from api.revalidation import ValidatorStore
+from services.api import APIService
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response"""
+    
+    def __init__(self, payload=None, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = json.dumps(payload).encode() if payload is not None else b''
+        self.url = 'http://stub'
+        self._payload = payload
+    
+    def json(self):
+        return self._payload
+    
+    def raise_for_status(self):
+        pass
+
+@pytest.fixture
+def payload():
+    """Create a one-period API payload"""
+    return {
+        'data': [
+            {
+                'settlementDate': '2024-03-01',
+                'settlementPeriod': 1,
+                'startTime': '2024-03-01T00:00:00Z',
+                'systemSellPrice': 100.5,
+                'systemBuyPrice': 110.5,
+                'netImbalanceVolume': -500
+            }
+        ]
+    }
+
+@patch('requests.get')
+def test_etag_revalidation(mock_get, payload):
+    """Test that a 304 response is served from the store"""
+    api = BMRSApi()
+    mock_get.return_value = FakeResponse(payload, headers={'ETag': '"v1"'})
+    first = api.get_imbalance_data('2024-03-01')
+    
+    mock_get.return_value = FakeResponse(status_code=304)
+    second = api.get_imbalance_data('2024-03-01')
+    
+    assert mock_get.call_args.kwargs['headers'] == {'If-None-Match': '"v1"'}
+    assert second.equals(first)
+    assert api.validators.stats.fetched == 1
+    assert api.validators.stats.revalidated == 1
+
+@patch('requests.get')
+def test_content_hash_fallback(mock_get, payload):
+    """Test revalidation by content hash when no validators are sent"""
+    service = APIService('http://stub')
+    mock_get.return_value = FakeResponse(payload)
+    service.get_imbalance_data('2024-03-01')
+    service.get_imbalance_data('2024-03-01')
+    
+    payload['data'][0]['systemBuyPrice'] = 120.0
+    mock_get.return_value = FakeResponse(payload)
+    items = service.get_imbalance_data('2024-03-01')
+    
+    assert items[0].system_buy_price == 120.0
+    assert service.validators.stats.revalidated == 1
+    assert service.validators.stats.refreshed == 1
+
+@patch('requests.get')
+def test_persisted_validators(mock_get, payload, tmp_path):
+    """Test that validators survive between store instances"""
+    mock_get.return_value = FakeResponse(payload, headers={'Last-Modified': 'Fri, 01 Mar 2024 00:00:00 GMT'})
+    BMRSApi(ValidatorStore(str(tmp_path))).get_imbalance_data('2024-03-01')
+    
+    api = BMRSApi(ValidatorStore(str(tmp_path)))
+    mock_get.return_value = FakeResponse(status_code=304)
+    df = api.get_imbalance_data('2024-03-01')
+    
+    assert mock_get.call_args.kwargs['headers'] == {'If-Modified-Since': 'Fri, 01 Mar 2024 00:00:00 GMT'}
+    assert df.iloc[0]['systemBuyPrice'] == 110.5
@@ -0,0 +1,141 @@
+import pytest
+import pandas as pd
+import numpy as np
+from analysis.bmrs import BMRSAnalysis
+from services.api import APIService
+from services.ingestion import IngestionPipeline
+from services.pipeline import PipelinedIngestion
+from tests.test_ingestion import day_records
+from utils.revisions import IncrementalProcessor, RevisionStore
+from utils.data_processor import BMRSDataProcessor
+from utils.aggregates import finalise_aggregates, merge_partial_aggregates, partial_aggregates
+
+@pytest.fixture
+def sample_raw_data():
+    """Create three days of raw half-hourly data"""
+    dates = pd.date_range(start='2024-03-01', periods=144, freq='30min')
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'timestamp': dates,
+        'systemSellPrice': rng.uniform(80, 90, 144),
+        'systemBuyPrice': rng.uniform(90, 100, 144),
+        'netImbalanceVolume': rng.uniform(-1000, 1000, 144)
+    })
+
+def test_unchanged_refetch(sample_raw_data):
+    """Test that re-adding identical data reports no revisions"""
+    store = RevisionStore()
+    first = store.add(sample_raw_data)
+    second = store.add(sample_raw_data)
+    
+    assert len(first.changed_days) == 3
+    assert second.changed_days == []
+    assert len(second.unchanged_days) == 3
+
+def test_per_period_diff(sample_raw_data):
+    """Test that a revised period is reported with old and new values"""
+    store = RevisionStore()
+    store.add(sample_raw_data)
+    
+    revised = sample_raw_data.iloc[48:96].copy()
+    revised.loc[60, 'systemBuyPrice'] = 500.0
+    report = store.add(revised)
+    
+    changes = report.to_frame()
+    assert report.changed_days == [pd.Timestamp('2024-03-02').date()]
+    assert len(changes) == 1
+    assert changes.iloc[0]['column'] == 'systemBuyPrice'
+    assert changes.iloc[0]['new_value'] == 500.0
+    assert len(store.versions(report.changed_days[0])) == 2
+    assert 'Changed Days: 1' in report.format()
+
+def test_store_loads_persisted_versions(sample_raw_data, tmp_path):
+    """Test that a store reloaded from its path has every version"""
+    store = RevisionStore(str(tmp_path))
+    store.add(sample_raw_data)
+    revised = sample_raw_data.copy()
+    revised.loc[60, 'systemBuyPrice'] = 500.0
+    store.add(revised)
+    
+    reloaded = RevisionStore(str(tmp_path))
+    report = reloaded.add(revised)
+    
+    assert reloaded.days == store.days
+    assert len(reloaded.versions(pd.Timestamp('2024-03-02').date())) == 2
+    assert report.changed_days == []
+    assert len(report.unchanged_days) == 3
+
+def test_incremental_matches_full(sample_raw_data):
+    """Test that incremental aggregates equal a full recomputation"""
+    processor = IncrementalProcessor()
+    processor.update(sample_raw_data)
+    
+    revised = sample_raw_data.copy()
+    revised.loc[100, 'netImbalanceVolume'] = 2500.0
+    report = processor.update(revised)
+    
+    full = IncrementalProcessor()
+    full.update(revised)
+    
+    assert len(report.changed_days) == 1
+    pd.testing.assert_frame_equal(processor.get_daily_metrics(), full.get_daily_metrics())
+    pd.testing.assert_frame_equal(processor.get_hourly_stats(), full.get_hourly_stats())
+
+def test_gaps_across_midnight_match_full_processing(sample_raw_data):
+    """Test that days are cleaned with their neighbours, as over the whole range"""
+    gapped = sample_raw_data.drop(index=[47, 48]).reset_index(drop=True)
+    processor = IncrementalProcessor()
+    processor.update(gapped.iloc[:47])
+    processor.update(gapped.iloc[47:])
+    
+    prices_df, volumes_df = processor.get_dataframes()
+    expected_prices, expected_volumes = BMRSDataProcessor.clean_and_process_data(gapped)
+    
+    assert len(prices_df) == 144
+    assert volumes_df['is_interpolated'].sum() == 2
+    pd.testing.assert_frame_equal(prices_df, expected_prices.reset_index(drop=True))
+    pd.testing.assert_frame_equal(volumes_df, expected_volumes.reset_index(drop=True))
+
+def test_merged_partials_match_direct(sample_raw_data):
+    """Test that merged partial aggregates equal a direct groupby"""
+    df = sample_raw_data.assign(hour=sample_raw_data['timestamp'].dt.hour)
+    partials = [partial_aggregates(part, 'hour', ['netImbalanceVolume']) for part in (df.iloc[:50], df.iloc[50:100], df.iloc[100:])]
+    merged = finalise_aggregates(merge_partial_aggregates(partials), {'netImbalanceVolume': ['mean', 'std', 'min', 'max']})
+    direct = df.groupby('hour').agg({'netImbalanceVolume': ['mean', 'std', 'min', 'max']})
+    
+    np.testing.assert_allclose(merged.to_numpy(), direct.to_numpy())
+
+def make_analysis(stub, revisions):
+    """Create an analysis fetching from the stub API with revision tracking"""
+    analysis = BMRSAnalysis(revisions=revisions)
+    analysis.api_service = APIService(stub.base_url)
+    analysis.ingestion = IngestionPipeline(analysis.api_service.api)
+    analysis.pipeline = PipelinedIngestion(analysis.ingestion)
+    return analysis
+
+def test_run_analysis_tracks_revisions(bmrs_stub, tmp_path):
+    """Test that runs with revision tracking report revised days and reload them"""
+    dates = [d.strftime('%Y-%m-%d') for d in pd.date_range('2024-03-01', periods=3)]
+    records = {date: day_records(date, seed=i) for i, date in enumerate(dates)}
+    for date in dates:
+        bmrs_stub.add_route(f'/balancing/settlement/system-prices/{date}', {'data': records[date]})
+    
+    pipelined = make_analysis(bmrs_stub, None)
+    pipelined.run_analysis(dates[0], dates[-1])
+    tracked = make_analysis(bmrs_stub, IncrementalProcessor(RevisionStore(str(tmp_path))))
+    first = tracked.run_analysis(dates[0], dates[-1])
+    
+    assert len(first.revisions.changed_days) == 3
+    for frame, expected in zip(tracked.get_dataframes(), pipelined.get_dataframes()):
+        pd.testing.assert_frame_equal(frame, expected)
+    
+    records[dates[1]][10]['systemBuyPrice'] = 500.0
+    second = tracked.run_analysis(dates[0], dates[-1])
+    reloaded = make_analysis(bmrs_stub, IncrementalProcessor(RevisionStore(str(tmp_path))))
+    third = reloaded.run_analysis(dates[0], dates[-1])
+    
+    assert second.revisions.changed_days == [pd.Timestamp(dates[1]).date()]
+    assert third.revisions.changed_days == []
+    assert (tracked.get_dataframes()[0]['system_buy_price'] == 500.0).sum() == 1
+    for frame, expected in zip(reloaded.get_dataframes(), tracked.get_dataframes()):
+        pd.testing.assert_frame_equal(frame, expected)
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.helpers import BMRSError
+from utils.imbalance_analysis import ImbalanceAnalysis
+from utils.risk_engine import ImbalanceRiskEngine, RiskResult
+
+@pytest.fixture
+def frames():
+    """Create 20 winter days of processed prices and volumes"""
+    timestamps = pd.date_range('2024-01-01', periods=20 * 48, freq='30min', tz='UTC')
+    rng = np.random.default_rng(5)
+    sell = rng.uniform(60, 90, len(timestamps))
+    buy = sell + rng.uniform(0, 30, len(timestamps))
+    niv = rng.normal(0, 300, len(timestamps))
+    prices_df = pd.DataFrame({'timestamp': timestamps, 'system_sell_price': sell, 'system_buy_price': buy})
+    volumes_df = pd.DataFrame({'timestamp': timestamps, 'net_imbalance_volume': niv,
+                               'abs_imbalance_volume': np.abs(niv)})
+    return prices_df, volumes_df
+
+def test_bootstrap_of_identical_days(frames):
+    """Test bootstrapping a history of identical days reproduces that day"""
+    prices_df, volumes_df = frames
+    day = lambda df: pd.concat([df.iloc[:48].assign(timestamp=df['timestamp'].iloc[:48] + pd.Timedelta(days=d))
+                                for d in range(5)], ignore_index=True)
+    engine = ImbalanceRiskEngine(day(prices_df), day(volumes_df))
+    result = engine.simulate(n_scenarios=50, days=3, seed=1)
+    
+    expected = ImbalanceAnalysis.calculate_daily_imbalance_metrics(prices_df.iloc[:48], volumes_df.iloc[:48])
+    assert result.daily_cost.shape == (50, 3)
+    np.testing.assert_allclose(result.daily_cost, expected['imbalance_cost', 'sum'].iloc[0], atol=0.01)
+
+def test_shocked_without_volatility(frames):
+    """Test zero shocks reproduce the realised cost of the last days"""
+    engine = ImbalanceRiskEngine(*frames)
+    result = engine.simulate(n_scenarios=10, days=7, method='shocked',
+                             price_volatility=0.0, niv_volatility=0.0, seed=2)
+    
+    realised = ImbalanceAnalysis.calculate_daily_imbalance_metrics(*frames)
+    np.testing.assert_allclose(result.daily_cost[0], realised['imbalance_cost', 'sum'].iloc[-7:], atol=0.01)
+    
+    with pytest.raises(BMRSError):
+        engine.simulate(days=30, method='shocked')
+
+def test_seeded_batches_independent_of_workers(frames):
+    """Test results depend on the seed only, not on batching across processes"""
+    engine = ImbalanceRiskEngine(*frames)
+    serial = engine.simulate(n_scenarios=400, days=5, seed=7, batch_size=100, max_workers=1)
+    pooled = engine.simulate(n_scenarios=400, days=5, seed=7, batch_size=100, max_workers=2)
+    
+    np.testing.assert_array_equal(serial.daily_cost, pooled.daily_cost)
+    assert not np.array_equal(serial.daily_cost, engine.simulate(400, 5, seed=8, batch_size=100).daily_cost)
+
+def test_clock_change_days(caplog):
+    """Test the repeated hour of the 50-period day keeps its later periods, with a warning"""
+    timestamps = pd.date_range(pd.Timestamp('2024-10-26', tz='Europe/London'),
+                               pd.Timestamp('2024-10-29', tz='Europe/London'),
+                               freq='30min', inclusive='left').tz_convert('UTC')
+    niv = np.arange(len(timestamps), dtype=float)
+    prices_df = pd.DataFrame({'timestamp': timestamps, 'system_sell_price': 80.0, 'system_buy_price': 100.0})
+    volumes_df = pd.DataFrame({'timestamp': timestamps, 'net_imbalance_volume': niv})
+    engine = ImbalanceRiskEngine(prices_df, volumes_df)
+    
+    assert len(timestamps) == 146
+    assert engine.history['niv'].shape == (3, 48)
+    # Periods 5 and 6 of 27 October are 01:00 and 01:30 GMT, after 01:00 and 01:30 BST
+    np.testing.assert_array_equal(engine.history['niv'][1, 2:4], niv[48 + 4:48 + 6])
+    assert '2 rows share a local half-hour' in caplog.text
+
+def test_value_at_risk():
+    """Test VaR and expected shortfall of a known distribution"""
+    losses = np.arange(1, 101, dtype=float)
+    var, es = RiskResult.value_at_risk(losses, 0.95)
+    
+    assert var == pytest.approx(95.05)
+    assert es == pytest.approx(np.mean(losses[95:]))
+    
+    result = RiskResult(np.tile(losses[:, None], (1, 2)), np.ones((100, 2)), 'bootstrap')
+    summary = result.summary()
+    assert summary.loc['total_cost', 'var_95%'] == pytest.approx(2 * var)
+    assert 'VaR 95%' in result.format()
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.imbalance_analysis import ImbalanceAnalysis
+from utils.sharded_analysis import ShardedAnalysis
+from utils.volume_analysis import VolumeAnalysis
+
+@pytest.fixture
+def sample_processed_data():
+    """Create three months of processed half-hourly data"""
+    dates = pd.date_range(start='2024-01-01', end='2024-03-31 23:30', freq='30min')
+    rng = np.random.default_rng(8)
+    niv = rng.normal(0, 400, len(dates))
+    prices_df = pd.DataFrame({
+        'timestamp': dates,
+        'system_sell_price': rng.uniform(60, 90, len(dates)),
+        'system_buy_price': rng.uniform(90, 120, len(dates))
+    })
+    volumes_df = pd.DataFrame({
+        'timestamp': dates,
+        'net_imbalance_volume': niv,
+        'abs_imbalance_volume': np.abs(niv)
+    })
+    return prices_df, volumes_df
+
+def test_split_by_month(sample_processed_data):
+    """Test one shard per calendar month"""
+    _, volumes_df = sample_processed_data
+    shards, = ShardedAnalysis.split_by_month(volumes_df)
+    grouped, = ShardedAnalysis.split_by_month(volumes_df, max_shards=2)
+    
+    assert [len(shard) for shard in shards] == [31 * 48, 29 * 48, 31 * 48]
+    assert [len(shard) for shard in grouped] == [60 * 48, 31 * 48]
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_hourly_volumes_parity(sample_processed_data, max_workers):
+    """Test sharded hourly stats and report match the serial analysis"""
+    _, volumes_df = sample_processed_data
+    serial_stats, serial_report = VolumeAnalysis.analyse_hourly_volumes(volumes_df)
+    sharded_stats, sharded_report = ShardedAnalysis.analyse_hourly_volumes(volumes_df, max_workers=max_workers)
+    
+    pd.testing.assert_frame_equal(sharded_stats, serial_stats)
+    assert sharded_report == serial_report
+
+def test_daily_metrics_parity(sample_processed_data):
+    """Test sharded daily metrics match the serial analysis"""
+    prices_df, volumes_df = sample_processed_data
+    serial = ImbalanceAnalysis.calculate_daily_imbalance_metrics(prices_df, volumes_df)
+    sharded = ShardedAnalysis.calculate_daily_imbalance_metrics(prices_df, volumes_df, max_workers=2)
+    
+    pd.testing.assert_frame_equal(sharded, serial)
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.sketches import KLLSketch, SettlementDistributions, TopK
+
+@pytest.fixture
+def sample_processed_data():
+    """Create a year of processed half-hourly data"""
+    dates = pd.date_range(start='2023-01-01', periods=17520, freq='30min')
+    rng = np.random.default_rng(2)
+    sell = rng.normal(80, 20, len(dates))
+    buy = sell + rng.uniform(0, 10, len(dates))
+    niv = rng.normal(0, 300, len(dates))
+    prices_df = pd.DataFrame({
+        'timestamp': dates,
+        'system_sell_price': sell,
+        'system_buy_price': buy,
+        'price_spread': buy - sell
+    })
+    volumes_df = pd.DataFrame({
+        'timestamp': dates,
+        'net_imbalance_volume': niv,
+        'abs_imbalance_volume': np.abs(niv)
+    })
+    return prices_df, volumes_df
+
+def test_quantile_accuracy():
+    """Test sketch quantiles are within rank error of exact quantiles"""
+    values = np.random.default_rng(3).normal(0, 1, 200_000)
+    sketch = KLLSketch(k=200, seed=0)
+    sketch.update_many(values)
+    
+    for q in (0.01, 0.5, 0.99):
+        rank = (values <= sketch.quantile(q)).mean()
+        assert abs(rank - q) < 0.02
+    assert sketch._size() < 1000
+
+def test_merge_and_serialise():
+    """Test merged sketches round-trip through JSON-compatible dicts"""
+    rng = np.random.default_rng(4)
+    a, b = KLLSketch(seed=0), KLLSketch(seed=1)
+    a.update_many(rng.uniform(0, 1, 50_000))
+    b.update_many(rng.uniform(1, 2, 50_000))
+    merged = KLLSketch.from_dict(a.merge(b).to_dict())
+    
+    assert merged.n == 100_000
+    assert merged.quantile(0.5) == pytest.approx(1.0, abs=0.05)
+
+def test_top_k():
+    """Test that only the K largest scores are kept"""
+    tracker = TopK(k=3)
+    tracker.update_many([5, 1, 9, 7, 3], ['a', 'b', 'c', 'd', 'e'], [5, 1, 9, 7, 3])
+    
+    assert [item['label'] for item in tracker.items()] == ['c', 'd', 'a']
+
+def test_settlement_distributions(sample_processed_data):
+    """Test worst periods and state size for a year of data"""
+    prices_df, volumes_df = sample_processed_data
+    distributions = SettlementDistributions(top_k=5)
+    distributions.update(prices_df, volumes_df)
+    restored = SettlementDistributions.from_json(distributions.to_json())
+    
+    worst = restored.worst('abs_imbalance_volume')
+    assert worst['value'].iloc[0] == pytest.approx(volumes_df['abs_imbalance_volume'].max())
+    assert len(distributions.to_json()) < 100_000
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.helpers import BMRSError
+from utils.streaming_stats import EWMA, RollingWindow, StreamingStatistics
+
+@pytest.fixture
+def sample_series():
+    """Create a price-like series with a few missing values"""
+    rng = np.random.default_rng(1)
+    values = rng.normal(90, 25, 500)
+    values[[10, 11, 200]] = np.nan
+    return pd.Series(values)
+
+@pytest.mark.parametrize('window', [1, 5, 48])
+def test_rolling_matches_pandas(sample_series, window):
+    """Test streaming rolling statistics against pandas rolling"""
+    rolling = RollingWindow(window)
+    results = {'mean': [], 'var': [], 'min': [], 'max': []}
+    for value in sample_series:
+        rolling.update(value)
+        for stat in results:
+            results[stat].append(getattr(rolling, stat))
+    
+    expected = sample_series.rolling(window)
+    for stat, values in results.items():
+        np.testing.assert_allclose(values, getattr(expected, stat)(), rtol=1e-9, atol=1e-9)
+
+def test_ewma_matches_pandas(sample_series):
+    """Test streaming EWMA against pandas ewm"""
+    ewma = EWMA(span=12)
+    values = [ewma.update(value) for value in sample_series]
+    
+    np.testing.assert_allclose(values, sample_series.ewm(span=12).mean(), rtol=1e-9)
+
+def test_streaming_statistics_snapshot():
+    """Test snapshot keys and derived price spread"""
+    stats = StreamingStatistics(windows=(2,), ewm_spans=(4,))
+    stats.update({'system_sell_price': 80, 'system_buy_price': 100, 'net_imbalance_volume': 10})
+    snapshot = stats.update({'system_sell_price': 70, 'system_buy_price': 110, 'net_imbalance_volume': -10})
+    
+    assert snapshot['price_spread_mean_2'] == pytest.approx(30)
+    assert snapshot['net_imbalance_volume_max_2'] == 10
+    assert 'system_buy_price_ewm_4' in snapshot
+
+def test_invalid_window():
+    """Test that a zero window is rejected"""
+    with pytest.raises(BMRSError):
+        RollingWindow(0)
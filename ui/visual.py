@@ -2,34 +2,63 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 from models.analysis_results import AnalysisResult
+from utils.imbalance_cube import ImbalanceCube
+from utils.sketches import SettlementDistributions
+
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
 
 class VisualisationService:
     """Service for creating interactive visualisations of BMRS data"""
     
     def create_analysis_dashboard(self, analysis_result: AnalysisResult,
-                                prices_df: pd.DataFrame, volumes_df: pd.DataFrame) -> go.Figure:
-        """Create a comprehensive dashboard with analysis results and visualisations"""
+                                prices_df: pd.DataFrame, volumes_df: pd.DataFrame,
+                                distributions: SettlementDistributions = None,
+                                cube: ImbalanceCube = None) -> go.Figure:
+        """
+        Create a comprehensive dashboard with analysis results and visualisations.
+        When distributions are given the volume histogram is drawn from the
+        sketch instead of the raw volumes. When a cube is given a row of
+        hour x weekday and hour x month heatmaps is added.
+        """
+        
+        # Subplot layout, with secondary axes on the time series
+        specs = [
+            [{"secondary_y": True}, {"secondary_y": True}],
+            [{"type": "box"}, {"type": "histogram"}],
+            [{"type": "scatter"}, {"type": "bar"}],
+            [{"type": "table"}, {"type": "table"}]
+        ]
+        titles = [
+            'System Prices Over Time',
+            'Imbalance Volumes',
+            'Hourly Volume Statistics',
+            'Volume Distribution',
+            'Price-Volume Correlation',
+            'Daily Statistics',
+            'Data Quality Metrics',
+            'Peak Hours Analysis'
+        ]
+        price_volume = analysis_result.price_volume
+        forecasts = analysis_result.forecasts
+        price_volume_row = forecast_row = cube_row = None
+        if price_volume is not None:
+            specs.append([{"secondary_y": True}, {"type": "bar"}])
+            titles += ['Rolling Price-Volume Correlation and Slope', 'Price-Volume Slope by Settlement Period']
+            price_volume_row = len(specs)
+        if forecasts is not None:
+            specs.append([{"type": "scatter"}, {"type": "table"}])
+            titles += ['Net Imbalance Volume: Forecast vs Actual', 'Forecast Accuracy']
+            forecast_row = len(specs)
+        if cube is not None:
+            specs.append([{"type": "xy"}, {"type": "xy"}])
+            titles += ['Mean Imbalance Cost by Hour and Weekday', 'Mean Absolute Volume by Hour and Month']
+            cube_row = len(specs)
         
-        # Create figure with secondary axis
         fig = make_subplots(
-            rows=4, cols=2,
-            subplot_titles=(
-                'System Prices Over Time',
-                'Imbalance Volumes',
-                'Hourly Volume Statistics',
-                'Volume Distribution',
-                'Price-Volume Correlation',
-                'Daily Statistics',
-                'Data Quality Metrics',
-                'Peak Hours Analysis'
-            ),
-            specs=[
-                [{"secondary_y": True}, {"secondary_y": True}],
-                [{"type": "box"}, {"type": "histogram"}],
-                [{"type": "scatter"}, {"type": "bar"}],
-                [{"type": "table"}, {"type": "table"}]
-            ],
-            vertical_spacing=0.1
+            rows=len(specs), cols=2,
+            subplot_titles=titles,
+            specs=specs,
+            vertical_spacing=0.4 / len(specs)
         )
 
         # 1. System Prices Time Series
@@ -53,6 +82,20 @@ class VisualisationService:
             row=1, col=1
         )
 
+        # Price anomalies flagged by AnomalyDetector.apply
+        if 'is_price_anomaly' in prices_df.columns:
+            price_anomalies = prices_df[prices_df['is_price_anomaly'].fillna(False).astype(bool)]
+            fig.add_trace(
+                go.Scatter(
+                    x=price_anomalies['timestamp'],
+                    y=price_anomalies['system_buy_price'],
+                    mode='markers',
+                    name="Price Anomaly",
+                    marker=dict(color='#d62728', size=9, symbol='x')
+                ),
+                row=1, col=1
+            )
+
         # 2. Imbalance Volumes
         fig.add_trace(
             go.Scatter(
@@ -63,6 +106,20 @@ class VisualisationService:
             ),
             row=1, col=2
         )
+        
+        # Volume anomalies flagged by AnomalyDetector.apply
+        if 'is_volume_anomaly' in volumes_df.columns:
+            volume_anomalies = volumes_df[volumes_df['is_volume_anomaly'].fillna(False).astype(bool)]
+            fig.add_trace(
+                go.Scatter(
+                    x=volume_anomalies['timestamp'],
+                    y=volume_anomalies['net_imbalance_volume'],
+                    mode='markers',
+                    name="Volume Anomaly",
+                    marker=dict(color='#d62728', size=9, symbol='x')
+                ),
+                row=1, col=2
+            )
 
         # 3. Hourly Volume Statistics from analysis_result
         hourly_stats_df = analysis_result.hourly_stats.reset_index()
@@ -77,15 +134,27 @@ class VisualisationService:
         )
 
         # 4. Volume Distribution
-        fig.add_trace(
-            go.Histogram(
-                x=volumes_df['net_imbalance_volume'],
-                name="Volume Distribution",
-                nbinsx=30,
-                histnorm='probability'
-            ),
-            row=2, col=2
-        )
+        if distributions is not None:
+            probabilities, edges = distributions.sketches['net_imbalance_volume'].histogram(bins=30)
+            fig.add_trace(
+                go.Bar(
+                    x=(edges[:-1] + edges[1:]) / 2,
+                    y=probabilities,
+                    width=edges[1] - edges[0] if len(edges) > 1 else None,
+                    name="Volume Distribution"
+                ),
+                row=2, col=2
+            )
+        else:
+            fig.add_trace(
+                go.Histogram(
+                    x=volumes_df['net_imbalance_volume'],
+                    name="Volume Distribution",
+                    nbinsx=30,
+                    histnorm='probability'
+                ),
+                row=2, col=2
+            )
 
         # 5. Price-Volume Correlation
         fig.add_trace(
@@ -168,9 +237,87 @@ class VisualisationService:
             row=4, col=2
         )
 
+        # 9. Rolling price-volume relationship
+        if price_volume_row is not None:
+            window = max(int(col.rsplit('_', 1)[1]) for col in price_volume.columns if col.startswith('slope_'))
+            fig.add_trace(
+                go.Scatter(
+                    x=price_volume['timestamp'],
+                    y=price_volume[f'correlation_{window}'],
+                    name=f"Correlation ({window} periods)",
+                    line=dict(color='#9467bd')
+                ),
+                row=price_volume_row, col=1
+            )
+            fig.add_trace(
+                go.Scatter(
+                    x=price_volume['timestamp'],
+                    y=price_volume[f'slope_{window}'],
+                    name=f"Slope £/MWh per MWh ({window} periods)",
+                    line=dict(color='#8c564b')
+                ),
+                row=price_volume_row, col=1, secondary_y=True
+            )
+            by_period = analysis_result.price_volume_by_period
+            if by_period is not None:
+                fig.add_trace(
+                    go.Bar(
+                        x=by_period.index,
+                        y=by_period['slope'],
+                        name='Slope by Settlement Period'
+                    ),
+                    row=price_volume_row, col=2
+                )
+
+        # 10. One-day-ahead forecasts alongside actuals
+        if forecast_row is not None:
+            forecast_df = forecasts.to_frame('net_imbalance_volume')
+            times = pd.to_datetime(forecast_df['date']) + pd.to_timedelta(
+                (forecast_df['settlement_period'] - 1) * 30, unit='min'
+            )
+            fig.add_trace(
+                go.Scatter(x=times, y=forecast_df['actual'], name='Actual NIV', line=dict(color='#2ca02c')),
+                row=forecast_row, col=1
+            )
+            for model, color in zip(forecasts.forecasts['net_imbalance_volume'], ['#7f7f7f', '#17becf', '#e377c2']):
+                fig.add_trace(
+                    go.Scatter(x=times, y=forecast_df[model], name=f"Forecast ({model})",
+                               line=dict(color=color, dash='dot')),
+                    row=forecast_row, col=1
+                )
+            accuracy = forecasts.metrics().reset_index().round(3)
+            fig.add_trace(
+                go.Table(
+                    header=dict(
+                        values=['Target', 'Model', 'MAE', 'RMSE', 'Skill'],
+                        fill_color='paleturquoise',
+                        align='left'
+                    ),
+                    cells=dict(
+                        values=accuracy[['target', 'model', 'mae', 'rmse', 'skill']].T.values,
+                        fill_color='lavender',
+                        align='left'
+                    )
+                ),
+                row=forecast_row, col=2
+            )
+
+        # 11. Heatmaps rolled up from the imbalance cube
+        if cube_row is not None:
+            cost = cube.heatmap('hour', 'weekday', 'imbalance_cost', 'mean')
+            fig.add_trace(
+                self.create_cube_heatmap(cost, name='Mean Imbalance Cost', colorbar_x=0.45),
+                row=cube_row, col=1
+            )
+            volume = cube.heatmap('hour', 'month', 'abs_imbalance_volume', 'mean')
+            fig.add_trace(
+                self.create_cube_heatmap(volume, name='Mean Absolute Volume'),
+                row=cube_row, col=2
+            )
+
         # Update layout
         fig.update_layout(
-            height=1600,
+            height=400 * len(specs),
             width=1600,
             title_text="BMRS Analysis Dashboard",
             showlegend=True,
@@ -179,10 +326,27 @@ class VisualisationService:
 
         return fig
 
+    @staticmethod
+    def create_cube_heatmap(heatmap: pd.DataFrame, name: str = '', colorbar_x: float = None) -> go.Heatmap:
+        """Heatmap trace of a two-dimensional ImbalanceCube.heatmap roll-up"""
+        columns = heatmap.columns
+        if columns.name == 'weekday':
+            columns = [WEEKDAYS[day] for day in columns]
+        return go.Heatmap(
+            z=heatmap.to_numpy(),
+            x=[str(col) for col in columns],
+            y=[str(row) for row in heatmap.index],
+            name=name,
+            colorscale='RdBu_r' if (heatmap.min().min() < 0) else 'Viridis',
+            colorbar=dict(x=colorbar_x) if colorbar_x is not None else None
+        )
+
     def save_analysis_dashboard(self, analysis_result: AnalysisResult,
                               prices_df: pd.DataFrame, volumes_df: pd.DataFrame,
-                              filename: str = "bmrs_dashboard.html"):
+                              filename: str = "bmrs_dashboard.html",
+                              distributions: SettlementDistributions = None,
+                              cube: ImbalanceCube = None):
         """Save the analysis dashboard to an HTML file"""
-        dashboard = self.create_analysis_dashboard(analysis_result, prices_df, volumes_df)
+        dashboard = self.create_analysis_dashboard(analysis_result, prices_df, volumes_df, distributions, cube)
         dashboard.write_html(filename, full_html=True, include_plotlyjs=True)
         return filename
\ No newline at end of file
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+# Statistics kept per group so that partial results can be merged exactly
+PARTIAL_STATS = ['count', 'sum', 'm2', 'min', 'max']
+
+def partial_aggregates(df, keys, columns):
+    """
+    Calculate mergeable partial aggregates (count, sum, M2, min, max)
+    of the given columns grouped by keys
+    """
+    grouped = df.groupby(keys)[columns]
+    count = grouped.count()
+
+    partials = pd.concat({
+        'count': count,
+        'sum': grouped.sum(),
+        'm2': (grouped.var(ddof=0) * count).fillna(0.0),
+        'min': grouped.min(),
+        'max': grouped.max()
+    }, axis=1)
+
+    # Order columns as (column, statistic) like a pandas agg result
+    return partials.swaplevel(axis=1)[[(col, stat) for col in columns for stat in PARTIAL_STATS]]
+
+def merge_partial_aggregates(partials):
+    """
+    Merge partial aggregates computed over disjoint subsets of the data
+    """
+    combined = pd.concat(partials)
+    columns = combined.columns.get_level_values(0).unique()
+    keys = list(range(combined.index.nlevels))
+
+    merged = {}
+    for col in columns:
+        count = combined[(col, 'count')]
+        sums = combined[(col, 'sum')]
+        grouped_count = count.groupby(level=keys).sum()
+        grouped_sum = sums.groupby(level=keys).sum()
+
+        # Chan et al. parallel variance: M2 = sum(M2_i) + sum(n_i * (mean_i - mean)^2)
+        mean = (grouped_sum / grouped_count).reindex(combined.index)
+        part_mean = sums / count.where(count > 0)
+        shift = (count * (part_mean - mean.values) ** 2).fillna(0.0)
+
+        merged[(col, 'count')] = grouped_count
+        merged[(col, 'sum')] = grouped_sum
+        merged[(col, 'm2')] = (combined[(col, 'm2')] + shift).groupby(level=keys).sum()
+        merged[(col, 'min')] = combined[(col, 'min')].groupby(level=keys).min()
+        merged[(col, 'max')] = combined[(col, 'max')].groupby(level=keys).max()
+
+    return pd.DataFrame(merged)
+
+def finalise_aggregates(partials, stats):
+    """
+    Turn partial aggregates into final statistics
+
+    stats maps each column to the list of statistics to produce, using the
+    pandas names 'count', 'sum', 'mean', 'std', 'var', 'min' and 'max'.
+    """
+    result = {}
+    for col, names in stats.items():
+        count = partials[(col, 'count')]
+        for name in names:
+            if name == 'mean':
+                value = partials[(col, 'sum')] / count.where(count > 0)
+            elif name in ('std', 'var'):
+                value = partials[(col, 'm2')] / (count - 1).where(count > 1)
+                if name == 'std':
+                    value = np.sqrt(value)
+            else:
+                value = partials[(col, name)]
+            result[(col, name)] = value
+
+    return pd.DataFrame(result)
@@ -0,0 +1,159 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import pandas as pd
+from utils.gap_engine import GapEngine
+from utils.helpers import BMRSError
+
+# Scale factor making the MAD a consistent estimator of the standard deviation
+MAD_SCALE = 1.4826
+
+# Flag columns added by AnomalyDetector.apply to each processed frame
+PRICE_FLAGS = ['is_price_spike', 'is_stale_price', 'is_price_anomaly']
+VOLUME_FLAGS = ['is_niv_outlier', 'is_stale_volume', 'is_volume_anomaly']
+
+class AnomalyDetector:
+    """
+    Vectorised detection of price spikes, NIV outliers and stale values
+    using rolling and per-settlement-period robust baselines
+    """
+
+    @staticmethod
+    def rolling_robust_zscore(series, window=336, stride=48):
+        """
+        Robust z-score of each value against the median and median absolute
+        deviation (MAD) of the `window` periods before it.
+
+        The baseline is refreshed every `stride` periods (daily by default),
+        so all windows are reduced in one batched median instead of one
+        rolling median per period.
+        """
+        values = series.to_numpy(dtype=float)
+        n = len(values)
+        if n == 0:
+            return pd.Series(dtype=float, index=series.index)
+
+        # windows[k] holds the `window` values before block start k * stride
+        padded = np.concatenate((np.full(window, np.nan), values))
+        windows = sliding_window_view(padded, window)[np.arange(0, n, stride)]
+
+        median, valid = AnomalyDetector._row_nanmedian(windows)
+        mad, _ = AnomalyDetector._row_nanmedian(np.abs(windows - median[:, None]))
+
+        enough = valid >= max(window // 4, 3)
+        scale = np.where(enough & (mad > 0), MAD_SCALE * mad, np.nan)
+
+        median = np.repeat(median, stride)[:n]
+        scale = np.repeat(scale, stride)[:n]
+        return pd.Series((values - median) / scale, index=series.index)
+
+    @staticmethod
+    def _row_nanmedian(matrix):
+        """
+        Median of each row ignoring NaN, using one sort of the whole matrix
+        (NaNs sort last). Returns (medians, number of valid values per row).
+        """
+        ordered = np.sort(matrix, axis=1)
+        valid = (~np.isnan(matrix)).sum(axis=1)
+        rows = np.arange(len(matrix))
+        low = ordered[rows, np.maximum((valid - 1) // 2, 0)]
+        high = ordered[rows, valid // 2 - (valid == 0)]
+        median = np.where(valid > 0, (low + high) / 2, np.nan)
+        return median, valid
+
+    @staticmethod
+    def seasonal_robust_zscore(series, timestamps):
+        """
+        Robust z-score of each value against the median and MAD of all
+        values in the same half-hour slot of the day
+        """
+        slot = (timestamps.dt.hour * 2 + timestamps.dt.minute // 30).to_numpy()
+        grouped = series.groupby(slot)
+        median = grouped.transform('median')
+        mad = (series - median).abs().groupby(slot).transform('median')
+        return (series - median) / (MAD_SCALE * mad.where(mad > 0))
+
+    @staticmethod
+    def stale_mask(series, min_run=8):
+        """
+        Flag values that repeat unchanged for at least `min_run` consecutive periods
+        """
+        values = series.to_numpy(dtype=float)
+        repeated = np.zeros(len(values), dtype=bool)
+        repeated[1:] = values[1:] == values[:-1]
+
+        starts, lengths = GapEngine.find_runs(repeated)
+        long_runs = lengths >= min_run - 1
+        # A run of n repeats covers n + 1 values, starting one before the first repeat
+        change = np.zeros(len(values) + 1, dtype=np.int64)
+        np.add.at(change, starts[long_runs] - 1, 1)
+        np.add.at(change, starts[long_runs] + lengths[long_runs], -1)
+        return np.cumsum(change[:-1]) > 0
+
+    @staticmethod
+    def detect(prices_df, volumes_df, window=336, threshold=6.0, min_stale_run=8):
+        """
+        Detect anomalies in processed prices and volumes.
+
+        Returns a DataFrame aligned to the merged timestamps with one
+        boolean column per check plus combined is_price_anomaly and
+        is_volume_anomaly flags.
+        """
+        try:
+            df = pd.merge(
+                prices_df[['timestamp', 'system_sell_price', 'system_buy_price']],
+                volumes_df[['timestamp', 'net_imbalance_volume']],
+                on='timestamp',
+                how='outer'
+            ).sort_values('timestamp', ignore_index=True)
+
+            flags = pd.DataFrame({'timestamp': df['timestamp']})
+            spikes = np.zeros(len(df), dtype=bool)
+            stale_price = np.zeros(len(df), dtype=bool)
+            for col in ['system_sell_price', 'system_buy_price']:
+                rolling = AnomalyDetector.rolling_robust_zscore(df[col], window)
+                seasonal = AnomalyDetector.seasonal_robust_zscore(df[col], df['timestamp'])
+                spikes |= (rolling.abs() > threshold).to_numpy() & (seasonal.abs() > threshold / 2).to_numpy()
+                stale_price |= AnomalyDetector.stale_mask(df[col], min_stale_run)
+
+            niv = df['net_imbalance_volume']
+            niv_rolling = AnomalyDetector.rolling_robust_zscore(niv, window)
+            niv_seasonal = AnomalyDetector.seasonal_robust_zscore(niv, df['timestamp'])
+
+            flags['is_price_spike'] = spikes
+            flags['is_stale_price'] = stale_price
+            flags['is_niv_outlier'] = (
+                (niv_rolling.abs() > threshold).to_numpy() & (niv_seasonal.abs() > threshold / 2).to_numpy()
+            )
+            flags['is_stale_volume'] = AnomalyDetector.stale_mask(niv, min_stale_run)
+            flags['is_price_anomaly'] = flags['is_price_spike'] | flags['is_stale_price']
+            flags['is_volume_anomaly'] = flags['is_niv_outlier'] | flags['is_stale_volume']
+
+            return flags
+
+        except Exception as e:
+            raise BMRSError(f"Error detecting anomalies: {str(e)}")
+
+    @staticmethod
+    def apply(prices_df, volumes_df, **kwargs):
+        """
+        Add anomaly flags to copies of the processed frames and mark
+        otherwise good periods as 'Anomaly' in their quality flags. Flags
+        already on the frames, such as frames read back from a store, are
+        replaced.
+        """
+        flags = AnomalyDetector.detect(prices_df, volumes_df, **kwargs)
+        prices_df = prices_df.drop(columns=PRICE_FLAGS, errors='ignore').merge(
+            flags[['timestamp'] + PRICE_FLAGS], on='timestamp', how='left'
+        )
+        volumes_df = volumes_df.drop(columns=VOLUME_FLAGS, errors='ignore').merge(
+            flags[['timestamp'] + VOLUME_FLAGS], on='timestamp', how='left'
+        )
+
+        if 'price_quality' in prices_df.columns:
+            prices_df.loc[prices_df['is_price_anomaly'] & (prices_df['price_quality'] == 'Good'),
+                          'price_quality'] = 'Anomaly'
+        if 'volume_quality' in volumes_df.columns:
+            volumes_df.loc[volumes_df['is_volume_anomaly'] & (volumes_df['volume_quality'] == 'Good'),
+                           'volume_quality'] = 'Anomaly'
+
+        return prices_df, volumes_df
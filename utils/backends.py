@@ -0,0 +1,197 @@
+import os
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+from utils.helpers import BMRSError
+from utils.period_matrix import HOURS_PER_DAY, PeriodMatrix
+
+# Optional dependency, imported by the first PolarsBackend
+pl = None
+
+# A derived column: its input columns and a function of their arrays
+Derived = Dict[str, Tuple[List[str], Callable[..., np.ndarray]]]
+
+def imbalance_cost(net_imbalance_volume, system_sell_price, system_buy_price) -> np.ndarray:
+    """Cost of each settlement period: long volume at SSP, short volume at SBP"""
+    return np.where(
+        net_imbalance_volume >= 0,
+        net_imbalance_volume * system_sell_price,
+        net_imbalance_volume * system_buy_price
+    )
+
+def _split(agg: Dict[str, List[str]], derived: Optional[Derived]) -> List[str]:
+    """Frame columns needed for agg, including the inputs of derived columns"""
+    derived = derived or {}
+    columns = [column for column in agg if column not in derived]
+    for inputs, _ in derived.values():
+        columns += [column for column in inputs if column not in columns]
+    return columns
+
+class PandasBackend:
+    """
+    Default engine: frames laid out as a numpy PeriodMatrix (days x
+    settlement periods), statistics as array reductions.
+    """
+    name = 'pandas'
+
+    def hourly_stats(self, frames: Sequence[pd.DataFrame], agg: Dict[str, List[str]]) -> pd.DataFrame:
+        """Statistics by clock hour over the rows shared by all frames"""
+        return PeriodMatrix.from_frames(*frames, columns=list(agg)).hourly_stats(agg)
+
+    def daily_stats(self, frames: Sequence[pd.DataFrame], agg: Dict[str, List[str]],
+                    derived: Optional[Derived] = None) -> pd.DataFrame:
+        """Statistics by date over the rows shared by all frames"""
+        matrix = PeriodMatrix.from_frames(*frames, columns=_split(agg, derived))
+        for column, (inputs, func) in (derived or {}).items():
+            matrix.values[column] = func(*(matrix.values[c] for c in inputs))
+        return matrix.daily_stats(agg)
+
+    def hourly_totals(self, frames: Sequence[pd.DataFrame], column: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Dates from the first to the last day and the (days x 24) sums of
+        a column by day and clock hour; NaN where an hour has no rows
+        """
+        matrix = PeriodMatrix.from_frames(*frames, columns=[column])
+        return matrix.dates, matrix.hourly_totals(column)
+
+class PolarsBackend:
+    """
+    Multithreaded Polars/Arrow engine. Frames are converted to Arrow,
+    inner joined on timestamp and aggregated with Polars group_by; results
+    are returned as the same pandas frames as the default engine.
+    """
+    name = 'polars'
+
+    def __init__(self):
+        global pl
+        if pl is None:
+            try:
+                import polars
+            except ImportError:
+                raise BMRSError("The polars backend requires the polars package")
+            pl = polars
+
+    @staticmethod
+    def _join(frames: Sequence[pd.DataFrame], columns: List[str]) -> 'pl.DataFrame':
+        """Inner join of the frames on timestamp, each column from the first frame holding it"""
+        remaining = list(columns)
+        tables, keys = [], []
+        for df in frames:
+            own = [column for column in remaining if column in df.columns]
+            remaining = [column for column in remaining if column not in own]
+            table = pl.from_pandas(df[['timestamp'] + own])
+            ns = df['timestamp'].array.asi8
+            if not (np.diff(ns) > 0).all():
+                # One row per settlement period, keeping the last like PeriodMatrix
+                table = table.unique('timestamp', keep='last', maintain_order=True).sort('timestamp')
+                ns = None
+            # Processed frames are sorted, so the join can merge instead of hash
+            tables.append(table.with_columns(pl.col('timestamp').set_sorted()))
+            keys.append(ns)
+        if remaining:
+            raise BMRSError(f"Column not found: {remaining[0]}")
+
+        joined = tables[0]
+        for ns, table in zip(keys[1:], tables[1:]):
+            if ns is not None and keys[0] is not None and np.array_equal(ns, keys[0]):
+                joined = pl.concat([joined, table.drop('timestamp')], how='horizontal')
+            else:
+                joined = joined.join(table, on='timestamp', how='inner')
+        return joined
+
+    @staticmethod
+    def _aggregate(table: 'pl.DataFrame', keys: List['pl.Expr'], agg: Dict[str, List[str]]) -> 'pl.DataFrame':
+        exprs = [
+            getattr(pl.col(column), stat)().alias(f"{column}\x00{stat}")
+            for column, stats in agg.items() for stat in stats
+        ]
+        return table.group_by(keys).agg(exprs).sort([key.meta.output_name() for key in keys])
+
+    @staticmethod
+    def _to_pandas(result: 'pl.DataFrame', agg: Dict[str, List[str]], index: pd.Index) -> pd.DataFrame:
+        data = {}
+        for column, stats in agg.items():
+            for stat in stats:
+                values = result[f"{column}\x00{stat}"].to_numpy()
+                data[(column, stat)] = values.astype(np.int64 if stat == 'count' else float)
+        return pd.DataFrame(data, index=index)
+
+    def hourly_stats(self, frames: Sequence[pd.DataFrame], agg: Dict[str, List[str]]) -> pd.DataFrame:
+        """Statistics by clock hour over the rows shared by all frames"""
+        try:
+            result = self._aggregate(
+                self._join(frames, list(agg)), [pl.col('timestamp').dt.hour().alias('hour')], agg
+            )
+            # int32, the dtype of Series.dt.hour
+            index = pd.Index(result['hour'].to_numpy().astype(np.int32), name='hour')
+            return self._to_pandas(result, agg, index)
+        except BMRSError:
+            raise
+        except Exception as e:
+            raise BMRSError(f"Error calculating hourly statistics: {str(e)}")
+
+    def daily_stats(self, frames: Sequence[pd.DataFrame], agg: Dict[str, List[str]],
+                    derived: Optional[Derived] = None) -> pd.DataFrame:
+        """Statistics by date over the rows shared by all frames"""
+        try:
+            table = self._join(frames, _split(agg, derived))
+            for column, (inputs, func) in (derived or {}).items():
+                arrays = [table[c].to_numpy() for c in inputs]
+                table = table.with_columns(pl.Series(column, func(*arrays)).fill_nan(None))
+            result = self._aggregate(table, [pl.col('timestamp').dt.date().alias('date')], agg)
+            index = pd.Index(np.array(result['date'].to_list(), dtype=object), name='date')
+            return self._to_pandas(result, agg, index)
+        except BMRSError:
+            raise
+        except Exception as e:
+            raise BMRSError(f"Error calculating daily statistics: {str(e)}")
+
+    def hourly_totals(self, frames: Sequence[pd.DataFrame], column: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Dates from the first to the last day and the (days x 24) sums of
+        a column by day and clock hour; NaN where an hour has no rows
+        """
+        try:
+            # One integer key per day and hour groups faster than two keys
+            timestamps = pl.col('timestamp')
+            cell = timestamps.dt.date().cast(pl.Int64) * HOURS_PER_DAY + timestamps.dt.hour().cast(pl.Int64)
+            result = self._join(frames, [column]).group_by(cell.alias('cell')).agg(pl.col(column).sum())
+            if result.is_empty():
+                return np.array([], dtype=object), np.empty((0, HOURS_PER_DAY))
+            days, hours = np.divmod(result['cell'].to_numpy(), HOURS_PER_DAY)
+            first_day = int(days.min())
+            n_days = int(days.max()) - first_day + 1
+
+            totals = np.full((n_days, HOURS_PER_DAY), np.nan)
+            totals[days - first_day, hours] = result[column].to_numpy()
+            dates = pd.date_range(pd.Timestamp(first_day, unit='D'), periods=n_days, freq='D').date
+            return dates, totals
+        except BMRSError:
+            raise
+        except Exception as e:
+            raise BMRSError(f"Error calculating hourly totals: {str(e)}")
+
+BACKENDS = {'pandas': PandasBackend, 'polars': PolarsBackend}
+
+_default_backend = os.environ.get('BMRS_BACKEND', 'pandas')
+
+Backend = Union[PandasBackend, PolarsBackend]
+
+def set_default_backend(name: str):
+    """Set the engine used when analyses are called without a backend"""
+    global _default_backend
+    if name not in BACKENDS:
+        raise BMRSError(f"Unknown backend: {name}")
+    _default_backend = name
+
+def get_backend(backend: Union[str, Backend, None] = None) -> Backend:
+    """
+    Resolve a backend name or instance; None gives the default engine
+    (set_default_backend or BMRS_BACKEND, else pandas)
+    """
+    backend = backend or _default_backend
+    if not isinstance(backend, str):
+        return backend
+    if backend not in BACKENDS:
+        raise BMRSError(f"Unknown backend: {backend}")
+    return BACKENDS[backend]()
@@ -1,14 +1,16 @@
 import pandas as pd
 import numpy as np
+from utils.gap_engine import GapEngine
 from utils.helpers import BMRSError
 
 class BMRSDataProcessor:
     """Class for processing and cleaning BMRS data"""
     
     @staticmethod
-    def clean_and_process_data(df):
+    def clean_and_process_data(df, interpolation_limit=2):
         """
-        Clean and process raw BMRS data
+        Clean and process raw BMRS data. Gaps of up to interpolation_limit
+        consecutive periods are linearly interpolated.
         """
         
         try:
@@ -18,33 +20,15 @@ class BMRSDataProcessor:
             # Convert columns to numeric, replacing any non-numeric values with NaN
             numeric_columns = ['systemSellPrice', 'systemBuyPrice', 'netImbalanceVolume']
             for col in numeric_columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+                df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
             
-            # Sort by timestamp
-            df = df.sort_values('timestamp')
+            # Align to the half-hourly grid and fill short gaps in the numeric series only
+            gaps = GapEngine.fill_gaps(df, numeric_columns, limit=interpolation_limit)
+            df = gaps.df
             
-            # Check for missing periods
-            expected_periods = pd.date_range(
-                start=df['timestamp'].min(),
-                end=df['timestamp'].max(),
-                freq='30min'
-            )
-            
-            # Create a template DataFrame with all expected periods
-            template_df = pd.DataFrame({'timestamp': expected_periods})
-            
-            # Merge with actual data
-            df = pd.merge(template_df, df, on='timestamp', how='left')
-            
-            # Store interpolation mask before interpolating
-            is_interpolated_sell = df['systemSellPrice'].isna()
-            is_interpolated_buy = df['systemBuyPrice'].isna()
-            
-            # Convert to float type before interpolation
-            df = df.astype({col: 'float64' for col in numeric_columns if col in df.columns})
-            
-            # Interpolate missing values (limited to 2 consecutive periods)
-            df = df.interpolate(method='linear', limit=2)
+            # Masks of the values that were actually interpolated
+            is_interpolated_sell = gaps.fill_masks['systemSellPrice']
+            is_interpolated_buy = gaps.fill_masks['systemBuyPrice']
             
             # Create prices DataFrame
             prices_df = pd.DataFrame({
@@ -60,7 +44,8 @@ class BMRSDataProcessor:
             volumes_df = pd.DataFrame({
                 'timestamp': df['timestamp'],
                 'net_imbalance_volume': df['netImbalanceVolume'],
-                'abs_imbalance_volume': df['netImbalanceVolume'].abs()
+                'abs_imbalance_volume': df['netImbalanceVolume'].abs(),
+                'is_interpolated': gaps.fill_masks['netImbalanceVolume']
             })
             
             # Add quality flags
@@ -94,7 +79,7 @@ class BMRSDataProcessor:
         
         conditions = [
             df['net_imbalance_volume'].isna(),
-            df['net_imbalance_volume'].isna() & df['net_imbalance_volume'].notna()  # Was interpolated
+            df['is_interpolated']
         ]
         choices = ['Missing', 'Interpolated']
         return pd.Series(np.select(conditions, choices, default='Good'))
@@ -105,17 +90,20 @@ class BMRSDataProcessor:
         Generate a summary of data quality
         """
         
+        price_counts = prices_df['price_quality'].value_counts()
+        volume_counts = volumes_df['volume_quality'].value_counts()
+        
         summary = {
             'prices': {
                 'total_periods': len(prices_df),
-                'missing_periods': (prices_df['price_quality'] == 'Missing').sum(),
-                'interpolated_periods': (prices_df['price_quality'] == 'Interpolated').sum(),
-                'anomalies': (prices_df['price_quality'] == 'Anomaly').sum()
+                'missing_periods': price_counts.get('Missing', 0),
+                'interpolated_periods': price_counts.get('Interpolated', 0),
+                'anomalies': price_counts.get('Anomaly', 0)
             },
             'volumes': {
                 'total_periods': len(volumes_df),
-                'missing_periods': (volumes_df['volume_quality'] == 'Missing').sum(),
-                'interpolated_periods': (volumes_df['volume_quality'] == 'Interpolated').sum()
+                'missing_periods': volume_counts.get('Missing', 0),
+                'interpolated_periods': volume_counts.get('Interpolated', 0)
             }
         }
         
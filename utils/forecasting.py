@@ -0,0 +1,261 @@
+from dataclasses import dataclass, field
+from datetime import timedelta
+import logging
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from utils.helpers import BMRSError
+
+PERIODS_PER_DAY = 48
+
+MODELS = ['seasonal_naive', 'exp_smoothing', 'ridge']
+
+# Processed frame holding each forecastable column
+TARGETS = {
+    'net_imbalance_volume': 'volumes',
+    'system_buy_price': 'prices',
+    'system_sell_price': 'prices'
+}
+
+# Ridge features: intercept, lags of 1, 2 and 7 days, mean of the last 7 days, weekend flag
+RIDGE_FEATURES = ['intercept', 'lag_1', 'lag_2', 'lag_7', 'mean_7', 'weekend']
+
+logger = logging.getLogger(__name__)
+
+def _local_dates(df: pd.DataFrame):
+    """UK local timestamps of a processed frame"""
+    timestamps = df['timestamp']
+    if timestamps.dt.tz is None:
+        timestamps = timestamps.dt.tz_localize('UTC')
+    return timestamps.dt.tz_convert('Europe/London')
+
+def day_period_matrix(df: pd.DataFrame, column: str, start=None, n_days: Optional[int] = None):
+    """
+    Reshape a processed frame into a (days x 48) matrix of one column by
+    UK local date and half-hour, from `start` (the first date by default)
+    for n_days consecutive days. Returns (dates, matrix); missing periods are NaN.
+    The repeated hour of the 50-period clock-change day keeps its later periods.
+    """
+    df = df.sort_values('timestamp')
+    local = _local_dates(df)
+    days = local.dt.tz_localize(None).dt.normalize()
+    start = pd.Timestamp(start) if start is not None else days.min()
+    n_days = n_days if n_days is not None else (days.max() - start).days + 1
+
+    day_codes = (days - start).dt.days.to_numpy()
+    slots = (local.dt.hour * 2 + local.dt.minute // 30).to_numpy()
+    inside = (day_codes >= 0) & (day_codes < n_days)
+    cells = day_codes[inside] * PERIODS_PER_DAY + slots[inside]
+    duplicates = len(cells) - len(np.unique(cells))
+    if duplicates:
+        logger.warning(f"{duplicates} rows share a local half-hour after a clock change; keeping the last")
+
+    matrix = np.full((n_days, PERIODS_PER_DAY), np.nan)
+    matrix[day_codes[inside], slots[inside]] = df[column].to_numpy(dtype=float)[inside]
+    return list(pd.date_range(start, periods=n_days, freq='D').date), matrix
+
+@dataclass
+class ForecastResult:
+    """
+    One-day-ahead forecasts of each target and model for consecutive
+    days, each made only from the days before it, with the actuals
+    (NaN for the day after the data)
+    """
+    dates: List
+    actuals: Dict[str, np.ndarray]
+    forecasts: Dict[str, Dict[str, np.ndarray]] = field(default_factory=dict)
+
+    def metrics(self) -> pd.DataFrame:
+        """MAE, RMSE and MAE skill against seasonal naive per target and model"""
+        rows = []
+        for target, models in self.forecasts.items():
+            actual = self.actuals[target]
+            naive_mae = np.nanmean(np.abs(models['seasonal_naive'] - actual))
+            for model, forecast in models.items():
+                error = forecast - actual
+                mae = np.nanmean(np.abs(error)) if np.isfinite(error).any() else np.nan
+                rows.append({
+                    'target': target,
+                    'model': model,
+                    'mae': mae,
+                    'rmse': np.sqrt(np.nanmean(error ** 2)) if np.isfinite(error).any() else np.nan,
+                    'skill': 1 - mae / naive_mae if naive_mae else np.nan
+                })
+        return pd.DataFrame(rows).set_index(['target', 'model'])
+
+    def to_frame(self, target: str) -> pd.DataFrame:
+        """Long frame of date, settlement period, actual and one column per model"""
+        n = len(self.dates)
+        frame = pd.DataFrame({
+            'date': np.repeat(self.dates, PERIODS_PER_DAY),
+            'settlement_period': np.tile(np.arange(1, PERIODS_PER_DAY + 1), n),
+            'actual': self.actuals[target].ravel()
+        })
+        for model, forecast in self.forecasts[target].items():
+            frame[model] = forecast.ravel()
+        return frame
+
+    def format_day(self, date) -> str:
+        """Forecast against actual summary of one day for the daily report"""
+        if date not in self.dates:
+            return ''
+        i = self.dates.index(date)
+        lines = [f"Forecast vs Actual\n{'=' * 50}\n"]
+        for target, models in self.forecasts.items():
+            is_volume = TARGETS[target] == 'volumes'
+            reduce = np.nansum if is_volume else np.nanmean
+            unit = 'MWh' if is_volume else '£/MWh'
+            actual = self.actuals[target][i]
+            label = target.replace('_', ' ').title()
+            total = f"{reduce(actual):,.2f} {unit}" if np.isfinite(actual).any() else 'n/a'
+            lines.append(f"{label} ({'total' if is_volume else 'mean'}): actual {total}\n")
+            for model, forecast in models.items():
+                mae = np.nanmean(np.abs(forecast[i] - actual)) if np.isfinite(forecast[i] - actual).any() else np.nan
+                value = f"{reduce(forecast[i]):,.2f}" if np.isfinite(forecast[i]).any() else 'n/a'
+                lines.append(f"  {model}: {value} {unit} (MAE {mae:,.2f})\n")
+        return ''.join(lines)
+
+class BaselineForecaster:
+    """
+    Per-settlement-period forecasting baselines fitted for all 48 periods
+    at once on (days x 48) matrices:
+
+    - seasonal naive: the same period `season` days earlier
+    - exponential smoothing: a per-period level updated once a day
+    - ridge: lags of 1, 2 and 7 days, the 7-day mean and a weekend flag
+
+    backtest produces rolling-origin one-day-ahead forecasts; ridge is
+    refitted at every origin from cumulative normal equations, so each
+    refit costs one batched (48 x 6 x 6) solve.
+    """
+
+    def __init__(self, season: int = 7, alpha: float = 0.3, ridge_lambda: float = 0.1,
+                 min_train_days: int = 14):
+        self.season = season
+        self.alpha = alpha
+        self.ridge_lambda = ridge_lambda
+        self.min_train_days = min_train_days
+
+    def seasonal_naive(self, matrix: np.ndarray) -> np.ndarray:
+        """Forecast of every day and the day after (days + 1 rows)"""
+        padded = np.vstack([matrix, np.full((1, PERIODS_PER_DAY), np.nan)])
+        forecast = np.full_like(padded, np.nan)
+        forecast[self.season:] = padded[:-self.season]
+        # Fall back to the previous day where the seasonal value is missing
+        previous = np.full_like(padded, np.nan)
+        previous[1:] = padded[:-1]
+        return np.where(np.isnan(forecast), previous, forecast)
+
+    def exp_smoothing(self, matrix: np.ndarray) -> np.ndarray:
+        """Level before each day and after the last day (days + 1 rows)"""
+        forecast = np.full((len(matrix) + 1, PERIODS_PER_DAY), np.nan)
+        level = np.full(PERIODS_PER_DAY, np.nan)
+        for d, values in enumerate(matrix):
+            forecast[d] = level
+            level = np.where(np.isnan(level), values,
+                             np.where(np.isnan(values), level, self.alpha * values + (1 - self.alpha) * level))
+        forecast[len(matrix)] = level
+        return forecast
+
+    @staticmethod
+    def ridge_features(matrix: np.ndarray, dates: List) -> np.ndarray:
+        """Feature array of shape (days + 1, 48, features) for predicting each day"""
+        padded = np.vstack([matrix, np.full((1, PERIODS_PER_DAY), np.nan)])
+        n = len(padded)
+
+        def lag(k):
+            lagged = np.full_like(padded, np.nan)
+            lagged[k:] = padded[:-k]
+            return lagged
+
+        lags = np.stack([lag(k) for k in range(1, 8)])
+        all_dates = pd.DatetimeIndex(list(dates) + [pd.Timestamp(dates[-1]) + pd.Timedelta(days=1)])
+        weekend = np.broadcast_to((all_dates.weekday >= 5).astype(float)[:, None], (n, PERIODS_PER_DAY))
+        return np.stack([
+            np.ones((n, PERIODS_PER_DAY)), lags[0], lags[1], lags[6], lags.mean(axis=0), weekend
+        ], axis=2)
+
+    def ridge(self, matrix: np.ndarray, dates: List, origins: np.ndarray) -> np.ndarray:
+        """
+        Ridge forecasts of the given days (indices into days + 1 rows), each
+        fitted on all earlier days. Rows before min_train_days are NaN.
+        """
+        features = self.ridge_features(matrix, dates)
+        target = np.vstack([matrix, np.full((1, PERIODS_PER_DAY), np.nan)])
+        usable = np.isfinite(features).all(axis=2) & np.isfinite(target)
+        x = np.where(usable[..., None], features, 0.0)
+        y = np.where(usable, target, 0.0)
+
+        k = features.shape[2]
+        gram = np.zeros((PERIODS_PER_DAY, k, k))
+        moment = np.zeros((PERIODS_PER_DAY, k))
+        penalty = np.zeros(k)
+        penalty[1:] = self.ridge_lambda
+
+        counts = np.zeros(PERIODS_PER_DAY, dtype=np.int64)
+        forecast = np.full((len(origins), PERIODS_PER_DAY), np.nan)
+        fitted_to = 0
+        for i, origin in enumerate(origins):
+            # Add the days between the previous origin and this one to the normal equations
+            gram += np.einsum('dpk,dpl->pkl', x[fitted_to:origin], x[fitted_to:origin])
+            moment += np.einsum('dpk,dp->pk', x[fitted_to:origin], y[fitted_to:origin])
+            counts += usable[fitted_to:origin].sum(axis=0)
+            fitted_to = origin
+            if counts.min() < self.min_train_days:
+                continue
+
+            # Penalty scaled by each feature's sum of squares, so it does not depend on units
+            scale = np.einsum('pkk->pk', gram)
+            scale = np.maximum(scale, 1e-8 * scale.max(axis=1, keepdims=True))
+            regularised = gram + np.einsum('pk,kl->pkl', scale * penalty, np.eye(k))
+            coefficients = np.linalg.solve(regularised, moment[..., None])[..., 0]
+            forecast[i] = np.einsum('pk,pk->p', features[origin], coefficients)
+        return forecast
+
+    def backtest(self, prices_df: pd.DataFrame, volumes_df: pd.DataFrame,
+                 targets: Optional[List[str]] = None, n_origins: Optional[int] = None,
+                 include_next_day: bool = True) -> ForecastResult:
+        """
+        Rolling-origin one-day-ahead forecasts for the last n_origins days
+        (all days by default), plus the day after the data when
+        include_next_day is set
+        """
+        targets = targets or ['net_imbalance_volume', 'system_buy_price']
+        try:
+            unknown = [target for target in targets if target not in TARGETS]
+            if unknown:
+                raise BMRSError(f"Unknown forecast targets: {unknown}")
+            if prices_df.empty or volumes_df.empty:
+                raise BMRSError("No data to forecast")
+
+            # Common calendar of both frames
+            frames = {'prices': prices_df, 'volumes': volumes_df}
+            local_days = pd.concat([_local_dates(df).dt.tz_localize(None).dt.normalize() for df in frames.values()])
+            start = local_days.min()
+            n_days = (local_days.max() - start).days + 1
+
+            last = n_days + 1 if include_next_day else n_days
+            first = 0 if n_origins is None else max(n_days - n_origins, 0)
+            origins = np.arange(first, last)
+
+            dates = list(pd.date_range(start, periods=n_days, freq='D').date)
+            forecast_dates = dates[first:]
+            if include_next_day:
+                forecast_dates.append(dates[-1] + timedelta(days=1))
+            result = ForecastResult(dates=forecast_dates, actuals={})
+
+            for target in targets:
+                _, matrix = day_period_matrix(frames[TARGETS[target]], target, start, n_days)
+                actual = np.vstack([matrix, np.full((1, PERIODS_PER_DAY), np.nan)])
+                result.actuals[target] = actual[origins]
+                result.forecasts[target] = {
+                    'seasonal_naive': self.seasonal_naive(matrix)[origins],
+                    'exp_smoothing': self.exp_smoothing(matrix)[origins],
+                    'ridge': self.ridge(matrix, dates, origins)
+                }
+            return result
+
+        except BMRSError:
+            raise
+        except Exception as e:
+            raise BMRSError(f"Error forecasting: {str(e)}")
@@ -1,7 +1,9 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 import logging
 import re
 import sys
+from zoneinfo import ZoneInfo
 
 class BMRSError(Exception):
     """Custom exception class for BMRS-related errors"""
@@ -21,14 +23,27 @@ def validate_date_format(date_string):
     except ValueError as e:
         raise BMRSError(f"Invalid date: {date_string}. {str(e)}")
 
-def validate_settlement_period(period):
+@lru_cache(maxsize=4096)
+def periods_in_day(settlement_date):
     """
-    Validate that a settlement period is between 1 and 48
+    Number of settlement periods in a day: 48, or 46/50 on clock-change days
     """
+    london = ZoneInfo('Europe/London')
+    day = datetime.strptime(settlement_date, '%Y-%m-%d')
+    start = day.replace(tzinfo=london).astimezone(timezone.utc)
+    end = (day + timedelta(days=1)).replace(tzinfo=london).astimezone(timezone.utc)
+    return int((end - start).total_seconds() // 1800)
+
+def validate_settlement_period(period, settlement_date=None):
+    """
+    Validate that a settlement period is between 1 and 48, or between 1 and
+    the number of periods in settlement_date when a date is given
+    """
+    last_period = periods_in_day(settlement_date) if settlement_date else 48
     try:
         period_int = int(period)
-        if not 1 <= period_int <= 48:
-            raise BMRSError(f"Settlement period must be between 1 and 48, got: {period}")
+        if not 1 <= period_int <= last_period:
+            raise BMRSError(f"Settlement period must be between 1 and {last_period}, got: {period}")
     except ValueError:
         raise BMRSError(f"Settlement period must be an integer, got: {period}")
     
@@ -46,6 +61,13 @@ def setup_logging():
 
 def display_results(results):
     """Display analysis results"""
+    if results.provisional:
+        print(f"\nPROVISIONAL: fetch deadline missed for {', '.join(results.provisional_dates)}")
+    if results.failed_dates:
+        print(f"\nMISSING DATA: no data fetched for {', '.join(results.failed_dates)}")
+    if results.revisions is not None and results.revisions.revisions:
+        print(f"\n{results.revisions.format()}")
+    
     print("\nPeak Hours Analysis:")
     print("=" * 50)
     print(results.peak_hours_report)
@@ -0,0 +1,149 @@
+import hashlib
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.helpers import BMRSError
+
+# Frames kept in the store, one Parquet dataset each
+DATASETS = ['prices', 'volumes']
+
+class HistoryStore:
+    """
+    Parquet history of processed prices and volumes, partitioned by year
+    and month (hive layout: <root>/<dataset>/year=YYYY/month=M/).
+
+    Reads push column selections and date ranges down to the Parquet
+    reader, so only the touched partitions and row groups are loaded.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.logger = logging.getLogger(__name__)
+        for dataset in DATASETS:
+            os.makedirs(os.path.join(self.root, dataset), exist_ok=True)
+
+    def _partition_path(self, dataset: str, year: int, month: int) -> str:
+        return os.path.join(self.root, dataset, f"year={year}", f"month={month}")
+
+    def write(self, prices_df: pd.DataFrame, volumes_df: pd.DataFrame):
+        """
+        Upsert processed frames. Rows replace stored rows with the same
+        timestamp; only the partitions touched by the new data are rewritten.
+        """
+        try:
+            for dataset, df in zip(DATASETS, [prices_df, volumes_df]):
+                self._write_dataset(dataset, df)
+        except Exception as e:
+            raise BMRSError(f"Error writing history store: {str(e)}")
+
+    def _write_dataset(self, dataset: str, df: pd.DataFrame):
+        if df.empty:
+            return
+        timestamps = df['timestamp']
+        for (year, month), rows in df.groupby([timestamps.dt.year, timestamps.dt.month]):
+            path = self._partition_path(dataset, year, month)
+            file_path = os.path.join(path, 'part-0.parquet')
+
+            if os.path.exists(file_path):
+                existing = pq.read_table(file_path, memory_map=True).to_pandas()
+                rows = pd.concat([existing, rows], ignore_index=True)
+
+            rows = (
+                rows.drop_duplicates('timestamp', keep='last')
+                .sort_values('timestamp')
+                .reset_index(drop=True)
+            )
+
+            os.makedirs(path, exist_ok=True)
+            tmp_path = file_path + '.tmp'
+            pq.write_table(pa.Table.from_pandas(rows, preserve_index=False), tmp_path)
+            os.replace(tmp_path, file_path)
+
+            self.logger.info(f"Stored {len(rows)} {dataset} rows for {year}-{month:02d}")
+
+    def partitions(self, dataset: str = 'prices') -> List[tuple]:
+        """List stored (year, month) partitions of a dataset"""
+        base = os.path.join(self.root, dataset)
+        found = []
+        for year_dir in sorted(os.listdir(base)):
+            for month_dir in os.listdir(os.path.join(base, year_dir)):
+                found.append((int(year_dir.split('=')[1]), int(month_dir.split('=')[1])))
+        return sorted(found)
+
+    def version(self) -> str:
+        """
+        Token of the stored partition files. It changes on every write,
+        from this process or another, so it can key caches of analyses.
+        """
+        files = []
+        for dataset in DATASETS:
+            for year, month in self.partitions(dataset):
+                try:
+                    stat = os.stat(os.path.join(self._partition_path(dataset, year, month), 'part-0.parquet'))
+                except FileNotFoundError:
+                    continue
+                files.append((dataset, year, month, stat.st_ino, stat.st_mtime_ns, stat.st_size))
+        return hashlib.sha256(repr(files).encode()).hexdigest()[:16]
+
+    def read(self, dataset: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+             columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Read a dataset for an inclusive date range ('YYYY-MM-DD') with
+        optional column selection. Partitions outside the range are pruned
+        and the timestamp predicate is pushed down to the row groups.
+        """
+        if dataset not in DATASETS:
+            raise BMRSError(f"Unknown dataset: {dataset}")
+
+        try:
+            base = os.path.join(self.root, dataset)
+            start = datetime.strptime(start_date, '%Y-%m-%d') if start_date else None
+            end = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1) if end_date else None
+
+            paths = [
+                os.path.join(self._partition_path(dataset, year, month), 'part-0.parquet')
+                for year, month in self.partitions(dataset)
+                if self._overlaps(year, month, start, end)
+            ]
+            if not paths:
+                return pd.DataFrame(columns=columns)
+
+            schema = pq.read_schema(paths[0])
+            filters = self._timestamp_filters(schema, start, end)
+            if columns is not None and 'timestamp' not in columns:
+                columns = ['timestamp'] + list(columns)
+
+            table = pq.ParquetDataset(paths, filters=filters or None, memory_map=True).read(columns=columns)
+            return table.to_pandas().sort_values('timestamp').reset_index(drop=True)
+
+        except Exception as e:
+            raise BMRSError(f"Error reading history store: {str(e)}")
+
+    def read_frames(self, start_date: Optional[str] = None, end_date: Optional[str] = None):
+        """Read processed (prices_df, volumes_df) for a date range"""
+        return (
+            self.read('prices', start_date, end_date),
+            self.read('volumes', start_date, end_date)
+        )
+
+    @staticmethod
+    def _overlaps(year, month, start, end) -> bool:
+        partition_start = datetime(year, month, 1)
+        partition_end = datetime(year + month // 12, month % 12 + 1, 1)
+        return (start is None or partition_end > start) and (end is None or partition_start < end)
+
+    @staticmethod
+    def _timestamp_filters(schema, start, end):
+        """Build row filters in the stored timestamp type (naive or tz-aware)"""
+        tz = getattr(schema.field('timestamp').type, 'tz', None)
+        to_stored = lambda value: pd.Timestamp(value, tz=tz) if tz else pd.Timestamp(value)
+        filters = []
+        if start is not None:
+            filters.append(('timestamp', '>=', to_stored(start)))
+        if end is not None:
+            filters.append(('timestamp', '<', to_stored(end)))
+        return filters
@@ -1,43 +1,32 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from utils.backends import get_backend, imbalance_cost
 from utils.helpers import BMRSError
 
 class ImbalanceAnalysis:
     """Class for analysing imbalance costs and rates"""
     
     @staticmethod
-    def calculate_daily_imbalance_metrics(prices_df, volumes_df):
+    def calculate_daily_imbalance_metrics(prices_df, volumes_df, backend=None):
         """
         Calculate daily imbalance costs and rates
         """
         try:
-            # Ensure DataFrames have matching timestamps
-            df = pd.merge(
-                prices_df,
-                volumes_df,
-                on='timestamp',
-                how='inner'
-            )
-            
-            # Add date column for grouping
-            df['date'] = df['timestamp'].dt.date
-            
-            # Calculate costs for each settlement period
-            df['imbalance_cost'] = np.where(
-                df['net_imbalance_volume'] >= 0,
-                df['net_imbalance_volume'] * df['system_sell_price'],
-                df['net_imbalance_volume'] * df['system_buy_price']
-            )
-            
-            # Calculate daily metrics
-            daily_metrics = df.groupby('date').agg({
-                'imbalance_cost': 'sum',
-                'net_imbalance_volume': 'sum',
-                'abs_imbalance_volume': 'sum',
-                'system_sell_price': ['mean', 'min', 'max'],
-                'system_buy_price': ['mean', 'min', 'max']
-            }).round(2)
+            # Daily metrics over matching timestamps, with each settlement period's cost
+            daily_metrics = get_backend(backend).daily_stats(
+                [prices_df, volumes_df],
+                {
+                    'imbalance_cost': ['sum'],
+                    'net_imbalance_volume': ['sum'],
+                    'abs_imbalance_volume': ['sum'],
+                    'system_sell_price': ['mean', 'min', 'max'],
+                    'system_buy_price': ['mean', 'min', 'max']
+                },
+                derived={'imbalance_cost': (
+                    ['net_imbalance_volume', 'system_sell_price', 'system_buy_price'], imbalance_cost
+                )}
+            ).round(2)
             
             # Calculate daily unit rate (£/MWh)
             daily_metrics['unit_rate'] = (
@@ -0,0 +1,222 @@
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+from utils.helpers import BMRSError
+
+# Cube dimensions in axis order; hours, weekdays, months and years are in UK local time
+DIMENSIONS = ['year', 'month', 'weekday', 'hour', 'position']
+
+# System position of a period: long when the net imbalance volume is positive, otherwise short
+POSITIONS = ['long', 'short']
+
+# Measures aggregated in every cell
+MEASURES = [
+    'imbalance_cost', 'net_imbalance_volume', 'abs_imbalance_volume',
+    'system_sell_price', 'system_buy_price', 'price_spread'
+]
+
+STATS = ['count', 'sum', 'mean', 'std', 'min', 'max']
+
+class ImbalanceCube:
+    """
+    Dense OLAP cube of imbalance measures over year x month x weekday x
+    hour x system position.
+
+    Each cell holds the count, sum, sum of squares, min and max of every
+    measure, so any roll-up (mean, std, ...) over any slice is a sum of
+    small arrays rather than a regroup of the raw periods.
+    """
+
+    def __init__(self, years: List[int], count: np.ndarray, sums: np.ndarray,
+                 sumsq: np.ndarray, mins: np.ndarray, maxs: np.ndarray):
+        self.years = list(years)
+        self.count = count
+        self.sums = sums
+        self.sumsq = sumsq
+        self.mins = mins
+        self.maxs = maxs
+        self.labels = {
+            'year': self.years,
+            'month': list(range(1, 13)),
+            'weekday': list(range(7)),
+            'hour': list(range(24)),
+            'position': POSITIONS
+        }
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.count.shape
+
+    @classmethod
+    def build(cls, prices_df: pd.DataFrame, volumes_df: pd.DataFrame) -> 'ImbalanceCube':
+        """Build the cube from processed prices and volumes frames"""
+        try:
+            df = pd.merge(
+                prices_df[['timestamp', 'system_sell_price', 'system_buy_price', 'price_spread']],
+                volumes_df[['timestamp', 'net_imbalance_volume', 'abs_imbalance_volume']],
+                on='timestamp',
+                how='inner'
+            ).dropna()
+
+            timestamps = df['timestamp']
+            if timestamps.dt.tz is None:
+                timestamps = timestamps.dt.tz_localize('UTC')
+            local = timestamps.dt.tz_convert('Europe/London')
+
+            niv = df['net_imbalance_volume'].to_numpy()
+            df['imbalance_cost'] = np.where(
+                niv >= 0,
+                niv * df['system_sell_price'].to_numpy(),
+                niv * df['system_buy_price'].to_numpy()
+            )
+
+            years = local.dt.year.to_numpy()
+            first_year = int(years.min()) if len(years) else 0
+            n_years = int(years.max()) - first_year + 1 if len(years) else 0
+            shape = (n_years, 12, 7, 24, len(POSITIONS))
+
+            cell = np.ravel_multi_index((
+                years - first_year,
+                local.dt.month.to_numpy() - 1,
+                local.dt.weekday.to_numpy(),
+                local.dt.hour.to_numpy(),
+                (~(niv > 0)).astype(np.int64)
+            ), shape)
+            n_cells = int(np.prod(shape))
+
+            values = df[MEASURES].to_numpy(dtype=float)
+            count = np.bincount(cell, minlength=n_cells).astype(np.int64)
+            sums = np.stack([np.bincount(cell, values[:, i], n_cells) for i in range(len(MEASURES))])
+            sumsq = np.stack([np.bincount(cell, values[:, i] ** 2, n_cells) for i in range(len(MEASURES))])
+            mins = np.full((len(MEASURES), n_cells), np.inf)
+            maxs = np.full((len(MEASURES), n_cells), -np.inf)
+            for i in range(len(MEASURES)):
+                np.minimum.at(mins[i], cell, values[:, i])
+                np.maximum.at(maxs[i], cell, values[:, i])
+
+            measure_shape = (len(MEASURES),) + shape
+            return cls(
+                list(range(first_year, first_year + n_years)),
+                count.reshape(shape),
+                sums.reshape(measure_shape),
+                sumsq.reshape(measure_shape),
+                mins.reshape(measure_shape),
+                maxs.reshape(measure_shape)
+            )
+
+        except Exception as e:
+            raise BMRSError(f"Error building imbalance cube: {str(e)}")
+
+    def _selection(self, filters: Dict) -> List[np.ndarray]:
+        """Index arrays along every dimension for the given filters"""
+        selection = []
+        for dim in DIMENSIONS:
+            labels = self.labels[dim]
+            if dim not in filters:
+                selection.append(np.arange(len(labels)))
+                continue
+            wanted = filters[dim]
+            if isinstance(wanted, (str, int, np.integer)):
+                wanted = [wanted]
+            unknown = [value for value in wanted if value not in labels]
+            if unknown and dim != 'year':
+                raise BMRSError(f"Unknown {dim} values: {unknown}")
+            selection.append(np.array([labels.index(value) for value in wanted if value in labels], dtype=int))
+        return selection
+
+    def rollup(self, by=(), measure: str = 'imbalance_cost', stat: str = 'mean', **filters):
+        """
+        Aggregate a measure over the filtered cells, keeping the `by`
+        dimensions. Filters take a value or a list of values per dimension,
+        e.g. hour=17, weekday=range(5), month=[12, 1, 2].
+
+        Returns a scalar when `by` is empty, otherwise a Series indexed by
+        the `by` dimensions. Empty cells give NaN.
+        """
+        if measure not in MEASURES:
+            raise BMRSError(f"Unknown measure: {measure}")
+        if stat not in STATS:
+            raise BMRSError(f"Unknown statistic: {stat}")
+        by = [by] if isinstance(by, str) else list(by)
+        unknown = [dim for dim in by if dim not in DIMENSIONS]
+        if unknown:
+            raise BMRSError(f"Unknown dimensions: {unknown}")
+
+        filters = {dim: list(values) if isinstance(values, range) else values for dim, values in filters.items()}
+        selection = self._selection(filters)
+        index = np.ix_(*selection)
+        m = MEASURES.index(measure)
+        axes = tuple(i for i, dim in enumerate(DIMENSIONS) if dim not in by)
+
+        count = self.count[index].sum(axis=axes)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if stat == 'count':
+                result = count.astype(float)
+            elif stat in ('sum', 'mean', 'std'):
+                total = self.sums[m][index].sum(axis=axes)
+                if stat == 'sum':
+                    result = total
+                elif stat == 'mean':
+                    result = np.where(count > 0, total / count, np.nan)
+                else:
+                    squares = self.sumsq[m][index].sum(axis=axes)
+                    var = (squares - total ** 2 / np.maximum(count, 1)) / (count - 1)
+                    result = np.where(count > 1, np.sqrt(np.maximum(var, 0)), np.nan)
+            elif stat == 'min':
+                result = self.mins[m][index].min(axis=axes)
+                result = np.where(np.isfinite(result), result, np.nan)
+            else:
+                result = self.maxs[m][index].max(axis=axes)
+                result = np.where(np.isfinite(result), result, np.nan)
+
+        if not by:
+            return float(result)
+
+        # Order the result axes as requested in `by`
+        kept = [dim for dim in DIMENSIONS if dim in by]
+        result = np.transpose(result, [kept.index(dim) for dim in by])
+        names = [
+            [self.labels[dim][i] for i in selection[DIMENSIONS.index(dim)]]
+            for dim in by
+        ]
+        index = pd.MultiIndex.from_product(names, names=by) if len(by) > 1 else pd.Index(names[0], name=by[0])
+        return pd.Series(result.ravel(), index=index, name=f"{measure}_{stat}")
+
+    def heatmap(self, rows: str = 'hour', cols: str = 'weekday', measure: str = 'imbalance_cost',
+                stat: str = 'mean', **filters) -> pd.DataFrame:
+        """Two-dimensional roll-up as a rows x cols DataFrame"""
+        return self.rollup((rows, cols), measure, stat, **filters).unstack(cols)
+
+    def merge(self, other: 'ImbalanceCube') -> 'ImbalanceCube':
+        """Combine cubes built from disjoint periods"""
+        years = list(range(min(self.years + other.years), max(self.years + other.years) + 1))
+        merged = ImbalanceCube(
+            years,
+            np.zeros((len(years),) + self.shape[1:], dtype=np.int64),
+            np.zeros((len(MEASURES), len(years)) + self.shape[1:]),
+            np.zeros((len(MEASURES), len(years)) + self.shape[1:]),
+            np.full((len(MEASURES), len(years)) + self.shape[1:], np.inf),
+            np.full((len(MEASURES), len(years)) + self.shape[1:], -np.inf)
+        )
+        for cube in (self, other):
+            if not cube.years:
+                continue
+            rows = slice(cube.years[0] - years[0], cube.years[-1] - years[0] + 1)
+            merged.count[rows] += cube.count
+            merged.sums[:, rows] += cube.sums
+            merged.sumsq[:, rows] += cube.sumsq
+            merged.mins[:, rows] = np.minimum(merged.mins[:, rows], cube.mins)
+            merged.maxs[:, rows] = np.maximum(merged.maxs[:, rows], cube.maxs)
+        return merged
+
+    def save(self, path: str):
+        """Save the cube to a compressed .npz file"""
+        np.savez_compressed(path, years=np.array(self.years), count=self.count, sums=self.sums,
+                            sumsq=self.sumsq, mins=self.mins, maxs=self.maxs)
+
+    @classmethod
+    def load(cls, path: str) -> 'ImbalanceCube':
+        """Load a cube saved with save"""
+        with np.load(path) as data:
+            return cls(data['years'].tolist(), data['count'], data['sums'],
+                       data['sumsq'], data['mins'], data['maxs'])
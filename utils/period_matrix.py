@@ -0,0 +1,211 @@
+import logging
+from typing import Dict, List, Optional
+import warnings
+import numpy as np
+import pandas as pd
+from utils.helpers import BMRSError
+
+HALF_HOUR_NS = 30 * 60 * 10**9
+DAY_NS = 24 * 60 * 60 * 10**9
+HOURS_PER_DAY = 24
+
+logger = logging.getLogger(__name__)
+
+def _reduce(values: np.ndarray, stat: str, axis: int) -> np.ndarray:
+    """NaN-skipping reduction matching pandas groupby semantics"""
+    count = (~np.isnan(values)).sum(axis=axis)
+    total = np.nansum(values, axis=axis)
+    if values.shape[axis] == 0 and stat in ('min', 'max'):
+        # No values to reduce, like an empty group
+        return np.full(count.shape, np.nan)
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        warnings.simplefilter('ignore', RuntimeWarning)
+        if stat == 'sum':
+            return total
+        if stat == 'count':
+            return count
+        if stat == 'mean':
+            return total / count
+        if stat == 'std':
+            mean = np.expand_dims(total / count, axis)
+            squares = np.nansum((values - mean) ** 2, axis=axis)
+            return np.where(count > 1, np.sqrt(squares / (count - 1)), np.nan)
+        if stat == 'min':
+            return np.nanmin(values, axis=axis)
+        if stat == 'max':
+            return np.nanmax(values, axis=axis)
+    raise BMRSError(f"Unknown statistic: {stat}")
+
+class PeriodMatrix:
+    """
+    Processed frames as dense (days x half-hour slots) arrays.
+
+    Days are calendar dates of the frames' own clock (UTC for the
+    processed frames; naive timestamps are treated as UTC) and slots count
+    half hours from midnight, so a day of a clock with DST has 46 or 50
+    slots. `present` marks the cells with a row in every frame, `valid`
+    the cells that exist on their day; other cells are NaN. Statistics by
+    hour are reshapes of the slot axis (48 -> 24 x 2) and statistics by
+    day are row reductions.
+    """
+
+    def __init__(self, dates: np.ndarray, values: Dict[str, np.ndarray], present: np.ndarray,
+                 day_slots: np.ndarray, hours: np.ndarray):
+        self.dates = dates
+        self.values = values
+        self.present = present
+        self.day_slots = day_slots
+        self.hours = hours
+
+    @property
+    def shape(self):
+        return self.present.shape
+
+    @property
+    def valid(self) -> np.ndarray:
+        return np.arange(self.shape[1]) < self.day_slots[:, None]
+
+    @property
+    def regular(self) -> bool:
+        """Whether every day has 48 slots, two per clock hour"""
+        return self.shape[1] == 2 * HOURS_PER_DAY and bool((self.day_slots == 2 * HOURS_PER_DAY).all())
+
+    @classmethod
+    def from_frames(cls, *frames: pd.DataFrame, columns: Optional[List[str]] = None) -> 'PeriodMatrix':
+        """
+        Lay out columns of frames sharing a 'timestamp' column. Each
+        column is taken from the first frame holding it; cells are present
+        where every frame has a row (an inner join on timestamp).
+        """
+        try:
+            if any(df.empty for df in frames):
+                return cls._empty(frames, columns)
+
+            tz = frames[0]['timestamp'].dt.tz
+            wall = [cls._wall_ns(df['timestamp']) for df in frames]
+            first_day = min(int(ns.min()) for ns in wall) // DAY_NS
+            last_day = max(int(ns.max()) for ns in wall) // DAY_NS
+            n_days = last_day - first_day + 1
+
+            midnights = (np.arange(first_day, last_day + 2) * DAY_NS).astype(np.int64)
+            if tz is not None and str(tz) != 'UTC':
+                midnights = pd.DatetimeIndex(midnights).tz_localize(tz).asi8
+            day_slots = np.diff(midnights) // HALF_HOUR_NS
+            n_slots = int(day_slots.max())
+
+            present = np.ones((n_days, n_slots), dtype=bool)
+            cells = []
+            for df, ns in zip(frames, wall):
+                day = ns // DAY_NS - first_day
+                utc = df['timestamp'].array.asi8 if tz is not None else ns
+                slot = (utc - midnights[day]) // HALF_HOUR_NS
+                flat = day * n_slots + slot
+                frame_present = np.bincount(flat, minlength=n_days * n_slots) > 0
+                duplicates = len(flat) - int(frame_present.sum())
+                if duplicates:
+                    logger.warning(f"{duplicates} rows share a settlement period; keeping the last")
+                present &= frame_present.reshape(n_days, n_slots)
+                cells.append(flat)
+
+            values = {}
+            for column in columns or []:
+                i = next((i for i, df in enumerate(frames) if column in df.columns), None)
+                if i is None:
+                    raise BMRSError(f"Column not found: {column}")
+                matrix = np.full(n_days * n_slots, np.nan)
+                matrix[cells[i]] = frames[i][column].to_numpy(dtype=float)
+                values[column] = np.where(present, matrix.reshape(n_days, n_slots), np.nan)
+
+            # Clock hour of every slot; -1 beyond the end of the day
+            starts = midnights[:-1, None] + np.arange(n_slots) * HALF_HOUR_NS
+            if tz is not None and str(tz) != 'UTC':
+                hours = pd.DatetimeIndex(starts.ravel()).tz_localize('UTC').tz_convert(tz).hour.to_numpy()
+            else:
+                hours = (starts.ravel() % DAY_NS) // (2 * HALF_HOUR_NS)
+            hours = np.where(np.arange(n_slots) < day_slots[:, None], hours.reshape(n_days, n_slots), -1)
+
+            dates = pd.date_range(pd.Timestamp(first_day * DAY_NS), periods=n_days, freq='D').date
+            return cls(dates, values, present, day_slots, hours)
+
+        except BMRSError:
+            raise
+        except Exception as e:
+            raise BMRSError(f"Error building period matrix: {str(e)}")
+
+    @classmethod
+    def _empty(cls, frames, columns: Optional[List[str]]) -> 'PeriodMatrix':
+        """Matrix of no days, for frames without a row shared by all of them"""
+        for column in columns or []:
+            if not any(column in df.columns for df in frames):
+                raise BMRSError(f"Column not found: {column}")
+        n_slots = 2 * HOURS_PER_DAY
+        return cls(
+            np.array([], dtype=object),
+            {column: np.empty((0, n_slots)) for column in columns or []},
+            np.zeros((0, n_slots), dtype=bool),
+            np.zeros(0, dtype=np.int64),
+            np.zeros((0, n_slots), dtype=np.int64)
+        )
+
+    @staticmethod
+    def _wall_ns(timestamps: pd.Series) -> np.ndarray:
+        """Wall-clock nanoseconds of timestamps in their own time zone"""
+        if timestamps.dt.tz is not None:
+            timestamps = timestamps.dt.tz_localize(None)
+        return timestamps.to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+    def _by_hour(self, matrix: np.ndarray) -> np.ndarray:
+        """Matrix as (days x 24 x slots per hour), padded on DST days"""
+        if self.regular:
+            return matrix.reshape(self.shape[0], HOURS_PER_DAY, 2)
+        # A DST clock repeats an hour on the long day, so slots are ranked within each
+        # (day, hour); hours never decrease along a day, so the keys are sorted
+        valid = self.hours >= 0
+        days, _ = np.nonzero(valid)
+        hours = self.hours[valid]
+        keys = days * HOURS_PER_DAY + hours
+        rank = np.arange(len(keys)) - np.searchsorted(keys, keys)
+        width = int(rank.max()) + 1 if len(rank) else 2
+        per_hour = np.zeros((self.shape[0], HOURS_PER_DAY, width), dtype=matrix.dtype)
+        if matrix.dtype.kind == 'f':
+            per_hour[:] = np.nan
+        per_hour[days, hours, rank] = matrix[valid]
+        return per_hour
+
+    def hourly_presence(self) -> np.ndarray:
+        """(days x 24) whether each day and clock hour has a row"""
+        return self._by_hour(self.present).any(axis=2)
+
+    def hourly_totals(self, column: str) -> np.ndarray:
+        """(days x 24) sums of each day and clock hour; NaN where the hour has no rows"""
+        totals = np.nansum(self._by_hour(self.values[column]), axis=2)
+        return np.where(self.hourly_presence(), totals, np.nan)
+
+    def hourly_stats(self, agg: Dict[str, List[str]]) -> pd.DataFrame:
+        """
+        Statistics of each column by clock hour over all days, like
+        df.groupby(df['timestamp'].dt.hour).agg(agg)
+        """
+        hours = np.flatnonzero(self.hourly_presence().any(axis=0))
+        data = {}
+        for column, stats in agg.items():
+            per_hour = self._by_hour(self.values[column]).transpose(1, 0, 2).reshape(HOURS_PER_DAY, -1)
+            for stat in stats:
+                data[(column, stat)] = _reduce(per_hour, stat, axis=1)[hours]
+        # int32, the dtype of Series.dt.hour
+        return pd.DataFrame(data, index=pd.Index(hours.astype(np.int32), name='hour'))
+
+    def daily_stats(self, agg: Dict[str, List[str]]) -> pd.DataFrame:
+        """Statistics of each column by day, like df.groupby(df['timestamp'].dt.date).agg(agg)"""
+        days = np.flatnonzero(self.present.any(axis=1))
+        data = {
+            (column, stat): _reduce(self.values[column], stat, axis=1)[days]
+            for column, stats in agg.items() for stat in stats
+        }
+        return pd.DataFrame(data, index=pd.Index(self.dates[days], name='date'))
+
+    def peak_slots(self, column: str) -> np.ndarray:
+        """Slot of each day's largest value; -1 for days without values"""
+        values = self.values[column]
+        has_values = ~np.isnan(values).all(axis=1)
+        return np.where(has_values, np.argmax(np.where(np.isnan(values), -np.inf, values), axis=1), -1)
@@ -0,0 +1,150 @@
+from datetime import date, datetime, timedelta
+import json
+import os
+import struct
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from utils.helpers import BMRSError, periods_in_day, validate_date_format
+
+MAGIC = b'BMRSPER1'
+HEADER_SIZE = 4096
+SLOTS_PER_DAY = 50  # Up to 50 settlement periods on the autumn clock-change day
+
+# Raw API fields stored by default
+DEFAULT_FIELDS = ['systemSellPrice', 'systemBuyPrice', 'netImbalanceVolume']
+
+class PeriodArrayStore:
+    """
+    Fixed-stride binary store of settlement period values.
+
+    The file holds a small header followed by a float64 array of shape
+    (fields, days, 50) and a uint8 validity mask of the same shape. Both
+    are memory-mapped, so a period or a range of days is a zero-copy
+    slice found by arithmetic on (day index, period) with no parsing or
+    index search.
+    """
+
+    def __init__(self, path: str, start_date: date, n_days: int, fields: List[str], mode: str = 'r'):
+        self.path = path
+        self.start_date = start_date
+        self.n_days = n_days
+        self.fields = list(fields)
+        self._field_index = {field: i for i, field in enumerate(self.fields)}
+
+        shape = (len(self.fields), n_days, SLOTS_PER_DAY)
+        self.values = np.memmap(path, dtype=np.float64, mode=mode, offset=HEADER_SIZE, shape=shape)
+        self.valid = np.memmap(
+            path, dtype=np.uint8, mode=mode,
+            offset=HEADER_SIZE + self.values.nbytes, shape=shape
+        )
+
+    @classmethod
+    def create(cls, path: str, start_date: str, end_date: str,
+               fields: Optional[List[str]] = None) -> 'PeriodArrayStore':
+        """Create an empty store covering an inclusive date range"""
+        validate_date_format(start_date)
+        validate_date_format(end_date)
+        start = datetime.strptime(start_date, '%Y-%m-%d').date()
+        n_days = (datetime.strptime(end_date, '%Y-%m-%d').date() - start).days + 1
+        if n_days < 1:
+            raise BMRSError("End date must be after start date")
+        fields = list(fields or DEFAULT_FIELDS)
+
+        header = json.dumps({
+            'start_date': start.isoformat(),
+            'n_days': n_days,
+            'fields': fields
+        }).encode()
+        if len(header) > HEADER_SIZE - len(MAGIC) - 4:
+            raise BMRSError("Too many fields for the store header")
+
+        size = HEADER_SIZE + len(fields) * n_days * SLOTS_PER_DAY * 9
+        with open(path, 'wb') as f:
+            f.write(MAGIC + struct.pack('<I', len(header)) + header)
+            f.truncate(size)
+
+        store = cls(path, start, n_days, fields, mode='r+')
+        store.values[:] = np.nan
+        return store
+
+    @classmethod
+    def open(cls, path: str, mode: str = 'r') -> 'PeriodArrayStore':
+        """Open an existing store, read-only by default"""
+        if not os.path.exists(path):
+            raise BMRSError(f"Period store not found: {path}")
+        with open(path, 'rb') as f:
+            magic = f.read(len(MAGIC))
+            if magic != MAGIC:
+                raise BMRSError(f"Not a period store: {path}")
+            length, = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(length))
+        start = datetime.strptime(header['start_date'], '%Y-%m-%d').date()
+        return cls(path, start, header['n_days'], header['fields'], mode=mode)
+
+    def day_index(self, settlement_date: str) -> int:
+        """Row of a settlement date in the arrays"""
+        validate_date_format(settlement_date)
+        index = (datetime.strptime(settlement_date, '%Y-%m-%d').date() - self.start_date).days
+        if not 0 <= index < self.n_days:
+            raise BMRSError(f"{settlement_date} is outside the store range")
+        return index
+
+    @staticmethod
+    def slot(settlement_date: str, settlement_period: int) -> int:
+        """Slot of a settlement period, which must be within the periods of its day"""
+        try:
+            period = int(settlement_period)
+        except (TypeError, ValueError):
+            raise BMRSError(f"Settlement period must be an integer, got: {settlement_period}")
+        last_period = periods_in_day(settlement_date)
+        if not 1 <= period <= last_period:
+            raise BMRSError(f"Settlement period must be between 1 and {last_period} on {settlement_date}, "
+                            f"got: {settlement_period}")
+        return period - 1
+
+    def write_frame(self, df: pd.DataFrame):
+        """
+        Write raw API rows (settlementDate, settlementPeriod and the stored
+        fields) into their slots with vectorised scatter assignment
+        """
+        rows = (pd.to_datetime(df['settlementDate']) - pd.Timestamp(self.start_date)).dt.days.to_numpy()
+        slots = df['settlementPeriod'].to_numpy(dtype=int) - 1
+
+        inside = (rows >= 0) & (rows < self.n_days) & (slots >= 0) & (slots < SLOTS_PER_DAY)
+        rows, slots = rows[inside], slots[inside]
+        for field in self.fields:
+            if field not in df.columns:
+                continue
+            i = self._field_index[field]
+            values = pd.to_numeric(df[field], errors='coerce').to_numpy(dtype=float)[inside]
+            self.values[i, rows, slots] = values
+            self.valid[i, rows, slots] = ~np.isnan(values)
+
+    def flush(self):
+        self.values.flush()
+        self.valid.flush()
+
+    def get(self, settlement_date: str, settlement_period: int) -> Dict[str, float]:
+        """Values of every field for one settlement period (NaN if not stored)"""
+        row = self.day_index(settlement_date)
+        slot = self.slot(settlement_date, settlement_period)
+        values = self.values[:, row, slot]
+        valid = self.valid[:, row, slot].astype(bool)
+        return {field: float(values[i]) if valid[i] else np.nan for i, field in enumerate(self.fields)}
+
+    def day(self, field: str, settlement_date: str) -> np.ndarray:
+        """Zero-copy view of the 50 slots of one field for one day"""
+        return self.values[self._field_index[field], self.day_index(settlement_date)]
+
+    def range(self, field: str, start_date: str, end_date: str):
+        """
+        Zero-copy (days x 50) views of a field and its validity mask for an
+        inclusive date range
+        """
+        i = self._field_index[field]
+        start, end = self.day_index(start_date), self.day_index(end_date) + 1
+        return self.values[i, start:end], self.valid[i, start:end]
+
+    def dates(self) -> List[str]:
+        return [(self.start_date + timedelta(days=d)).isoformat() for d in range(self.n_days)]
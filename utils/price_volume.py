@@ -0,0 +1,139 @@
+from typing import Iterable
+import numpy as np
+import pandas as pd
+from utils.helpers import BMRSError
+
+# Statistics produced for every window
+RELATIONSHIP_STATS = ['correlation', 'slope', 'elasticity']
+
+class PriceVolumeAnalysis:
+    """
+    Rolling price-volume relationship: correlation, regression slope of
+    price on net imbalance volume (£/MWh per MWh) and price elasticity.
+
+    All windows are evaluated from cumulative sums of x, y, x², y², xy
+    and |x|, so the cost is O(N) whatever the window length.
+    """
+
+    @staticmethod
+    def rolling_relationship(x, y, window, min_periods=None, group_starts=None):
+        """
+        Rolling correlation, slope and elasticity of y on x over the last
+        `window` positions. Pairs with a NaN are skipped.
+
+        Elasticity is the slope scaled by mean |x| / mean y of the window,
+        i.e. the relative price change per relative change in imbalance size.
+
+        group_starts, if given, holds for every position the first position
+        of its group; windows never reach back past it.
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        n = len(x)
+        min_periods = max(window // 2, 3) if min_periods is None else min_periods
+
+        valid = ~(np.isnan(x) | np.isnan(y))
+        # Centre on the global means to limit cancellation in the sums of squares
+        x0 = np.where(valid, x - (x[valid].mean() if valid.any() else 0.0), 0.0)
+        y0 = np.where(valid, y - (y[valid].mean() if valid.any() else 0.0), 0.0)
+
+        terms = np.stack([valid.astype(float), x0, y0, x0 * x0, y0 * y0, x0 * y0,
+                          np.where(valid, np.abs(x), 0.0), np.where(valid, y, 0.0)])
+        cumulative = np.zeros((len(terms), n + 1))
+        np.cumsum(terms, axis=1, out=cumulative[:, 1:])
+
+        end = np.arange(1, n + 1)
+        start = np.maximum(end - window, 0)
+        if group_starts is not None:
+            start = np.maximum(start, np.asarray(group_starts))
+        count, sx, sy, sxx, syy, sxy, sabs, sraw = cumulative[:, end] - cumulative[:, start]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = sxy - sx * sy / count
+            var_x = sxx - sx * sx / count
+            var_y = syy - sy * sy / count
+            enough = count >= min_periods
+            slope = np.where(enough & (var_x > 0), cov / var_x, np.nan)
+            correlation = np.where(enough & (var_x > 0) & (var_y > 0),
+                                   cov / np.sqrt(np.maximum(var_x * var_y, 0)), np.nan)
+            mean_y = sraw / count
+            elasticity = np.where(mean_y != 0, slope * (sabs / count) / mean_y, np.nan)
+
+        return pd.DataFrame({
+            'correlation': np.clip(correlation, -1, 1),
+            'slope': slope,
+            'elasticity': elasticity
+        })
+
+    @staticmethod
+    def _merge(prices_df, volumes_df, price_column):
+        df = pd.merge(
+            prices_df[['timestamp', price_column]],
+            volumes_df[['timestamp', 'net_imbalance_volume']],
+            on='timestamp',
+            how='inner'
+        )
+        return df.sort_values('timestamp', ignore_index=True)
+
+    @staticmethod
+    def analyse(prices_df, volumes_df, windows: Iterable[int] = (48, 336),
+                price_column: str = 'system_buy_price'):
+        """
+        Rolling relationship of price to net imbalance volume for each
+        window (in settlement periods). Returns a DataFrame with the
+        timestamp and `<stat>_<window>` columns.
+        """
+        try:
+            df = PriceVolumeAnalysis._merge(prices_df, volumes_df, price_column)
+            result = pd.DataFrame({'timestamp': df['timestamp']})
+            for window in windows:
+                stats = PriceVolumeAnalysis.rolling_relationship(
+                    df['net_imbalance_volume'], df[price_column], window
+                )
+                for stat in RELATIONSHIP_STATS:
+                    result[f'{stat}_{window}'] = stats[stat].to_numpy()
+            return result
+
+        except Exception as e:
+            raise BMRSError(f"Error analysing price-volume relationship: {str(e)}")
+
+    @staticmethod
+    def by_settlement_period(prices_df, volumes_df, window_days: int = 14,
+                             price_column: str = 'system_buy_price'):
+        """
+        Rolling relationship within each half-hour of the (UK local) day
+        over the last `window_days` days. Returns a DataFrame with the
+        timestamp, settlement_period and one column per statistic.
+        """
+        try:
+            df = PriceVolumeAnalysis._merge(prices_df, volumes_df, price_column)
+            timestamps = df['timestamp']
+            if timestamps.dt.tz is not None:
+                timestamps = timestamps.dt.tz_convert('Europe/London')
+            df['settlement_period'] = (timestamps.dt.hour * 2 + timestamps.dt.minute // 30 + 1).to_numpy()
+
+            # Group rows by settlement period so each group's windows are contiguous
+            df = df.sort_values(['settlement_period', 'timestamp'], kind='stable', ignore_index=True)
+            periods = df['settlement_period'].to_numpy()
+            boundaries = np.flatnonzero(np.diff(periods, prepend=-1))
+            group_starts = np.repeat(boundaries, np.diff(np.append(boundaries, len(df))))
+
+            stats = PriceVolumeAnalysis.rolling_relationship(
+                df['net_imbalance_volume'], df[price_column], window_days,
+                min_periods=max(window_days // 2, 3), group_starts=group_starts
+            )
+            result = pd.concat([df[['timestamp', 'settlement_period']], stats], axis=1)
+            return result.sort_values('timestamp', ignore_index=True)
+
+        except Exception as e:
+            raise BMRSError(f"Error analysing price-volume relationship: {str(e)}")
+
+    @staticmethod
+    def latest_by_settlement_period(by_period):
+        """Most recent statistics of each settlement period"""
+        return (
+            by_period.dropna(subset=['slope'])
+            .groupby('settlement_period')
+            .last()
+            .drop(columns='timestamp')
+        )
@@ -0,0 +1,152 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+import glob
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+import pandas as pd
+
+# Part of every key; bump when analysis code changes its results
+ANALYSIS_VERSION = 2
+
+@dataclass
+class MemoStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"{self.memory_hits} memory hits, {self.disk_hits} disk hits, "
+            f"{self.misses} misses, {self.evictions} evictions"
+        )
+
+class ResultCache:
+    """
+    Content-addressed memoisation of analysis results.
+
+    Keys hash the input frames and the analysis parameters, so revised
+    data or changed parameters miss without explicit invalidation.
+    Results are kept in an in-memory LRU of maxsize entries and, with a
+    path, pickled to disk; the disk cache evicts the least recently used
+    files once it exceeds max_bytes. Cached results are shared and must
+    not be modified.
+    """
+
+    def __init__(self, path: Optional[str] = None, maxsize: int = 16, max_bytes: int = 256 * 2**20):
+        self.path = path
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.stats = MemoStats()
+        self.logger = logging.getLogger(__name__)
+        self._entries: 'OrderedDict[str, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+
+    @staticmethod
+    def key(frames: Iterable[pd.DataFrame], params: Dict[str, Any]) -> str:
+        """Hash of the frames' contents and columns and the JSON-serialisable params"""
+        digest = hashlib.sha256()
+        digest.update(json.dumps({'version': ANALYSIS_VERSION, **params}, sort_keys=True, default=str).encode())
+        for df in frames:
+            digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in df.dtypes.items()]).encode())
+            digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        """Cached result of a key, or None"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats.memory_hits += 1
+                return self._entries[key]
+
+        result = self._load(key) if self.path else None
+        with self._lock:
+            if result is None:
+                self.stats.misses += 1
+                return None
+            self.stats.disk_hits += 1
+            self._remember(key, result)
+        return result
+
+    def put(self, key: str, result):
+        with self._lock:
+            self._remember(key, result)
+        if self.path:
+            self._save(key, result)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]):
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            self.put(key, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.path:
+            for file_path in self._files():
+                os.remove(file_path)
+
+    def _remember(self, key: str, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _file_path(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.pkl")
+
+    def _files(self):
+        return glob.glob(os.path.join(self.path, '*.pkl'))
+
+    def _load(self, key: str):
+        file_path = self._file_path(key)
+        if not os.path.exists(file_path):
+            return None
+        try:
+            with open(file_path, 'rb') as f:
+                result = pickle.load(f)
+            # Mark as recently used for eviction
+            os.utime(file_path)
+            return result
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            self.logger.warning(f"Ignoring unreadable cached result {file_path}: {str(e)}")
+            return None
+
+    def _save(self, key: str, result):
+        tmp_path = f"{self._file_path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._file_path(key))
+        self._evict_files()
+
+    def _evict_files(self):
+        """Remove least recently used files until the cache fits in max_bytes"""
+        files = []
+        for file_path in self._files():
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, file_path))
+        total = sum(size for _, size, _ in files)
+        for _, size, file_path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(file_path)
+            except OSError:
+                continue
+            total -= size
+            self.stats.evictions += 1
@@ -0,0 +1,316 @@
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+import logging
+import os
+import re
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from utils.aggregates import finalise_aggregates, merge_partial_aggregates, partial_aggregates
+from utils.data_processor import BMRSDataProcessor
+from utils.helpers import BMRSError
+from utils.imbalance_analysis import ImbalanceAnalysis
+
+# Raw columns compared between revisions of a settlement day
+TRACKED_COLUMNS = ['systemSellPrice', 'systemBuyPrice', 'netImbalanceVolume']
+
+# File name of one stored version of a day
+VERSION_FILE = re.compile(r'^(\d{4}-\d{2}-\d{2})_v(\d+)\.csv$')
+
+@dataclass
+class DayRevision:
+    """Per-period differences between two versions of a day"""
+    day: date
+    version: int
+    changes: pd.DataFrame  # timestamp, column, old_value, new_value
+    added_periods: List[pd.Timestamp] = field(default_factory=list)
+
+    @property
+    def changed_periods(self) -> int:
+        return self.changes['timestamp'].nunique() + len(self.added_periods)
+
+@dataclass
+class RevisionReport:
+    """Revisions detected by one update of the revision store"""
+    revisions: List[DayRevision] = field(default_factory=list)
+    unchanged_days: List[date] = field(default_factory=list)
+
+    @property
+    def changed_days(self) -> List[date]:
+        return [revision.day for revision in self.revisions]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Combine all per-period changes into one DataFrame"""
+        frames = [r.changes.assign(day=r.day, version=r.version) for r in self.revisions]
+        if not frames:
+            return pd.DataFrame(columns=['day', 'version', 'timestamp', 'column', 'old_value', 'new_value'])
+        return pd.concat(frames, ignore_index=True)[
+            ['day', 'version', 'timestamp', 'column', 'old_value', 'new_value']
+        ]
+
+    def format(self) -> str:
+        """Generate a formatted revision report"""
+        report = (
+            f"Revision Report\n"
+            f"{'=' * 50}\n"
+            f"Changed Days: {len(self.revisions)}\n"
+            f"Unchanged Days: {len(self.unchanged_days)}\n"
+        )
+        for revision in self.revisions:
+            report += (
+                f"\n{revision.day} (version {revision.version}): "
+                f"{revision.changed_periods} periods changed\n"
+            )
+            if revision.added_periods:
+                report += f"  Added periods: {len(revision.added_periods)}\n"
+            for row in revision.changes.itertuples(index=False):
+                report += (
+                    f"  {row.timestamp:%H:%M} {row.column}: "
+                    f"{row.old_value} -> {row.new_value}\n"
+                )
+        return report
+
+class RevisionStore:
+    """
+    Versioned storage of raw settlement data, one version list per day.
+
+    Days are keyed by the timestamp date, the same key the analyses group
+    on. When a path is given every version is also written as a CSV file,
+    and the versions already there are loaded on start-up.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._versions: Dict[date, List[pd.DataFrame]] = {}
+
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+            self._load()
+
+    def _load(self):
+        """Load the versions written to the store's path, oldest first"""
+        try:
+            files = sorted(
+                (date.fromisoformat(match.group(1)), int(match.group(2)), name)
+                for name in os.listdir(self.path)
+                if (match := VERSION_FILE.match(name))
+            )
+            for day, _, name in files:
+                self._versions.setdefault(day, []).append(pd.read_csv(
+                    os.path.join(self.path, name),
+                    dtype={'settlementDate': str, 'startTime': str},
+                    parse_dates=['timestamp'],
+                    float_precision='round_trip'
+                ))
+        except Exception as e:
+            raise BMRSError(f"Error loading revisions from {self.path}: {str(e)}")
+
+        if files:
+            self.logger.info(f"Loaded {len(files)} versions of {len(self._versions)} days from {self.path}")
+
+    def latest(self, day: date) -> Optional[pd.DataFrame]:
+        """Return the latest version of a day, or None if it was never stored"""
+        versions = self._versions.get(day)
+        return versions[-1] if versions else None
+
+    @property
+    def days(self) -> List[date]:
+        return sorted(self._versions)
+
+    def versions(self, day: date) -> List[pd.DataFrame]:
+        """Return all stored versions of a day, oldest first"""
+        return list(self._versions.get(day, []))
+
+    def add(self, raw_df: pd.DataFrame) -> RevisionReport:
+        """
+        Upsert raw rows into the store and return what changed per day.
+        Stored periods missing from raw_df are kept, so a partial re-fetch
+        only adds or revises periods.
+        """
+        report = RevisionReport()
+        raw_df = raw_df.sort_values('timestamp')
+
+        for day, rows in raw_df.groupby(raw_df['timestamp'].dt.date, sort=True):
+            previous = self.latest(day)
+            if previous is None:
+                current = rows.reset_index(drop=True)
+            else:
+                current = (
+                    pd.concat([previous, rows])
+                    .drop_duplicates('timestamp', keep='last')
+                    .sort_values('timestamp')
+                    .reset_index(drop=True)
+                )
+
+            revision = self.diff(previous, current, day, len(self._versions.get(day, [])) + 1)
+            if revision is None:
+                report.unchanged_days.append(day)
+                continue
+
+            self._versions.setdefault(day, []).append(current)
+            report.revisions.append(revision)
+            if self.path:
+                current.to_csv(os.path.join(self.path, f"{day}_v{revision.version}.csv"), index=False)
+
+        return report
+
+    @staticmethod
+    def diff(previous: Optional[pd.DataFrame], current: pd.DataFrame,
+             day: date, version: int) -> Optional[DayRevision]:
+        """
+        Compare two versions of a day period by period, returning None
+        when nothing changed
+        """
+        columns = [col for col in TRACKED_COLUMNS if col in current.columns]
+        if previous is None:
+            previous = pd.DataFrame(columns=['timestamp'] + columns)
+
+        old = previous.set_index('timestamp')[columns]
+        new = current.set_index('timestamp')[columns]
+
+        added = new.index.difference(old.index)
+        common = new.index.intersection(old.index)
+
+        old_values = old.loc[common].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        new_values = new.loc[common].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+
+        # NaN to NaN is not a change
+        changed = ~((old_values == new_values) | (np.isnan(old_values) & np.isnan(new_values)))
+        rows, cols = np.nonzero(changed)
+
+        changes = pd.DataFrame({
+            'timestamp': common[rows],
+            'column': np.asarray(columns, dtype=object)[cols],
+            'old_value': old_values[rows, cols],
+            'new_value': new_values[rows, cols]
+        })
+
+        if changes.empty and added.empty:
+            return None
+
+        return DayRevision(
+            day=day,
+            version=version,
+            changes=changes,
+            added_periods=list(added)
+        )
+
+class IncrementalProcessor:
+    """
+    Keeps processed frames and aggregates per day so that a re-fetch only
+    reprocesses the days whose periods changed.
+
+    Gap filling crosses midnight, so a changed day is cleaned together
+    with the stored days either side of it, and those neighbours are
+    reprocessed too; the frames then match cleaning the whole range.
+    """
+
+    def __init__(self, store: Optional[RevisionStore] = None):
+        self.store = store or RevisionStore()
+        self._prices: Dict[date, pd.DataFrame] = {}
+        self._volumes: Dict[date, pd.DataFrame] = {}
+        self._daily_metrics: Dict[date, pd.DataFrame] = {}
+        self._hourly_partials: Dict[date, pd.DataFrame] = {}
+        self._quality: Dict[date, Dict[str, pd.Series]] = {}
+
+    def update(self, raw_df: pd.DataFrame) -> RevisionReport:
+        """
+        Add newly fetched raw data and reprocess only the changed days,
+        and unchanged days not processed since the store was loaded
+        """
+        try:
+            report = self.store.add(raw_df)
+
+            affected = {
+                day + timedelta(days=offset) for day in report.changed_days for offset in (-1, 0, 1)
+            }
+            affected.update(day for day in report.unchanged_days if day not in self._prices)
+            self._process_days(sorted(day for day in affected if self.store.latest(day) is not None))
+
+            return report
+
+        except Exception as e:
+            raise BMRSError(f"Error updating revisions: {str(e)}")
+
+    def _process_days(self, days: List[date]):
+        """
+        Reprocess sorted days, each run of consecutive days in one pass
+        together with the stored day before and after the run
+        """
+        runs = []
+        for day in days:
+            if runs and runs[-1][1] == day - timedelta(days=1):
+                runs[-1] = (runs[-1][0], day)
+            else:
+                runs.append((day, day))
+
+        for first, last in runs:
+            raws = [
+                self.store.latest(first + timedelta(days=offset))
+                for offset in range(-1, (last - first).days + 2)
+            ]
+            prices_df, volumes_df = BMRSDataProcessor.clean_and_process_data(
+                pd.concat([raw for raw in raws if raw is not None], ignore_index=True)
+            )
+            dates = prices_df['timestamp'].dt.date
+            for day, rows in prices_df.groupby(dates, sort=True).groups.items():
+                if first <= day <= last:
+                    self._process_day(day, prices_df.loc[rows].reset_index(drop=True),
+                                      volumes_df.loc[rows].reset_index(drop=True))
+
+    def _process_day(self, day: date, prices_df: pd.DataFrame, volumes_df: pd.DataFrame):
+        """Store the processed frames of a day and recompute its aggregates"""
+        self._prices[day] = prices_df
+        self._volumes[day] = volumes_df
+        self._daily_metrics[day] = ImbalanceAnalysis.calculate_daily_imbalance_metrics(prices_df, volumes_df)
+        self._hourly_partials[day] = partial_aggregates(
+            volumes_df.assign(hour=volumes_df['timestamp'].dt.hour),
+            'hour',
+            ['abs_imbalance_volume', 'net_imbalance_volume']
+        )
+        self._quality[day] = {
+            'prices': prices_df['price_quality'].value_counts(),
+            'volumes': volumes_df['volume_quality'].value_counts()
+        }
+
+    @property
+    def days(self) -> List[date]:
+        return sorted(self._prices)
+
+    def get_dataframes(self, start: Optional[date] = None, end: Optional[date] = None):
+        """
+        Get the processed price and volume DataFrames of the days from
+        start to end inclusive, or of all days
+        """
+        days = [d for d in self.days if (start is None or d >= start) and (end is None or d <= end)]
+        if not days:
+            raise BMRSError("No data has been processed")
+        prices_df = pd.concat([self._prices[d] for d in days], ignore_index=True)
+        volumes_df = pd.concat([self._volumes[d] for d in days], ignore_index=True)
+        return prices_df, volumes_df
+
+    def get_daily_metrics(self) -> pd.DataFrame:
+        """Get the daily imbalance metrics for all days"""
+        if not self._daily_metrics:
+            raise BMRSError("No data has been processed")
+        return pd.concat([self._daily_metrics[d] for d in self.days])
+
+    def get_hourly_stats(self) -> pd.DataFrame:
+        """Get hourly volume statistics, merged from the per-day partials"""
+        if not self._hourly_partials:
+            raise BMRSError("No data has been processed")
+        partials = merge_partial_aggregates([self._hourly_partials[d] for d in self.days])
+        return finalise_aggregates(partials, {
+            'abs_imbalance_volume': ['mean', 'sum', 'std', 'min', 'max'],
+            'net_imbalance_volume': ['mean', 'sum']
+        }).round(2)
+
+    def get_quality_counts(self) -> Dict[str, pd.DataFrame]:
+        """Get quality flag counts per day for prices and volumes"""
+        return {
+            category: pd.DataFrame(
+                {d: self._quality[d][category] for d in self.days}
+            ).T.fillna(0).astype(int)
+            for category in ['prices', 'volumes']
+        }
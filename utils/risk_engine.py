@@ -0,0 +1,228 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import logging
+import os
+from typing import Dict, Iterable, Optional
+import numpy as np
+import pandas as pd
+from utils.helpers import BMRSError
+
+PERIODS_PER_DAY = 48
+
+# Scenarios simulated per batch; bounds memory at about 35 MB per batch for a month
+BATCH_SIZE = 1000
+
+METHODS = ['bootstrap', 'shocked']
+
+logger = logging.getLogger(__name__)
+
+def _period_costs(sell, buy, niv):
+    """Imbalance cost of each period, as in ImbalanceAnalysis"""
+    return np.where(niv >= 0, niv * sell, niv * buy)
+
+def _simulate_batch(args):
+    """
+    Simulate one batch of scenarios. Returns (daily cost, daily absolute
+    volume), each of shape (scenarios, days).
+    """
+    history, method, n_scenarios, days, seed, params = args
+    rng = np.random.default_rng(seed)
+    sell_hist, buy_hist, niv_hist = history['sell'], history['buy'], history['niv']
+
+    if method == 'bootstrap':
+        # Draw a historic day independently for every (scenario, day, period),
+        # keeping the sell price, buy price and NIV of that period together
+        table, counts = history['valid_days'], history['valid_counts']
+        draws = (rng.random((n_scenarios, days, PERIODS_PER_DAY)) * counts).astype(np.int64)
+        periods = np.broadcast_to(np.arange(PERIODS_PER_DAY), draws.shape)
+        source_days = table[periods, draws]
+        sell = sell_hist[source_days, periods]
+        buy = buy_hist[source_days, periods]
+        niv = niv_hist[source_days, periods]
+    else:
+        # Shock the most recent `days` of history: a lognormal price factor
+        # and a correlated NIV shock scaled by each period's historic std
+        base = slice(len(sell_hist) - days, len(sell_hist))
+        z_price = rng.standard_normal((n_scenarios, days, PERIODS_PER_DAY))
+        z_niv = rng.standard_normal((n_scenarios, days, PERIODS_PER_DAY))
+        rho = params['correlation']
+        z_niv = rho * z_price + np.sqrt(1 - rho ** 2) * z_niv
+
+        sigma = params['price_volatility']
+        factor = np.exp(sigma * z_price - sigma ** 2 / 2)
+        sell = sell_hist[base] * factor
+        buy = buy_hist[base] * factor
+        niv = niv_hist[base] + params['niv_volatility'] * history['niv_std'] * z_niv
+
+    cost = _period_costs(sell, buy, niv)
+    return np.nansum(cost, axis=2), np.nansum(np.abs(niv), axis=2)
+
+@dataclass
+class RiskResult:
+    """Simulated daily imbalance costs and volumes, shape (scenarios, days)"""
+    daily_cost: np.ndarray
+    daily_volume: np.ndarray
+    method: str
+
+    @property
+    def total_cost(self) -> np.ndarray:
+        return self.daily_cost.sum(axis=1)
+
+    @property
+    def unit_rate(self) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.total_cost / self.daily_volume.sum(axis=1)
+
+    @staticmethod
+    def value_at_risk(losses: np.ndarray, confidence: float = 0.95):
+        """
+        Value at risk and expected shortfall of a loss distribution
+        (higher values are worse). Returns (VaR, ES).
+        """
+        losses = np.asarray(losses, dtype=float)
+        var = np.quantile(losses, confidence)
+        return float(var), float(losses[losses >= var].mean())
+
+    def summary(self, confidence: Iterable[float] = (0.95, 0.99)) -> pd.DataFrame:
+        """Mean, standard deviation, VaR and ES of the daily cost, total cost and unit rate"""
+        metrics = {
+            'daily_cost': self.daily_cost.ravel(),
+            'total_cost': self.total_cost,
+            'unit_rate': self.unit_rate
+        }
+        rows = {}
+        for name, values in metrics.items():
+            row = {'mean': float(np.mean(values)), 'std': float(np.std(values, ddof=1))}
+            for level in confidence:
+                var, es = self.value_at_risk(values, level)
+                row[f'var_{level:.0%}'] = var
+                row[f'es_{level:.0%}'] = es
+            rows[name] = row
+        return pd.DataFrame(rows).T
+
+    def format(self, confidence: float = 0.95) -> str:
+        """Formatted risk report"""
+        n_scenarios, days = self.daily_cost.shape
+        daily_var, daily_es = self.value_at_risk(self.daily_cost.ravel(), confidence)
+        total_var, total_es = self.value_at_risk(self.total_cost, confidence)
+        rate_var, rate_es = self.value_at_risk(self.unit_rate, confidence)
+        return (
+            f"Imbalance Cost Risk Report\n"
+            f"{'=' * 50}\n"
+            f"Method: {self.method} ({n_scenarios:,} scenarios x {days} days)\n\n"
+            f"Daily Cost:\n"
+            f"  Mean: £{self.daily_cost.mean():,.2f}\n"
+            f"  VaR {confidence:.0%}: £{daily_var:,.2f}\n"
+            f"  ES {confidence:.0%}: £{daily_es:,.2f}\n"
+            f"Total Cost:\n"
+            f"  Mean: £{self.total_cost.mean():,.2f}\n"
+            f"  VaR {confidence:.0%}: £{total_var:,.2f}\n"
+            f"  ES {confidence:.0%}: £{total_es:,.2f}\n"
+            f"Unit Rate:\n"
+            f"  Mean: £{np.nanmean(self.unit_rate):,.2f}/MWh\n"
+            f"  VaR {confidence:.0%}: £{rate_var:,.2f}/MWh\n"
+            f"  ES {confidence:.0%}: £{rate_es:,.2f}/MWh\n"
+        )
+
+class ImbalanceRiskEngine:
+    """
+    Monte Carlo engine for imbalance cost risk.
+
+    History is held as (days x 48) arrays of sell price, buy price and NIV
+    per UK local half-hour. The repeated hour of the 50-period clock-change
+    day keeps its later periods; the skipped hour of the 46-period day is
+    missing. Scenarios are simulated in batches of
+    (scenarios x days x 48) arrays, optionally across a process pool; each
+    batch has its own seed, so results do not depend on the worker count.
+    """
+
+    def __init__(self, prices_df: pd.DataFrame, volumes_df: pd.DataFrame):
+        try:
+            df = pd.merge(
+                prices_df[['timestamp', 'system_sell_price', 'system_buy_price']],
+                volumes_df[['timestamp', 'net_imbalance_volume']],
+                on='timestamp',
+                how='inner'
+            ).sort_values('timestamp')
+            timestamps = df['timestamp']
+            if timestamps.dt.tz is None:
+                timestamps = timestamps.dt.tz_localize('UTC')
+            local = timestamps.dt.tz_convert('Europe/London')
+
+            day_codes, self.dates = pd.factorize(local.dt.date, sort=True)
+            slots = (local.dt.hour * 2 + local.dt.minute // 30).to_numpy()
+            shape = (len(self.dates), PERIODS_PER_DAY)
+            cells = day_codes * PERIODS_PER_DAY + slots
+            duplicates = len(cells) - len(np.unique(cells))
+            if duplicates:
+                logger.warning(f"{duplicates} rows share a local half-hour after a clock change; keeping the last")
+
+            self.history: Dict[str, np.ndarray] = {}
+            for name, col in [('sell', 'system_sell_price'), ('buy', 'system_buy_price'),
+                              ('niv', 'net_imbalance_volume')]:
+                values = np.full(shape, np.nan)
+                values[day_codes, slots] = df[col].to_numpy(dtype=float)
+                self.history[name] = values
+
+            # Per period, the days on which all three values are present
+            valid = ~(np.isnan(self.history['sell']) | np.isnan(self.history['buy'])
+                      | np.isnan(self.history['niv']))
+            counts = valid.sum(axis=0)
+            if (counts == 0).any():
+                raise BMRSError("Every settlement period needs at least one complete historic day")
+            table = np.zeros((PERIODS_PER_DAY, shape[0]), dtype=np.int64)
+            for period in range(PERIODS_PER_DAY):
+                days = np.flatnonzero(valid[:, period])
+                table[period, :len(days)] = days
+            self.history['valid_days'] = table
+            self.history['valid_counts'] = counts
+            self.history['niv_std'] = np.nanstd(self.history['niv'], axis=0, ddof=1)
+
+        except BMRSError:
+            raise
+        except Exception as e:
+            raise BMRSError(f"Error preparing risk history: {str(e)}")
+
+    def simulate(self, n_scenarios: int = 10000, days: int = 30, method: str = 'bootstrap',
+                 price_volatility: float = 0.2, niv_volatility: float = 0.5, correlation: float = 0.0,
+                 seed: Optional[int] = None, max_workers: int = 1,
+                 batch_size: int = BATCH_SIZE) -> RiskResult:
+        """
+        Simulate daily imbalance costs.
+
+        method='bootstrap' resamples each settlement period from the
+        historic days; method='shocked' applies lognormal price shocks
+        (price_volatility) and NIV shocks (niv_volatility x the period's
+        historic std, with the given correlation) to the last `days` days.
+        """
+        if method not in METHODS:
+            raise BMRSError(f"Unknown simulation method: {method}")
+        if method == 'shocked' and days > len(self.dates):
+            raise BMRSError(f"Shocked simulation needs {days} days of history, have {len(self.dates)}")
+
+        try:
+            params = {
+                'price_volatility': price_volatility,
+                'niv_volatility': niv_volatility,
+                'correlation': correlation
+            }
+            sizes = [min(batch_size, n_scenarios - start) for start in range(0, n_scenarios, batch_size)]
+            seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+            batches = [(self.history, method, size, days, batch_seed, params)
+                       for size, batch_seed in zip(sizes, seeds)]
+
+            workers = max_workers or os.cpu_count() or 1
+            if workers == 1 or len(batches) == 1:
+                results = [_simulate_batch(batch) for batch in batches]
+            else:
+                with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as executor:
+                    results = list(executor.map(_simulate_batch, batches))
+
+            return RiskResult(
+                daily_cost=np.concatenate([cost for cost, _ in results]),
+                daily_volume=np.concatenate([volume for _, volume in results]),
+                method=method
+            )
+
+        except Exception as e:
+            raise BMRSError(f"Error simulating imbalance costs: {str(e)}")
@@ -0,0 +1,144 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+import numpy as np
+import pandas as pd
+from utils.aggregates import finalise_aggregates, merge_partial_aggregates, partial_aggregates
+from utils.helpers import BMRSError
+from utils.imbalance_analysis import ImbalanceAnalysis
+from utils.volume_analysis import VolumeAnalysis
+
+# Number of highest (date, hour) volumes kept per shard for the peak hours report
+TOP_K = 10
+
+# Shards per worker; a few per worker balances uneven months without paying
+# the fixed pandas overhead once per month
+SHARDS_PER_WORKER = 4
+
+def _month_codes(df):
+    """Year * 12 + month of each row, used as the shard key"""
+    return df['timestamp'].dt.year * 12 + df['timestamp'].dt.month
+
+def _volume_partials(volumes_df):
+    """
+    Mergeable partial aggregates of one shard for the hourly volume analysis
+    """
+    df = volumes_df.copy()
+    df['hour'] = df['timestamp'].dt.hour
+    df['date'] = df['timestamp'].dt.date
+
+    daily_peaks = df.groupby(['date', 'hour'])['abs_imbalance_volume'].sum().reset_index()
+    top_3_frequency = (
+        daily_peaks.sort_values('abs_imbalance_volume', ascending=False)
+        .groupby('date').head(3)
+        .groupby('hour').size()
+    )
+
+    return {
+        'hourly': partial_aggregates(df, 'hour', ['abs_imbalance_volume', 'net_imbalance_volume']),
+        'top_daily_peaks': daily_peaks.nlargest(TOP_K, 'abs_imbalance_volume'),
+        'top_3_frequency': top_3_frequency
+    }
+
+def _imbalance_partials(shard):
+    """Daily imbalance metrics of one shard; days never span two shards"""
+    prices_df, volumes_df = shard
+    return ImbalanceAnalysis.calculate_daily_imbalance_metrics(prices_df, volumes_df)
+
+class ShardedAnalysis:
+    """
+    Runs the hourly volume and daily imbalance analyses over monthly shards
+    in a process pool and merges the partial aggregates into the same
+    results as the serial VolumeAnalysis and ImbalanceAnalysis.
+    """
+
+    @staticmethod
+    def split_by_month(*frames, max_shards=None):
+        """
+        Split frames into shards of whole calendar months. Every frame is
+        split on the same month boundaries; with max_shards, consecutive
+        months are grouped so that at most max_shards shards are returned.
+        Returns one list of shards per frame.
+        """
+        codes = [_month_codes(df).to_numpy() for df in frames]
+        months = np.unique(np.concatenate(codes))
+        n_shards = len(months) if max_shards is None else max(min(max_shards, len(months)), 1)
+        shard_of_month = np.arange(len(months)) * n_shards // max(len(months), 1)
+
+        splits = []
+        for df, code in zip(frames, codes):
+            keys = shard_of_month[np.searchsorted(months, code)]
+            groups = dict(list(df.groupby(keys, sort=True)))
+            splits.append([groups.get(i, df.iloc[:0]) for i in range(n_shards)])
+        return splits
+
+    @staticmethod
+    def _workers(max_workers):
+        return max_workers or os.cpu_count() or 1
+
+    @staticmethod
+    def _map(func, shards, max_workers):
+        """Apply func to every shard, in a process pool when worthwhile"""
+        if max_workers == 1 or len(shards) == 1:
+            return [func(shard) for shard in shards]
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(shards))) as executor:
+            return list(executor.map(func, shards))
+
+    @staticmethod
+    def analyse_hourly_volumes(volumes_df, max_workers=None):
+        """
+        Sharded equivalent of VolumeAnalysis.analyse_hourly_volumes
+        """
+        try:
+            workers = ShardedAnalysis._workers(max_workers)
+            shards, = ShardedAnalysis.split_by_month(volumes_df, max_shards=workers * SHARDS_PER_WORKER)
+            shards = [shard for shard in shards if not shard.empty]
+            partials = ShardedAnalysis._map(_volume_partials, shards, workers)
+
+            hourly = merge_partial_aggregates([p['hourly'] for p in partials])
+            hourly_stats = finalise_aggregates(hourly, {
+                'abs_imbalance_volume': ['mean', 'sum', 'std', 'min', 'max'],
+                'net_imbalance_volume': ['mean', 'sum']
+            }).round(2)
+
+            daily_peaks = (
+                pd.concat([p['top_daily_peaks'] for p in partials], ignore_index=True)
+                .sort_values('abs_imbalance_volume', ascending=False)
+                .head(TOP_K)
+                .reset_index(drop=True)
+            )
+            top_3_frequency = (
+                pd.concat([p['top_3_frequency'] for p in partials])
+                .groupby(level=0).sum()
+                .sort_values(ascending=False)
+            )
+            peak_hours = {
+                'overall_peak_hours': hourly[('abs_imbalance_volume', 'sum')].sort_values(ascending=False),
+                'daily_peaks': daily_peaks,
+                'top_3_frequency': top_3_frequency
+            }
+
+            report = VolumeAnalysis._generate_peak_hours_report(peak_hours, hourly_stats)
+            return hourly_stats, report
+
+        except Exception as e:
+            raise BMRSError(f"Error analysing hourly volumes: {str(e)}")
+
+    @staticmethod
+    def calculate_daily_imbalance_metrics(prices_df, volumes_df, max_workers=None):
+        """
+        Sharded equivalent of ImbalanceAnalysis.calculate_daily_imbalance_metrics
+        """
+        try:
+            workers = ShardedAnalysis._workers(max_workers)
+            price_shards, volume_shards = ShardedAnalysis.split_by_month(
+                prices_df, volumes_df, max_shards=workers * SHARDS_PER_WORKER
+            )
+            shards = [
+                (prices, volumes) for prices, volumes in zip(price_shards, volume_shards)
+                if not prices.empty and not volumes.empty
+            ]
+            partials = ShardedAnalysis._map(_imbalance_partials, shards, workers)
+            return pd.concat(partials)
+
+        except Exception as e:
+            raise BMRSError(f"Error calculating imbalance metrics: {str(e)}")
@@ -0,0 +1,252 @@
+import heapq
+import json
+import random
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+from utils.helpers import BMRSError
+
+class KLLSketch:
+    """
+    Mergeable quantile sketch (Karnin, Lang and Liberty) with bounded memory.
+
+    Items are kept in a hierarchy of compactors; an item at level h stands
+    for 2**h original values. With the default k=200 the rank error is
+    around 1% while the state stays at a few hundred floats.
+    """
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        if k < 8:
+            raise BMRSError(f"Sketch size k must be at least 8, got: {k}")
+        self.k = k
+        self.n = 0
+        self.min = np.nan
+        self.max = np.nan
+        self._levels: List[List[float]] = [[]]
+        self._random = random.Random(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(int(np.ceil(self.k * (2.0 / 3.0) ** depth)), 2)
+
+    def _size(self) -> int:
+        return sum(len(level) for level in self._levels)
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(h) for h in range(len(self._levels)))
+
+    def update(self, value: float):
+        """Add a single value, ignoring NaN"""
+        self.update_many([value])
+
+    def update_many(self, values: Iterable[float]):
+        """Add many values at once, ignoring NaN"""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+
+        self.n += values.size
+        self.min = np.nanmin([self.min, values.min()])
+        self.max = np.nanmax([self.max, values.max()])
+
+        # Feed level 0 in chunks so compaction keeps memory bounded
+        chunk = self._capacity(0)
+        for start in range(0, values.size, chunk):
+            self._levels[0].extend(values[start:start + chunk].tolist())
+            self._compress()
+
+    def _compress(self):
+        while self._size() > self._max_size():
+            for h, level in enumerate(self._levels):
+                if len(level) >= self._capacity(h):
+                    if h + 1 == len(self._levels):
+                        self._levels.append([])
+                    level.sort()
+                    # Keep one item back when the level has odd length
+                    keep = [level.pop()] if len(level) % 2 else []
+                    offset = self._random.randint(0, 1)
+                    self._levels[h + 1].extend(level[offset::2])
+                    self._levels[h] = keep
+                    break
+
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        """Merge another sketch into this one"""
+        while len(self._levels) < len(other._levels):
+            self._levels.append([])
+        for h, level in enumerate(other._levels):
+            self._levels[h].extend(level)
+        self.n += other.n
+        self.min = np.nanmin([self.min, other.min])
+        self.max = np.nanmax([self.max, other.max])
+        self._compress()
+        return self
+
+    def _weighted_items(self):
+        values = np.concatenate([np.asarray(level, dtype=float) for level in self._levels])
+        weights = np.concatenate([
+            np.full(len(level), 2 ** h, dtype=float) for h, level in enumerate(self._levels)
+        ])
+        order = np.argsort(values, kind='stable')
+        return values[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """Estimate one quantile, or an array of quantiles, for q in [0, 1]"""
+        if self.n == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        values, cumulative = self._weighted_items()
+        ranks = np.clip(np.asarray(q, dtype=float), 0.0, 1.0) * cumulative[-1]
+        index = np.minimum(np.searchsorted(cumulative, ranks, side='left'), len(values) - 1)
+        result = values[index]
+        result = np.where(np.asarray(q) <= 0, self.min, np.where(np.asarray(q) >= 1, self.max, result))
+        return result if np.ndim(q) else float(result)
+
+    def cdf(self, points):
+        """Estimate the fraction of values less than or equal to each point"""
+        if self.n == 0:
+            return np.full(np.shape(points), np.nan)
+        values, cumulative = self._weighted_items()
+        index = np.searchsorted(values, np.asarray(points, dtype=float), side='right')
+        covered = np.where(index > 0, cumulative[np.maximum(index - 1, 0)], 0.0)
+        return covered / cumulative[-1]
+
+    def histogram(self, bins: int = 30):
+        """Estimate a probability histogram with equal-width bins between min and max"""
+        if self.n == 0:
+            return np.array([]), np.array([])
+        edges = np.linspace(self.min, self.max, bins + 1)
+        cdf = self.cdf(edges)
+        cdf[0] = 0.0
+        return np.diff(cdf), edges
+
+    def to_dict(self) -> dict:
+        return {
+            'k': self.k,
+            'n': int(self.n),
+            'min': None if np.isnan(self.min) else float(self.min),
+            'max': None if np.isnan(self.max) else float(self.max),
+            'levels': [list(level) for level in self._levels]
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'KLLSketch':
+        sketch = cls(k=data['k'])
+        sketch.n = data['n']
+        sketch.min = np.nan if data['min'] is None else data['min']
+        sketch.max = np.nan if data['max'] is None else data['max']
+        sketch._levels = [list(level) for level in data['levels']] or [[]]
+        return sketch
+
+class TopK:
+    """
+    Bounded tracker of the K items with the largest score
+    """
+
+    def __init__(self, k: int = 10):
+        if k < 1:
+            raise BMRSError(f"Top-K size must be at least 1, got: {k}")
+        self.k = k
+        self._heap = []  # Min-heap of (score, label, value)
+
+    def update(self, score: float, label: str, value: float):
+        """Offer an item, keeping it only if it is among the K largest scores"""
+        if np.isnan(score):
+            return
+        item = (float(score), str(label), float(value))
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+
+    def update_many(self, scores, labels, values):
+        """Offer many items at once, pre-selecting candidates with numpy"""
+        scores = np.asarray(scores, dtype=float)
+        valid = np.flatnonzero(~np.isnan(scores))
+        if valid.size > self.k:
+            valid = valid[np.argpartition(scores[valid], -self.k)[-self.k:]]
+        for i in valid:
+            self.update(scores[i], labels[i], values[i])
+
+    def merge(self, other: 'TopK') -> 'TopK':
+        for item in other._heap:
+            self.update(*item)
+        return self
+
+    def items(self) -> List[dict]:
+        """Tracked items, largest score first"""
+        return [
+            {'label': label, 'value': value, 'score': score}
+            for score, label, value in sorted(self._heap, reverse=True)
+        ]
+
+    def to_dict(self) -> dict:
+        return {'k': self.k, 'items': [list(item) for item in self._heap]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'TopK':
+        tracker = cls(k=data['k'])
+        tracker._heap = [tuple(item) for item in data['items']]
+        heapq.heapify(tracker._heap)
+        return tracker
+
+class SettlementDistributions:
+    """
+    Quantile sketches and top-K trackers of settlement period metrics,
+    kept in a few kilobytes regardless of the length of history.
+    """
+
+    FIELDS = [
+        'net_imbalance_volume', 'abs_imbalance_volume', 'system_sell_price',
+        'system_buy_price', 'price_spread', 'imbalance_cost'
+    ]
+
+    def __init__(self, k: int = 200, top_k: int = 10):
+        self.sketches: Dict[str, KLLSketch] = {field: KLLSketch(k) for field in self.FIELDS}
+        # Top-K is ranked by magnitude so that "worst" covers both directions
+        self.top: Dict[str, TopK] = {field: TopK(top_k) for field in self.FIELDS}
+
+    def update(self, prices_df: pd.DataFrame, volumes_df: pd.DataFrame):
+        """Add processed settlement periods to the sketches"""
+        df = pd.merge(prices_df, volumes_df, on='timestamp', how='inner')
+        df['imbalance_cost'] = np.where(
+            df['net_imbalance_volume'] >= 0,
+            df['net_imbalance_volume'] * df['system_sell_price'],
+            df['net_imbalance_volume'] * df['system_buy_price']
+        )
+        labels = df['timestamp'].astype(str).to_numpy()
+
+        for field in self.FIELDS:
+            values = df[field].to_numpy(dtype=float)
+            self.sketches[field].update_many(values)
+            self.top[field].update_many(np.abs(values), labels, values)
+
+    def merge(self, other: 'SettlementDistributions') -> 'SettlementDistributions':
+        for field in self.FIELDS:
+            self.sketches[field].merge(other.sketches[field])
+            self.top[field].merge(other.top[field])
+        return self
+
+    def quantiles(self, field: str, qs=(0.05, 0.25, 0.5, 0.75, 0.95)) -> pd.Series:
+        """Estimated quantiles of a field"""
+        return pd.Series(self.sketches[field].quantile(list(qs)), index=list(qs), name=field)
+
+    def worst(self, field: str, n: Optional[int] = None) -> pd.DataFrame:
+        """Periods with the largest absolute value of a field"""
+        items = self.top[field].items()
+        return pd.DataFrame(items[:n], columns=['label', 'value', 'score']).rename(
+            columns={'label': 'timestamp'}
+        )
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'sketches': {field: s.to_dict() for field, s in self.sketches.items()},
+            'top': {field: t.to_dict() for field, t in self.top.items()}
+        })
+
+    @classmethod
+    def from_json(cls, data: str) -> 'SettlementDistributions':
+        data = json.loads(data)
+        distributions = cls()
+        distributions.sketches = {f: KLLSketch.from_dict(d) for f, d in data['sketches'].items()}
+        distributions.top = {f: TopK.from_dict(d) for f, d in data['top'].items()}
+        return distributions
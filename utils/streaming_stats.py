@@ -0,0 +1,193 @@
+from collections import deque
+import math
+from typing import Dict, Iterable, Optional
+from utils.helpers import BMRSError
+
+# Fields tracked by default, named as in the processed prices and volumes frames
+DEFAULT_FIELDS = ['system_sell_price', 'system_buy_price', 'price_spread', 'net_imbalance_volume']
+
+class RollingWindow:
+    """
+    Rolling mean, variance, min and max over the last `window` values,
+    updated in O(1) amortised time per value.
+
+    Matches pandas `Series.rolling(window, min_periods)`: NaNs are skipped
+    and statistics are NaN until `min_periods` valid values are in the window.
+    """
+
+    def __init__(self, window: int, min_periods: Optional[int] = None):
+        if window < 1:
+            raise BMRSError(f"Window must be at least 1, got: {window}")
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+
+        self._values = deque()
+        self._position = 0
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+        # Monotonic deques of (position, value) for min and max
+        self._min = deque()
+        self._max = deque()
+
+    def update(self, value: float):
+        """Add the next value, dropping the oldest once the window is full"""
+        value = float(value)
+        self._values.append(value)
+        if not math.isnan(value):
+            self._add(value)
+            while self._min and self._min[-1][1] >= value:
+                self._min.pop()
+            self._min.append((self._position, value))
+            while self._max and self._max[-1][1] <= value:
+                self._max.pop()
+            self._max.append((self._position, value))
+
+        if len(self._values) > self.window:
+            old = self._values.popleft()
+            if not math.isnan(old):
+                self._remove(old)
+
+        oldest = self._position - self.window
+        while self._min and self._min[0][0] <= oldest:
+            self._min.popleft()
+        while self._max and self._max[0][0] <= oldest:
+            self._max.popleft()
+
+        self._position += 1
+
+    def _add(self, value):
+        # Welford update
+        self._count += 1
+        delta = value - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (value - self._mean)
+
+    def _remove(self, value):
+        self._count -= 1
+        if self._count == 0:
+            self._mean = 0.0
+            self._m2 = 0.0
+            return
+        delta = value - self._mean
+        self._mean -= delta / self._count
+        self._m2 = max(self._m2 - delta * (value - self._mean), 0.0)
+
+    @property
+    def ready(self) -> bool:
+        return self._count >= max(self.min_periods, 1)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def mean(self) -> float:
+        return self._mean if self.ready else math.nan
+
+    @property
+    def var(self) -> float:
+        if not self.ready or self._count < 2:
+            return math.nan
+        return self._m2 / (self._count - 1)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.var)
+
+    @property
+    def min(self) -> float:
+        return self._min[0][1] if self.ready else math.nan
+
+    @property
+    def max(self) -> float:
+        return self._max[0][1] if self.ready else math.nan
+
+class EWMA:
+    """
+    Exponentially weighted moving average updated in O(1) per value.
+
+    Matches pandas `Series.ewm(span=..., adjust=True).mean()`.
+    """
+
+    def __init__(self, span: Optional[float] = None, alpha: Optional[float] = None):
+        if alpha is None:
+            if span is None or span < 1:
+                raise BMRSError("EWMA requires alpha or a span of at least 1")
+            alpha = 2.0 / (span + 1.0)
+        self.alpha = alpha
+        self._numerator = 0.0
+        self._denominator = 0.0
+
+    def update(self, value: float) -> float:
+        """Add the next value and return the updated average"""
+        decay = 1.0 - self.alpha
+        self._numerator *= decay
+        self._denominator *= decay
+        if not math.isnan(value):
+            self._numerator += value
+            self._denominator += 1.0
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self._denominator == 0:
+            return math.nan
+        return self._numerator / self._denominator
+
+class StreamingStatistics:
+    """
+    Rolling statistics for several settlement period fields and windows,
+    updated once per new settlement period.
+    """
+
+    def __init__(self, windows: Iterable[int] = (48, 336), ewm_spans: Iterable[int] = (48,),
+                 fields: Optional[Iterable[str]] = None):
+        self.fields = list(fields or DEFAULT_FIELDS)
+        self.windows = list(windows)
+        self.ewm_spans = list(ewm_spans)
+        self.periods = 0
+
+        self._rolling = {
+            (field, window): RollingWindow(window)
+            for field in self.fields for window in self.windows
+        }
+        self._ewma = {
+            (field, span): EWMA(span=span)
+            for field in self.fields for span in self.ewm_spans
+        }
+
+    def update(self, values: Dict[str, float]) -> Dict[str, float]:
+        """
+        Add one settlement period. Missing fields count as NaN.
+        Returns the updated snapshot.
+        """
+        if 'price_spread' in self.fields and 'price_spread' not in values:
+            if 'system_buy_price' in values and 'system_sell_price' in values:
+                values = dict(values)
+                values['price_spread'] = values['system_buy_price'] - values['system_sell_price']
+
+        for (field, _), rolling in self._rolling.items():
+            rolling.update(values.get(field, math.nan))
+        for (field, _), ewma in self._ewma.items():
+            ewma.update(values.get(field, math.nan))
+
+        self.periods += 1
+        return self.snapshot()
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Current statistics as a flat dict keyed '<field>_<stat>_<window>',
+        e.g. 'price_spread_mean_48' or 'net_imbalance_volume_ewm_48'
+        """
+        snapshot = {}
+        for (field, window), rolling in self._rolling.items():
+            snapshot[f"{field}_mean_{window}"] = rolling.mean
+            snapshot[f"{field}_std_{window}"] = rolling.std
+            snapshot[f"{field}_var_{window}"] = rolling.var
+            snapshot[f"{field}_min_{window}"] = rolling.min
+            snapshot[f"{field}_max_{window}"] = rolling.max
+        for (field, span), ewma in self._ewma.items():
+            snapshot[f"{field}_ewm_{span}"] = ewma.value
+        return snapshot
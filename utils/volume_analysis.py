@@ -1,28 +1,33 @@
 from datetime import datetime
+import numpy as np
+import pandas as pd
+from utils.backends import get_backend
 from utils.helpers import BMRSError
+from utils.period_matrix import HOURS_PER_DAY
+
+HOUR_INDEX = pd.Index(np.arange(HOURS_PER_DAY, dtype=np.int32), name='hour')
 
 class VolumeAnalysis:
     """Class for analysing imbalance volumes at hourly granularity"""
     
     @staticmethod
-    def analyse_hourly_volumes(volumes_df):
+    def analyse_hourly_volumes(volumes_df, backend=None):
         """
         Analyse imbalance volumes by hour
         """
         try:
-            # Add hour column
-            df = volumes_df.copy()
-            df['hour'] = df['timestamp'].dt.hour
-            df['date'] = df['timestamp'].dt.date
+            backend = get_backend(backend)
             
             # Calculate hourly statistics
-            hourly_stats = df.groupby('hour').agg({
+            hourly_stats = backend.hourly_stats([volumes_df], {
                 'abs_imbalance_volume': ['mean', 'sum', 'std', 'min', 'max'],
                 'net_imbalance_volume': ['mean', 'sum']
             }).round(2)
             
             # Find peak hours
-            peak_hours = VolumeAnalysis._identify_peak_hours(df)
+            peak_hours = VolumeAnalysis._identify_peak_hours(
+                *backend.hourly_totals([volumes_df], 'abs_imbalance_volume')
+            )
             
             # Generate report
             report = VolumeAnalysis._generate_peak_hours_report(peak_hours, hourly_stats)
@@ -33,25 +38,36 @@ class VolumeAnalysis:
             raise BMRSError(f"Error analysing hourly volumes: {str(e)}")
     
     @staticmethod
-    def _identify_peak_hours(df):
+    def _identify_peak_hours(dates, totals):
         """
-        Identify hours with highest absolute volumes
+        Identify hours with highest absolute volumes from the (days x 24)
+        volume of every day and hour, NaN where an hour has no data
         """
         
+        days, hours = np.nonzero(~np.isnan(totals))
+        volumes = totals[days, hours]
+        
         # Daily peak hours
-        daily_peaks = df.groupby(['date', 'hour'])['abs_imbalance_volume'].sum().reset_index()
-        daily_peaks = daily_peaks.sort_values('abs_imbalance_volume', ascending=False)
+        order = np.argsort(-volumes, kind='stable')
+        daily_peaks = pd.DataFrame({
+            'date': dates[days[order]],
+            'hour': hours[order].astype(np.int32),
+            'abs_imbalance_volume': volumes[order]
+        })
         
         # Overall peak hours
-        hourly_peaks = df.groupby('hour')['abs_imbalance_volume'].sum().sort_values(ascending=False)
+        hourly_peaks = pd.Series(
+            np.nansum(totals, axis=0), index=HOUR_INDEX,
+            name='abs_imbalance_volume'
+        )[~np.isnan(totals).all(axis=0)].sort_values(ascending=False, kind='stable')
         
         # Frequency of hour appearing in top 3 daily
+        ranked = np.argsort(-np.where(np.isnan(totals), -np.inf, totals), axis=1, kind='stable')[:, :3]
+        in_top_3 = np.take_along_axis(~np.isnan(totals), ranked, axis=1)
+        frequency = np.bincount(ranked[in_top_3], minlength=HOURS_PER_DAY)
         top_3_frequency = (
-            daily_peaks.groupby('date')
-            .apply(lambda x: x.nlargest(3, 'abs_imbalance_volume'))
-            .reset_index(drop=True)
-            .groupby('hour').sise()
-            .sort_values(ascending=False)
+            pd.Series(frequency, index=HOUR_INDEX)[frequency > 0]
+            .sort_values(ascending=False, kind='stable')
         )
         
         return {
@@ -117,7 +133,7 @@ class VolumeAnalysis:
         return report
 
     @staticmethod
-    def generate_daily_peak_report(volumes_df, date):
+    def generate_daily_peak_report(volumes_df, date, backend=None):
         """
         Generate peak hours report for a specific date
         """
@@ -126,13 +142,12 @@ class VolumeAnalysis:
             report_date = datetime.strptime(date, '%Y-%m-%d').date()
             
             # Filter data for specified date
-            df = volumes_df[volumes_df['timestamp'].dt.date == report_date].copy()
-            df['hour'] = df['timestamp'].dt.hour
+            df = volumes_df[volumes_df['timestamp'].dt.date == report_date]
             
             # Calculate hourly volumes for the day
-            hourly_volumes = df.groupby('hour').agg({
+            hourly_volumes = get_backend(backend).hourly_stats([df], {
                 'abs_imbalance_volume': ['sum', 'mean'],
-                'net_imbalance_volume': 'sum'
+                'net_imbalance_volume': ['sum']
             }).round(2)
             
             # Get top 3 hours